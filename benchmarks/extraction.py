@@ -0,0 +1,104 @@
+# <pep8-80 compliant>
+
+# meshstats is a Blender addon that provides mesh statistics.
+# Copyright (C) 2020  Atamert Ölçgen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Compare ways of reading an evaluated (deformed) mesh.
+
+Run headless from the repository root:
+
+    blender -b --factory-startup --python benchmarks/extraction.py
+
+Pass grid sizes after `--` to override the defaults:
+
+    blender -b --factory-startup --python benchmarks/extraction.py -- 100 1000
+"""
+
+import os
+import sys
+import time
+
+import bmesh
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from meshstats import mesh  # noqa: E402
+
+
+REPEAT = 5
+
+SUBDIVISIONS_DEFAULT = [100, 300, 1000]
+
+
+def make_deformed_grid(subdivisions: int) -> bpy.types.Object:
+    bpy.ops.object.select_all(action='SELECT')
+    bpy.ops.object.delete()
+    bpy.ops.mesh.primitive_grid_add(
+        x_subdivisions=subdivisions,
+        y_subdivisions=subdivisions
+    )
+    obj = bpy.context.active_object
+    modifier = obj.modifiers.new("Twist", 'SIMPLE_DEFORM')
+    modifier.deform_method = 'TWIST'
+    return obj
+
+
+def read_bmesh(obj, depsgraph):
+    bm = bmesh.new()
+    bm.from_object(obj, depsgraph)
+    bm.free()
+
+
+def read_to_mesh(obj, depsgraph):
+    mesh.MeshArrays.from_object(obj, depsgraph, copy=True)
+
+
+def read_evaluated(obj, depsgraph):
+    mesh.MeshArrays.from_object(obj, depsgraph)
+
+
+def best_of(fn, *args) -> float:
+    """Best time of `REPEAT` runs, in milliseconds."""
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter_ns()
+        fn(*args)
+        timings.append((time.perf_counter_ns() - start) / 1_000_000)
+    return min(timings)
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or SUBDIVISIONS_DEFAULT
+    print("{:>10} {:>12} {:>12} {:>12}".format(
+        "faces",
+        "bmesh",
+        "to_mesh",
+        "evaluated"
+    ))
+    for size in sizes:
+        obj = make_deformed_grid(size)
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        print("{:>10} {:>10.2f}ms {:>10.2f}ms {:>10.2f}ms".format(
+            len(obj.data.polygons),
+            best_of(read_bmesh, obj, depsgraph),
+            best_of(read_to_mesh, obj, depsgraph),
+            best_of(read_evaluated, obj, depsgraph)
+        ))
+
+
+if __name__ == "__main__":
+    main(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
@@ -0,0 +1,473 @@
+# <pep8-80 compliant>
+
+# meshstats is a Blender addon that provides mesh statistics.
+# Copyright (C) 2020  Atamert Ölçgen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Time stages of mesh analysis on procedural meshes & check regressions.
+
+Run headless from the repository root:
+
+    blender -b --factory-startup --python benchmarks/suite.py
+
+Options go after `--`, for example to measure smaller meshes only and
+save the results as the new baseline:
+
+    blender -b --factory-startup --python benchmarks/suite.py -- \
+        --sizes 1000 10000 --save
+
+Without `--save`, results are compared to the baseline file and the
+script exits with status 1 if any stage is slower than the baseline by
+more than `--threshold`.  It also exits with status 1 if refreshing the
+positions of a mesh is not clearly faster than analyzing it again, with
+or without a baseline.  Timings depend on the machine, baselines should
+be saved & compared on the same one.
+"""
+
+import argparse
+import dataclasses
+import json
+import math
+import os
+import sys
+import time
+
+import addon_utils
+import bpy
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from meshstats import (analysis, constants, mesh, overlay)  # noqa: E402
+
+
+BASELINE_DEFAULT = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+SIZES_DEFAULT = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+# Stages faster than this are not reported as regressions, as their
+# timings are mostly noise.
+REGRESSION_MIN_MS = 1.0
+
+# Refreshing positions of an unchanged topology must take at most this
+# fraction of a full analysis.
+REFRESH_MAX_RATIO = 0.75
+
+# Triangles around the center of each fan.
+FAN_SIZE = 64
+
+CACHE_HIT_REPEAT = 1000
+
+# Screen size (in pixels) overlay elements are clustered on.
+LOD_SCREEN_SIZE = (1920, 1080)
+
+
+def make_object(
+        name: str,
+        vertices: np.ndarray,
+        face_sizes: np.ndarray,
+        loop_vertices: np.ndarray
+) -> bpy.types.Object:
+    me = bpy.data.meshes.new(name)
+    me.vertices.add(len(vertices))
+    me.vertices.foreach_set("co", vertices.astype(np.float32).ravel())
+    me.loops.add(len(loop_vertices))
+    me.loops.foreach_set("vertex_index", loop_vertices.astype(np.int32))
+    me.polygons.add(len(face_sizes))
+    me.polygons.foreach_set(
+        "loop_start",
+        (np.cumsum(face_sizes) - face_sizes).astype(np.int32)
+    )
+    me.update(calc_edges=True)
+    return link_object(bpy.data.objects.new(name, me))
+
+
+def link_object(obj: bpy.types.Object) -> bpy.types.Object:
+    if obj.name not in bpy.context.collection.objects:
+        bpy.context.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+    return obj
+
+
+def grid_vertices(rows: int, columns: int) -> np.ndarray:
+    (y, x) = np.mgrid[0:rows + 1, 0:columns + 1]
+    return np.stack(
+        (x.ravel(), y.ravel(), np.zeros(x.size)),
+        axis=1
+    ) / max(rows, columns)
+
+
+def make_grid(faces: int) -> bpy.types.Object:
+    """Quads only."""
+    n = max(1, round(math.sqrt(faces)))
+    (i, j) = np.mgrid[0:n, 0:n]
+    v = (i * (n + 1) + j).ravel()
+    quads = np.stack((v, v + 1, v + n + 2, v + n + 1), axis=1)
+    return make_object(
+        "grid",
+        grid_vertices(n, n),
+        np.full(len(quads), 4),
+        quads.ravel()
+    )
+
+
+def make_ngons(faces: int) -> bpy.types.Object:
+    """Grid with rows of quads, hexagons & triangles."""
+    # Rows of quads, hexagons & triangles have 1, 0.5 & 2 faces per cell.
+    n = max(3, round(math.sqrt(faces / 3.5 * 3)))
+    n -= n % 2
+    face_sizes = []
+    loop_vertices = []
+    for row in range(n):
+        bottom = row * (n + 1)
+        top = bottom + n + 1
+        j = np.arange(n)
+        if row % 3 == 0:
+            faces_ = np.stack(
+                (bottom + j, bottom + j + 1, top + j + 1, top + j),
+                axis=1
+            )
+        elif row % 3 == 1:
+            j = j[::2]
+            faces_ = np.stack((
+                bottom + j,
+                bottom + j + 1,
+                bottom + j + 2,
+                top + j + 2,
+                top + j + 1,
+                top + j
+            ), axis=1)
+        else:
+            faces_ = np.concatenate((
+                np.stack((bottom + j, bottom + j + 1, top + j + 1), axis=1),
+                np.stack((bottom + j, top + j + 1, top + j), axis=1)
+            ))
+        face_sizes.append(np.full(len(faces_), faces_.shape[1]))
+        loop_vertices.append(faces_.ravel())
+    return make_object(
+        "ngons",
+        grid_vertices(n, n),
+        np.concatenate(face_sizes),
+        np.concatenate(loop_vertices)
+    )
+
+
+def make_fans(faces: int) -> bpy.types.Object:
+    """Separate triangle fans, each with a high valence pole."""
+    fan_count = max(1, faces // FAN_SIZE)
+    columns = math.ceil(math.sqrt(fan_count))
+    fans = np.arange(fan_count)
+    angles = np.linspace(0, 2 * math.pi, FAN_SIZE, endpoint=False)
+    ring = np.stack(
+        (np.cos(angles), np.sin(angles), np.zeros(FAN_SIZE)),
+        axis=1
+    )
+    centers = np.stack(
+        (fans % columns * 3.0, fans // columns * 3.0, np.zeros(fan_count)),
+        axis=1
+    )
+    # Center of each fan is followed by its ring.
+    vertices = np.concatenate(
+        (centers[:, np.newaxis], centers[:, np.newaxis] + ring),
+        axis=1
+    ).reshape(-1, 3)
+    first = fans[:, np.newaxis] * (FAN_SIZE + 1)
+    k = np.arange(FAN_SIZE)
+    tris = np.stack((
+        np.broadcast_to(first, (fan_count, FAN_SIZE)),
+        first + 1 + k,
+        first + 1 + (k + 1) % FAN_SIZE
+    ), axis=2)
+    return make_object(
+        "fans",
+        vertices,
+        np.full(fan_count * FAN_SIZE, 3),
+        tris.ravel()
+    )
+
+
+def make_cube(faces: int) -> bpy.types.Object:
+    """Cube subdivided with Catmull-Clark, quads only."""
+    levels = max(0, round(math.log(faces / 6, 4)))
+    bpy.ops.mesh.primitive_cube_add()
+    obj = bpy.context.active_object
+    modifier = obj.modifiers.new("Subdivision", 'SUBSURF')
+    modifier.levels = levels
+    bpy.ops.object.modifier_apply(modifier=modifier.name)
+    return link_object(obj)
+
+
+def make_ico_sphere(faces: int) -> bpy.types.Object:
+    """Triangles only, with 5 & 6 valence vertices."""
+    subdivisions = min(10, max(1, round(math.log(faces / 20, 4)) + 1))
+    bpy.ops.mesh.primitive_ico_sphere_add(subdivisions=subdivisions)
+    return link_object(bpy.context.active_object)
+
+
+SHAPES = {
+    "grid": make_grid,
+    "ngons": make_ngons,
+    "fans": make_fans,
+    "cube": make_cube,
+    "ico_sphere": make_ico_sphere,
+}
+
+
+def clear_scene() -> None:
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj)
+    for me in list(bpy.data.meshes):
+        bpy.data.meshes.remove(me)
+
+
+def best_of(repeat: int, fn, *args) -> float:
+    """Best time of `repeat` runs, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        fn(*args)
+        timings.append((time.perf_counter_ns() - start) / 1_000_000)
+    return min(timings)
+
+
+def analyzed(arrays: mesh.MeshArrays) -> mesh.Mesh:
+    mesh_data = mesh.Mesh()
+    mesh_data.analyze(arrays, constants.FLAT_THRESHOLD_ANGLE_DEFAULT)
+    return mesh_data
+
+
+def cache_miss(context: bpy.types.Context, obj: bpy.types.Object) -> None:
+    cache = mesh.Cache()
+    cache.get(context, obj)
+    # Large meshes are analyzed in jobs, run them until they are done.
+    while cache.run_jobs(context, math.inf):
+        pass
+    cache.cancel_jobs()
+
+
+def cache_hits(cache: mesh.Cache, context, obj) -> None:
+    for _ in range(CACHE_HIT_REPEAT):
+        cache.get(context, obj)
+
+
+def outline_arrays(mesh_data: mesh.Mesh, offsets, indices) -> None:
+    color = constants.OVERLAY_TRIS_COLOR_DEFAULT
+    overlay._outline_arrays(
+        mesh_data.vertices,
+        offsets,
+        indices,
+        np.ones(len(offsets) - 1, dtype=bool),
+        color,
+        color
+    )
+
+
+def pole_geometry(mesh_data: mesh.Mesh) -> None:
+    for poles in [mesh_data.n_poles, mesh_data.e_poles, mesh_data.star_poles]:
+        overlay._pole_geometry(mesh_data.vertices, poles)
+
+
+def screen_pixels(points: np.ndarray) -> np.ndarray:
+    """Fit `points` to a full HD screen, looking down the Z axis."""
+    if len(points) == 0:
+        return np.zeros((0, 2), dtype=np.float32)
+    low = points[:, :2].min(axis=0)
+    size = np.maximum(points[:, :2].max(axis=0) - low, 1e-6)
+    return (points[:, :2] - low) / size * np.array(LOD_SCREEN_SIZE)
+
+
+def measure(obj: bpy.types.Object, repeat: int) -> dict:
+    """Timings of each stage for `obj`, in milliseconds."""
+    context = bpy.context
+    depsgraph = context.evaluated_depsgraph_get()
+    angle = constants.FLAT_THRESHOLD_ANGLE_DEFAULT
+    arrays = mesh.MeshArrays.from_object(obj, depsgraph)
+    mesh_data = analyzed(arrays)
+    tris = mesh_data.tris
+    timings = {
+        "read": best_of(repeat, mesh.MeshArrays.from_object, obj, depsgraph),
+        "fingerprint": best_of(repeat, arrays.topology_fingerprint),
+        "faces": best_of(
+            repeat,
+            lambda: analysis.run(mesh.Mesh()._calculate_faces(arrays))
+        ),
+        "poles": best_of(
+            repeat,
+            lambda: analysis.run(mesh.Mesh()._calculate_poles(arrays, angle))
+        ),
+        "analyze": best_of(repeat, analyzed, arrays),
+        # Topology is unchanged, only positions are refreshed, as after an
+        # armature or a deform modifier moved the vertices.
+        "refresh": best_of(
+            repeat,
+            mesh_data.analyze,
+            dataclasses.replace(arrays, vertices=arrays.vertices + 0.01),
+            angle
+        ),
+        "cache_miss": best_of(repeat, cache_miss, context, obj),
+    }
+    cache = mesh.Cache()
+    cache.get(context, obj)
+    while cache.run_jobs(context, math.inf):
+        pass
+    timings["cache_hit"] = best_of(
+        repeat,
+        cache_hits,
+        cache,
+        context,
+        obj
+    ) / CACHE_HIT_REPEAT
+    timings["overlay_tris"] = best_of(
+        repeat,
+        outline_arrays,
+        mesh_data,
+        np.arange(0, tris.indices.size + 1, 3, dtype=np.int32),
+        tris.indices.ravel()
+    )
+    timings["overlay_ngons"] = best_of(
+        repeat,
+        outline_arrays,
+        mesh_data,
+        mesh_data.ngons.offsets,
+        mesh_data.ngons.indices
+    )
+    timings["overlay_poles"] = best_of(repeat, pole_geometry, mesh_data)
+    all_tris = np.ones(len(tris), dtype=bool)
+    timings["overlay_lod"] = best_of(
+        repeat,
+        overlay._cluster,
+        screen_pixels(tris.centers),
+        all_tris,
+        all_tris,
+        constants.OVERLAY_LOD_CELL_SIZE
+    )
+    return timings
+
+
+def compare(
+        results: dict,
+        baseline: dict,
+        threshold: float
+) -> list:
+    """Stages slower than the baseline by more than `threshold`."""
+    regressions = []
+    for (key, value) in results.items():
+        base = baseline.get(key)
+        if base is not None \
+           and value > base * (1.0 + threshold) \
+           and value - base > REGRESSION_MIN_MS:
+            regressions.append("{0}: {1:.2f}ms, baseline {2:.2f}ms".format(
+                key,
+                value,
+                base
+            ))
+    return regressions
+
+
+def slow_refreshes(results: dict) -> list:
+    """Meshes whose positions are not refreshed faster than they are
+    analyzed from scratch."""
+    slow = []
+    for (key, analyze) in results.items():
+        (shape, size, stage) = key.split("/")
+        if stage != "analyze" or analyze < REGRESSION_MIN_MS:
+            continue
+        refresh = results["{0}/{1}/refresh".format(shape, size)]
+        if refresh > analyze * REFRESH_MAX_RATIO:
+            slow.append("{0}/{1}: refresh {2:.2f}ms, analyze {3:.2f}ms".format(
+                shape,
+                size,
+                refresh,
+                analyze
+            ))
+    return slow
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="suite.py")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES_DEFAULT)
+    parser.add_argument(
+        "--shapes",
+        nargs="+",
+        choices=list(SHAPES),
+        default=list(SHAPES)
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_DEFAULT)
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="save results as the baseline instead of comparing"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed slow down relative to the baseline, 0.25 is 25%%"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv) -> int:
+    args = parse_args(argv)
+    # Cache operations read addon preferences.
+    addon_utils.enable(constants.ADDON_NAME, default_set=True)
+
+    results = {}
+    print("{:<12} {:>10} {:<14} {:>12}".format("shape", "faces", "stage", ""))
+    for shape in args.shapes:
+        for size in args.sizes:
+            clear_scene()
+            obj = SHAPES[shape](size)
+            face_count = len(obj.data.polygons)
+            for (stage, ms) in measure(obj, args.repeat).items():
+                print("{:<12} {:>10} {:<14} {:>10.3f}ms".format(
+                    shape,
+                    face_count,
+                    stage,
+                    ms
+                ))
+                results["{0}/{1}/{2}".format(shape, size, stage)] = ms
+
+    slow = slow_refreshes(results)
+    for refresh in slow:
+        print("SLOW REFRESH {}".format(refresh))
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(
+                {"blender": bpy.app.version_string, "results": results},
+                f,
+                indent=2,
+                sort_keys=True
+            )
+        print("Saved baseline to '{}'.".format(args.baseline))
+        return 1 if slow else 0
+    elif not os.path.exists(args.baseline):
+        print("No baseline at '{}', run with --save.".format(args.baseline))
+        return 1 if slow else 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print("REGRESSION {}".format(regression))
+    return 1 if regressions or slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(
+        sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    ))
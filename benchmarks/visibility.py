@@ -0,0 +1,138 @@
+# <pep8-80 compliant>
+
+# meshstats is a Blender addon that provides mesh statistics.
+# Copyright (C) 2020  Atamert Ölçgen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Compare BVH visibility test against per point `scene.ray_cast`.
+
+Run headless from the repository root:
+
+    blender -b --factory-startup --python benchmarks/visibility.py
+
+Pass ico sphere subdivision levels after `--` to override the defaults:
+
+    blender -b --factory-startup --python benchmarks/visibility.py -- 4 6
+"""
+
+import os
+import sys
+import time
+
+import bpy
+import mathutils
+from mathutils.bvhtree import BVHTree
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from meshstats import (mesh, visibility)  # noqa: E402
+
+
+SUBDIVISIONS_DEFAULT = [3, 5, 7]
+
+VIEW_LOCATION = mathutils.Vector((0.0, -6.0, 3.0))
+
+
+def make_ico_sphere(subdivisions: int) -> bpy.types.Object:
+    bpy.ops.object.select_all(action='SELECT')
+    bpy.ops.object.delete()
+    bpy.ops.mesh.primitive_ico_sphere_add(subdivisions=subdivisions)
+    return bpy.context.active_object
+
+
+def make_view(location: mathutils.Vector) -> visibility.View:
+    rotation = (-location).to_track_quat('-Z', 'Y').to_matrix().to_4x4()
+    camera_matrix = mathutils.Matrix.Translation(location) @ rotation
+    return visibility.View(
+        is_perspective=True,
+        view_matrix=camera_matrix.inverted()
+    )
+
+
+def raycast_visible(
+        context: bpy.types.Context,
+        obj: bpy.types.Object,
+        points: np.ndarray,
+        origin: mathutils.Vector,
+        epsilon: float = 0.00001
+) -> np.ndarray:
+    """Visibility test the overlay used before BVH trees."""
+    depsgraph = context.evaluated_depsgraph_get()
+    result = np.zeros(len(points), dtype=bool)
+    for (i, p) in enumerate(points.tolist()):
+        point = obj.matrix_world @ mathutils.Vector(p)
+        (hit, loc, _, _, hit_obj, _) = context.scene.ray_cast(
+            depsgraph,
+            origin,
+            (point - origin).normalized()
+        )
+        result[i] = hit \
+            and hit_obj.original == obj \
+            and (point - loc).length < epsilon
+    return result
+
+
+def timed(fn, *args):
+    start = time.perf_counter_ns()
+    result = fn(*args)
+    return (result, (time.perf_counter_ns() - start) / 1_000_000)
+
+
+def main(argv):
+    levels = [int(arg) for arg in argv] or SUBDIVISIONS_DEFAULT
+    context = bpy.context
+    view = make_view(VIEW_LOCATION)
+    print("{:>10} {:>12} {:>12} {:>12} {:>10}".format(
+        "points",
+        "bvh build",
+        "bvh test",
+        "ray_cast",
+        "agreement"
+    ))
+    for level in levels:
+        obj = make_ico_sphere(level)
+        depsgraph = context.evaluated_depsgraph_get()
+        points = mesh.MeshArrays.from_object(obj, depsgraph).vertices
+        (bvh, build_ms) = timed(BVHTree.FromObject, obj, depsgraph)
+        occluder = visibility.Occluder(
+            bvh=bvh,
+            size=float(np.linalg.norm(np.ptp(points, axis=0)))
+        )
+        (bvh_result, bvh_ms) = timed(
+            visibility.points_visible,
+            occluder,
+            points,
+            view,
+            obj.matrix_world
+        )
+        (raycast_result, raycast_ms) = timed(
+            raycast_visible,
+            context,
+            obj,
+            points,
+            VIEW_LOCATION
+        )
+        print("{:>10} {:>10.2f}ms {:>10.2f}ms {:>10.2f}ms {:>9.2%}".format(
+            len(points),
+            build_ms,
+            bvh_ms,
+            raycast_ms,
+            np.mean(bvh_result == raycast_result)
+        ))
+
+
+if __name__ == "__main__":
+    main(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
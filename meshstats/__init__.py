@@ -18,18 +18,39 @@
 
 if "bpy" in locals():
     import importlib
-    for mod in [icon, mesh, ops, overlay, props, ui]:  # noqa: F821
+    for mod in [  # noqa: F821
+            constants,
+            icon,
+            mesh,
+            ops,
+            overlay,
+            props,
+            scheduler,
+            trace,
+            ui,
+            visibility
+    ]:
         importlib.reload(mod)
 else:
-    import bpy
-    from . import (
-        icon,
-        mesh,
-        ops,
-        overlay,
-        props,
-        ui
-    )
+    try:
+        import bpy
+    except ImportError:
+        # Outside of Blender only the modules that do not depend on `bpy`
+        # can be used, e.g. `python -m meshstats.analysis`.
+        pass
+    else:
+        from . import (
+            constants,
+            icon,
+            mesh,
+            ops,
+            overlay,
+            props,
+            scheduler,
+            trace,
+            ui,
+            visibility
+        )
 
 
 draw_handler = None
@@ -42,6 +63,9 @@ def register():
 
     # Register Props
     bpy.utils.register_class(props.MeshstatsAddonPreferences)
+    addon = bpy.context.preferences.addons.get(constants.ADDON_NAME)
+    if addon is not None:
+        trace.tracer.enabled = addon.preferences.trace_enabled
     bpy.utils.register_class(props.MeshstatsSceneProperties)
     bpy.types.Scene.meshstats = bpy.props.PointerProperty(
         type=props.MeshstatsSceneProperties
@@ -55,15 +79,27 @@ def register():
     bpy.utils.register_class(ops.OBJECT_OT_MeshstatsDisableObject)
     bpy.utils.register_class(ops.OBJECT_OT_MeshstatsEnableObject)
     bpy.utils.register_class(ops.PREFERENCES_OT_MeshstatsResetSettings)
+    bpy.utils.register_class(ops.PREFERENCES_OT_MeshstatsSaveTrace)
 
     # Register UI
     bpy.utils.register_class(ui.VIEW3D_PT_meshstats)
+    bpy.utils.register_class(ui.VIEW3D_PT_meshstats_totals)
+    bpy.utils.register_class(ui.VIEW3D_PT_meshstats_timings)
     bpy.utils.register_class(ui.VIEW3D_PT_overlay_meshstats)
 
     # Register Handlers
     bpy.app.handlers.load_pre.append(mesh.app__load_pre_handler)
+    bpy.app.handlers.load_pre.append(scheduler.app__load_pre_handler)
+    bpy.app.handlers.undo_post.append(mesh.app__undo_post_handler)
+    bpy.app.handlers.redo_post.append(mesh.app__undo_post_handler)
+    bpy.app.handlers.depsgraph_update_post.append(
+        scheduler.app__depsgraph_update_post
+    )
+    bpy.app.handlers.load_pre.append(visibility.app__load_pre_handler)
+    bpy.app.handlers.undo_post.append(visibility.app__undo_post_handler)
+    bpy.app.handlers.redo_post.append(visibility.app__undo_post_handler)
     bpy.app.handlers.depsgraph_update_post.append(
-        mesh.app__depsgraph_update_post
+        visibility.app__depsgraph_update_post
     )
     draw_handler = bpy.types.SpaceView3D.draw_handler_add(
         overlay.draw_callback,
@@ -77,18 +113,33 @@ def unregister():
     # Unregister Handlers
     bpy.types.SpaceView3D.draw_handler_remove(draw_handler, 'WINDOW')
     bpy.app.handlers.load_pre.remove(mesh.app__load_pre_handler)
+    bpy.app.handlers.load_pre.remove(scheduler.app__load_pre_handler)
+    bpy.app.handlers.undo_post.remove(mesh.app__undo_post_handler)
+    bpy.app.handlers.redo_post.remove(mesh.app__undo_post_handler)
+    bpy.app.handlers.depsgraph_update_post.remove(
+        scheduler.app__depsgraph_update_post
+    )
+    bpy.app.handlers.load_pre.remove(visibility.app__load_pre_handler)
+    bpy.app.handlers.undo_post.remove(visibility.app__undo_post_handler)
+    bpy.app.handlers.redo_post.remove(visibility.app__undo_post_handler)
     bpy.app.handlers.depsgraph_update_post.remove(
-        mesh.app__depsgraph_update_post
+        visibility.app__depsgraph_update_post
     )
+    scheduler.scheduler.cancel()
+    mesh.cache.cancel_jobs()
+    trace.tracer.enabled = False
 
     # Unregister UI
     bpy.utils.unregister_class(ui.VIEW3D_PT_overlay_meshstats)
+    bpy.utils.unregister_class(ui.VIEW3D_PT_meshstats_timings)
+    bpy.utils.unregister_class(ui.VIEW3D_PT_meshstats_totals)
     bpy.utils.unregister_class(ui.VIEW3D_PT_meshstats)
 
     # Unregister Operations
     bpy.utils.unregister_class(ops.OBJECT_OT_MeshstatsDisableObject)
     bpy.utils.unregister_class(ops.OBJECT_OT_MeshstatsEnableObject)
     bpy.utils.unregister_class(ops.PREFERENCES_OT_MeshstatsResetSettings)
+    bpy.utils.unregister_class(ops.PREFERENCES_OT_MeshstatsSaveTrace)
 
     # Unregister Props
     del bpy.types.Object.meshstats
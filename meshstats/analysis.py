@@ -0,0 +1,972 @@
+# <pep8-80 compliant>
+
+# meshstats is a Blender addon that provides mesh statistics.
+# Copyright (C) 2020  Atamert Ölçgen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import dataclasses
+import hashlib
+import logging
+import math
+import sys
+import time
+import typing
+
+import numpy as np
+
+from . import (constants, face, pole, timing)
+
+
+log = logging.getLogger(__name__)
+
+T = typing.TypeVar('T')
+
+
+@dataclasses.dataclass(frozen=True)
+class MeshArrays:
+    """Flat arrays describing the topology & positions of a mesh.
+
+    These are laid out like the arrays of a Blender mesh datablock, see
+    `mesh.MeshArrays` for reading them with `foreach_get`.
+    """
+    vertices: np.ndarray  # (V, 3) float32
+    loop_vertices: np.ndarray  # (L,) int32
+    loop_edges: np.ndarray  # (L,) int32
+    edge_vertices: np.ndarray  # (E, 2) int32
+    loop_start: np.ndarray  # (F,) int32
+    loop_total: np.ndarray  # (F,) int32
+    face_normals: np.ndarray  # (F, 3) float32
+
+    @classmethod
+    def from_faces(
+            cls,
+            vertices: np.ndarray,
+            loop_total: np.ndarray,
+            loop_vertices: np.ndarray
+    ) -> 'MeshArrays':
+        """Make arrays of a mesh given as faces only.
+
+        Edges are derived from consecutive corners of faces, face normals
+        are calculated with Newell's method.
+        """
+        vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+        loop_total = np.asarray(loop_total, dtype=np.int32)
+        loop_vertices = np.asarray(loop_vertices, dtype=np.int32)
+        loop_start = (np.cumsum(loop_total) - loop_total).astype(np.int32)
+        next_vertices = loop_vertices[next_corners(loop_start, loop_total)]
+
+        edge_keys = np.minimum(loop_vertices, next_vertices).astype(np.int64) \
+            * len(vertices) \
+            + np.maximum(loop_vertices, next_vertices)
+        (edge_keys, loop_edges) = np.unique(edge_keys, return_inverse=True)
+        edge_vertices = np.stack(
+            (edge_keys // len(vertices), edge_keys % len(vertices)),
+            axis=1
+        )
+
+        corner_normals = np.cross(
+            vertices[loop_vertices].astype(np.float64),
+            vertices[next_vertices].astype(np.float64)
+        )
+        face_normals = np.add.reduceat(corner_normals, loop_start) \
+            if len(loop_start) > 0 else np.empty((0, 3))
+        lengths = np.linalg.norm(face_normals, axis=1)
+        face_normals /= np.where(lengths > 0, lengths, 1.0)[:, np.newaxis]
+
+        return cls(
+            vertices=vertices,
+            loop_vertices=loop_vertices,
+            loop_edges=loop_edges.astype(np.int32).reshape(-1),
+            edge_vertices=edge_vertices.astype(np.int32),
+            loop_start=loop_start,
+            loop_total=loop_total,
+            face_normals=face_normals.astype(np.float32)
+        )
+
+    def topology_fingerprint(self) -> typing.Hashable:
+        """Changes whenever the connectivity of the mesh changes.
+
+        Vertex positions and face normals are not included.
+        """
+        return run(self.topology_fingerprint_steps())
+
+    def topology_fingerprint_steps(
+            self,
+            chunk_size: int = constants.ANALYSIS_CHUNK_SIZE
+    ) -> typing.Generator[float, None, typing.Hashable]:
+        """Calculate `topology_fingerprint` in steps, yielding progress.
+
+        Hashing every index array costs about as much as refreshing the
+        stats, so only `loop_edges` is hashed in full: edges are renumbered
+        by almost every edit of the topology.  Element counts and evenly
+        spaced samples of the other index arrays catch the rest.
+        """
+        arrays = [np.ascontiguousarray(self.loop_edges).reshape(-1)]
+        for array in (self.loop_vertices,
+                      self.edge_vertices,
+                      self.loop_start,
+                      self.loop_total):
+            array = array.reshape(-1)
+            step = max(
+                1,
+                len(array) // constants.ANALYSIS_FINGERPRINT_SAMPLE_SIZE
+            )
+            arrays.append(np.ascontiguousarray(array[::step]))
+        total = sum(len(array) for array in arrays)
+        done = 0
+        digest = hashlib.blake2b(digest_size=16)
+        for array in arrays:
+            for start in range(0, len(array), chunk_size):
+                chunk = array[start:start + chunk_size]
+                digest.update(chunk.data)
+                done += len(chunk)
+                yield done / max(1, total)
+        return (
+            len(self.vertices),
+            len(self.edge_vertices),
+            len(self.loop_total),
+            len(self.loop_vertices),
+            digest.digest()
+        )
+
+
+def run(steps: typing.Generator[typing.Any, None, T]) -> T:
+    """Run a generator of steps to completion, return its return value."""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+def scaled(
+        steps: typing.Generator[float, None, T],
+        start: float,
+        end: float
+) -> typing.Generator[float, None, T]:
+    """Map progress of `steps` from [0, 1] to [start, end]."""
+    while True:
+        try:
+            progress = next(steps)
+        except StopIteration as stop:
+            return stop.value
+        yield start + (end - start) * progress
+
+
+def percentages(
+        tris_count: int,
+        quads_count: int,
+        ngons_count: int
+) -> typing.Tuple[int, int, int]:
+    """Whole percentages of face types that add up to 100.
+
+    Percentage of a face type is not zero if there is at least one face of
+    that type.
+    """
+    face_count = tris_count + quads_count + ngons_count
+    if face_count == 0:
+        return (0, 0, 0)
+    tris = int(tris_count * 100.0 / face_count)
+    quads = int(quads_count * 100.0 / face_count)
+    ngons = int(ngons_count * 100.0 / face_count)
+
+    # Percentage is not zero if there is at least one face
+    if tris_count > 0:
+        tris = max(1, tris)
+    if quads_count > 0:
+        quads = max(1, quads)
+    if ngons_count > 0:
+        ngons = max(1, ngons)
+
+    # Adjust if the sum is not 100
+    while (tris + quads + ngons) > 100:
+        if quads > tris and quads > ngons:
+            quads -= 1
+        elif tris > ngons:
+            tris -= 1
+        else:
+            ngons -= 1
+    while (tris + quads + ngons) < 100:
+        if ngons < quads and ngons < tris and ngons > 0:
+            ngons += 1
+        elif tris < quads and tris > 0:
+            tris += 1
+        else:
+            quads += 1
+    return (tris, quads, ngons)
+
+
+def chunks(
+        size: int,
+        chunk_size: int = constants.ANALYSIS_CHUNK_SIZE
+) -> typing.Iterator[slice]:
+    """Slices of `range(size)`, `chunk_size` long except for the last one."""
+    for start in range(0, size, chunk_size):
+        yield slice(start, min(start + chunk_size, size))
+
+
+def ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenation of `range(start, start + count)` for each pair."""
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(starts - offsets, counts) \
+        + np.arange(np.sum(counts), dtype=starts.dtype)
+
+
+def next_corners(
+        loop_start: np.ndarray,
+        loop_total: np.ndarray
+) -> np.ndarray:
+    """Index of the next corner of each corner of faces.
+
+    Each corner connects to the next one, last corner of a face connects
+    back to the first.
+    """
+    next_corner = np.arange(1, np.sum(loop_total) + 1, dtype=np.int32)
+    next_corner[loop_start + loop_total - 1] = loop_start
+    return next_corner
+
+
+def row_offsets(counts: np.ndarray) -> np.ndarray:
+    """CSR offsets for rows of the given lengths."""
+    offsets = np.zeros(len(counts) + 1, dtype=np.int32)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+def _add_counts(counts: np.ndarray, keys: np.ndarray) -> None:
+    """Add the number of occurrences of each of `keys` to `counts`.
+
+    Only the elements of `counts` that are in `keys` are touched, so this
+    takes time proportional to the number of keys, not to `len(counts)`.
+    """
+    (unique_keys, key_counts) = np.unique(keys, return_counts=True)
+    counts[unique_keys] += key_counts
+
+
+def _csr_steps(
+        keys: np.ndarray,
+        values: np.ndarray,
+        size: int
+) -> typing.Generator[float, None, typing.Tuple[np.ndarray, np.ndarray]]:
+    """Group `values` by `keys` into (offsets, values) CSR arrays, in steps.
+
+    Values of key `k` are `values[offsets[k]:offsets[k + 1]]`, in their
+    original order.  Values are placed with a counting sort, a chunk at a
+    time, so only chunks are ever sorted.
+    """
+    counts = np.zeros(size, dtype=np.int64)
+    for chunk in chunks(len(keys)):
+        _add_counts(counts, keys[chunk])
+        yield chunk.stop / len(keys) / 2
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    # Where the next value of each key goes.
+    cursors = offsets[:-1].copy()
+    grouped = np.empty_like(values)
+    for chunk in chunks(len(keys)):
+        order = np.argsort(keys[chunk], kind='stable')
+        chunk_keys = keys[chunk][order]
+        (unique_keys, first, key_counts) = np.unique(
+            chunk_keys,
+            return_index=True,
+            return_counts=True
+        )
+        # Rank of each value among the values of its key in this chunk.
+        ranks = np.arange(len(chunk_keys)) - np.repeat(first, key_counts)
+        grouped[cursors[chunk_keys] + ranks] = values[chunk][order]
+        cursors[unique_keys] += key_counts
+        yield 0.5 + chunk.stop / len(keys) / 2
+    return (offsets, grouped)
+
+
+# Poles with the same number of linked faces, as `(poles, link_faces)`:
+# (m,) indices of the poles and (m, k) indices of their linked faces.
+LinkFaceGroup = typing.Tuple[np.ndarray, np.ndarray]
+
+
+def _link_face_groups(
+        link_face_offsets: np.ndarray,
+        link_faces: np.ndarray
+) -> typing.List[LinkFaceGroup]:
+    """Group poles with two or more linked faces by their number of linked
+    faces.
+
+    Groups are sliced so that no Gram matrix of `_mean_dot_products` has
+    more than `ANALYSIS_GRAM_MATRIX_SIZE` elements.
+    """
+    starts = link_face_offsets[:-1]
+    counts = np.diff(link_face_offsets)
+    groups = []
+    for k in np.unique(counts[counts > 1]).tolist():
+        batch = np.flatnonzero(counts == k)
+        rows = max(1, constants.ANALYSIS_GRAM_MATRIX_SIZE // (k * k))
+        for chunk in chunks(len(batch), rows):
+            poles = batch[chunk]
+            groups.append(
+                (poles, link_faces[starts[poles, np.newaxis] + np.arange(k)])
+            )
+    return groups
+
+
+def _mean_dot_products(
+        link_faces: np.ndarray,
+        face_normals: np.ndarray
+) -> np.ndarray:
+    """Mean of |dot| over every pair of linked face normals of `(m, k)`
+    `link_faces`, computed from an `(m, k, k)` Gram matrix."""
+    k = link_faces.shape[1]
+    normals = face_normals[link_faces].astype(np.float64)
+    dots = normals @ normals.transpose(0, 2, 1)
+    np.abs(dots, out=dots)
+    # Gram matrix is symmetric with a diagonal of |n|^2, so the sum of
+    # distinct pairs is half of what remains without the trace.
+    pair_sums = (np.sum(dots, axis=(1, 2))
+                 - np.trace(dots, axis1=1, axis2=2)) / 2
+    return pair_sums / (k * (k - 1) / 2)
+
+
+def _is_flat(
+        groups: typing.List[LinkFaceGroup],
+        pole_count: int,
+        face_normals: np.ndarray,
+        flat_threshold: float
+) -> np.ndarray:
+    """Whether linked faces of each pole form a flat surface.
+
+    Poles that are not in any group, with fewer than two linked faces, are
+    not flat.
+    """
+    is_flat = np.zeros(pole_count, dtype=bool)
+    for (poles, link_faces) in groups:
+        is_flat[poles] = \
+            _mean_dot_products(link_faces, face_normals) > flat_threshold
+    return is_flat
+
+
+@dataclasses.dataclass(eq=False)
+class Stats:
+    """Face & pole stats of a mesh, calculated from `MeshArrays`."""
+    # Shared (V, 3) float32 buffer, indexed by tris, ngons & poles.
+    vertices: np.ndarray = dataclasses.field(
+        init=False,
+        default_factory=lambda: np.empty((0, 3), dtype=np.float32)
+    )
+    tris: face.Tris = dataclasses.field(
+        init=False,
+        default_factory=face.Tris.empty
+    )
+    ngons: face.Ngons = dataclasses.field(
+        init=False,
+        default_factory=face.Ngons.empty
+    )
+    n_poles: pole.Poles = dataclasses.field(
+        init=False,
+        default_factory=pole.Poles.empty
+    )
+    e_poles: pole.Poles = dataclasses.field(
+        init=False,
+        default_factory=pole.Poles.empty
+    )
+    star_poles: pole.Poles = dataclasses.field(
+        init=False,
+        default_factory=pole.Poles.empty
+    )
+
+    face_count: int = dataclasses.field(init=False, default=0)
+    tris_count: int = dataclasses.field(init=False, default=0)
+    quads_count: int = dataclasses.field(init=False, default=0)
+    ngons_count: int = dataclasses.field(init=False, default=0)
+    tesellated_tris_count: int = dataclasses.field(init=False, default=0)
+
+    tris_percentage: int = dataclasses.field(init=False, default=0)
+    quads_percentage: int = dataclasses.field(init=False, default=0)
+    ngons_percentage: int = dataclasses.field(init=False, default=0)
+
+    total_poles_count: int = dataclasses.field(init=False, default=0)
+
+    # Topology of the mesh the stats were calculated for, see
+    # `MeshArrays.topology_fingerprint`.
+    topology_fingerprint: typing.Optional[typing.Hashable] = \
+        dataclasses.field(init=False, default=None)
+    # Link face groups of each chunk of poles from the last full update,
+    # by pole kind, so refreshing flatness does not group them again.
+    _link_face_groups: typing.Dict[
+        str,
+        typing.List[typing.List[LinkFaceGroup]]
+    ] = dataclasses.field(init=False, repr=False, default_factory=dict)
+
+    # last_updated is in milliseconds.
+    last_updated: int = dataclasses.field(init=False, default=-1)
+
+    # Milliseconds taken by each stage of the last update.
+    stage_timings: typing.Dict[str, float] = \
+        dataclasses.field(init=False, default_factory=dict)
+
+    def __post_init__(self):
+        self._reset()
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated memory used by arrays of this mesh, in bytes."""
+        return self.vertices.nbytes \
+            + self.tris.nbytes \
+            + self.ngons.nbytes \
+            + self.n_poles.nbytes \
+            + self.e_poles.nbytes \
+            + self.star_poles.nbytes \
+            + sum(poles.nbytes + link_faces.nbytes
+                  for chunk_groups in self._link_face_groups.values()
+                  for groups in chunk_groups
+                  for (poles, link_faces) in groups)
+
+    def analyze(
+            self,
+            arrays: MeshArrays,
+            flat_threshold_angle: float
+    ) -> None:
+        self.stage_timings = {}
+        run(self.analyze_steps(arrays, flat_threshold_angle))
+
+    def analyze_steps(
+            self,
+            arrays: MeshArrays,
+            flat_threshold_angle: float
+    ) -> typing.Generator[float, None, None]:
+        """Update stats from arrays already read, yielding progress.
+
+        This does not access `bpy`, so it can run outside of the main
+        thread.
+        """
+        stages = self.stage_timings
+        topology_fingerprint = yield from scaled(
+            timing.measure_steps(
+                arrays.topology_fingerprint_steps(),
+                stages,
+                'fingerprint'
+            ),
+            0.0,
+            0.1
+        )
+        if topology_fingerprint == self.topology_fingerprint:
+            # Only vertex positions have changed (armatures, shape keys,
+            # deform modifiers...), counts & classifications still hold.
+            log.debug("Topology is unchanged.")
+            yield from scaled(
+                timing.measure_steps(
+                    self._refresh_positions(arrays, flat_threshold_angle),
+                    stages,
+                    'refresh'
+                ),
+                0.1,
+                1.0
+            )
+        else:
+            self._reset()
+
+            self.vertices = arrays.vertices
+            yield from scaled(
+                timing.measure_steps(
+                    self._calculate_faces(arrays),
+                    stages,
+                    'faces'
+                ),
+                0.1,
+                0.45
+            )
+            yield from scaled(
+                timing.measure_steps(
+                    self._calculate_poles(arrays, flat_threshold_angle),
+                    stages,
+                    'poles'
+                ),
+                0.45,
+                1.0
+            )
+            self.total_poles_count = len(self.n_poles) \
+                + len(self.e_poles) \
+                + len(self.star_poles)
+            self.topology_fingerprint = topology_fingerprint
+
+        self.last_updated = int(time.time_ns() / 1000000)
+
+    def _calculate_faces(
+            self,
+            arrays: MeshArrays
+    ) -> typing.Generator[float, None, None]:
+        face_count = len(arrays.loop_total)
+        tri_indices = []
+        tri_centers = []
+        ngon_counts = []
+        ngon_indices = []
+        for chunk in chunks(face_count):
+            loop_start = arrays.loop_start[chunk]
+            loop_total = arrays.loop_total[chunk]
+
+            tri_mask = loop_total == 3
+            tri_indices.append(arrays.loop_vertices[
+                loop_start[tri_mask, np.newaxis] + np.arange(3)
+            ])
+            tri_centers.append(arrays.vertices[tri_indices[-1]].mean(axis=1))
+            ngon_mask = loop_total > 4
+            ngon_counts.append(loop_total[ngon_mask])
+            ngon_indices.append(arrays.loop_vertices[ranges(
+                loop_start[ngon_mask],
+                loop_total[ngon_mask]
+            )])
+
+            # Counts so far.
+            self.face_count = chunk.stop
+            self.tris_count += int(np.count_nonzero(tri_mask))
+            self.ngons_count += int(np.count_nonzero(ngon_mask))
+            self.quads_count = self.face_count \
+                - self.tris_count \
+                - self.ngons_count
+            # A face with n corners tessellates into n - 2 triangles.
+            self.tesellated_tris_count += int(
+                np.sum(loop_total - 2, dtype=np.int64)
+            )
+            self._calculate_percentages()
+            yield chunk.stop / face_count
+
+        if face_count > 0:
+            self.tris = face.Tris(
+                indices=np.concatenate(tri_indices),
+                centers=np.concatenate(tri_centers)
+            )
+            self.ngons = face.Ngons(
+                offsets=row_offsets(np.concatenate(ngon_counts)),
+                indices=np.concatenate(ngon_indices)
+            )
+
+    def _calculate_percentages(self) -> None:
+        if self.face_count == 0:
+            return
+        (self.tris_percentage,
+         self.quads_percentage,
+         self.ngons_percentage) = percentages(
+            self.tris_count,
+            self.quads_count,
+            self.ngons_count
+        )
+
+    def _calculate_poles(
+            self,
+            arrays: MeshArrays,
+            flat_threshold_angle: float
+    ) -> typing.Generator[float, None, None]:
+        flat_threshold: float = math.cos(math.radians(flat_threshold_angle))
+        vertex_count = len(arrays.vertices)
+        edge_vertices = arrays.edge_vertices
+        # Progress is measured in elements visited by the passes below.
+        # Spokes & linked faces of poles are at most twice the edges & as
+        # many as the loops, poles at most the vertices.
+        step_count = 2 * len(arrays.loop_edges) \
+            + 6 * len(edge_vertices) \
+            + len(arrays.loop_total) \
+            + vertex_count
+        steps_done = 0
+
+        def progress(steps: int) -> float:
+            nonlocal steps_done
+            steps_done += steps
+            return min(1.0, steps_done / max(1, step_count))
+
+        # An edge is a boundary edge when exactly one face uses it.
+        edge_face_count = np.zeros(len(edge_vertices), dtype=np.int64)
+        for chunk in chunks(len(arrays.loop_edges)):
+            _add_counts(edge_face_count, arrays.loop_edges[chunk])
+            yield progress(chunk.stop - chunk.start)
+
+        edge_count = np.zeros(vertex_count, dtype=np.int64)
+        for chunk in chunks(len(edge_vertices)):
+            inner_edges = edge_vertices[chunk][edge_face_count[chunk] != 1]
+            _add_counts(edge_count, inner_edges.ravel())
+            yield progress(chunk.stop - chunk.start)
+
+        pole_mask = (edge_count == 3) | (edge_count >= 5)
+        if not np.any(pole_mask):
+            return
+
+        # Only linked edges & faces of poles are collected, so that grouping
+        # them by vertex does not need to sort the whole mesh.  Spokes are
+        # all linked edges, including the boundary edges.
+        spoke_key_chunks = []
+        spoke_value_chunks = []
+        for chunk in chunks(len(edge_vertices)):
+            for (this, other) in [(0, 1), (1, 0)]:
+                mask = pole_mask[edge_vertices[chunk, this]]
+                spoke_key_chunks.append(edge_vertices[chunk, this][mask])
+                spoke_value_chunks.append(edge_vertices[chunk, other][mask])
+            yield progress(chunk.stop - chunk.start)
+        spoke_keys = np.concatenate(spoke_key_chunks)
+        (spoke_offsets, spokes) = yield from scaled(
+            _csr_steps(
+                spoke_keys,
+                np.concatenate(spoke_value_chunks),
+                vertex_count
+            ),
+            progress(0),
+            progress(len(spoke_keys))
+        )
+
+        link_face_key_chunks = []
+        link_face_value_chunks = []
+        for chunk in chunks(len(arrays.loop_total)):
+            loop_total = arrays.loop_total[chunk]
+            loop_vertices = arrays.loop_vertices[
+                ranges(arrays.loop_start[chunk], loop_total)
+            ]
+            mask = pole_mask[loop_vertices]
+            link_face_key_chunks.append(loop_vertices[mask])
+            link_face_value_chunks.append(np.repeat(
+                np.arange(chunk.start, chunk.stop, dtype=np.int32),
+                loop_total
+            )[mask])
+            yield progress(chunk.stop - chunk.start)
+        link_face_count = sum(len(keys) for keys in link_face_key_chunks)
+        if link_face_count > 0:
+            link_face_keys = np.concatenate(link_face_key_chunks)
+            (link_face_offsets, link_faces) = yield from scaled(
+                _csr_steps(
+                    link_face_keys,
+                    np.concatenate(link_face_value_chunks),
+                    vertex_count
+                ),
+                progress(0),
+                progress(link_face_count)
+            )
+        else:
+            # Poles of wire edges only, e.g. a mesh without faces.
+            link_face_offsets = np.zeros(vertex_count + 1, dtype=np.int64)
+            link_faces = np.zeros(0, dtype=np.int32)
+
+        pole_vertices = np.flatnonzero(pole_mask)
+        pole_edge_count = edge_count[pole_vertices]
+        for (attr, mask) in [
+                ('n_poles', pole_edge_count == 3),
+                ('e_poles', pole_edge_count == 5),
+                ('star_poles', pole_edge_count > 5)
+        ]:
+            centers = pole_vertices[mask]
+            if len(centers) == 0:
+                continue
+            spoke_counts = spoke_offsets[centers + 1] - spoke_offsets[centers]
+            link_face_counts = link_face_offsets[centers + 1] \
+                - link_face_offsets[centers]
+
+            # Poles are processed in chunks with about `ANALYSIS_CHUNK_SIZE`
+            # linked faces.
+            chunk_size = max(
+                1,
+                constants.ANALYSIS_CHUNK_SIZE * len(centers)
+                // max(1, int(np.sum(link_face_counts)))
+            )
+            is_flat = []
+            pole_spokes = []
+            pole_link_faces = []
+            link_face_groups = []
+            for chunk in chunks(len(centers), chunk_size):
+                pole_spokes.append(spokes[ranges(
+                    spoke_offsets[centers[chunk]],
+                    spoke_counts[chunk]
+                )])
+                pole_link_faces.append(link_faces[ranges(
+                    link_face_offsets[centers[chunk]],
+                    link_face_counts[chunk]
+                )])
+                groups = _link_face_groups(
+                    row_offsets(link_face_counts[chunk]),
+                    pole_link_faces[-1]
+                )
+                is_flat.append(_is_flat(
+                    groups,
+                    chunk.stop - chunk.start,
+                    arrays.face_normals,
+                    flat_threshold
+                ))
+                link_face_groups.append([
+                    (poles + chunk.start, faces) for (poles, faces) in groups
+                ])
+                yield progress(chunk.stop - chunk.start)
+            self._link_face_groups[attr] = link_face_groups
+            setattr(self, attr, pole.Poles(
+                centers=centers.astype(np.int32),
+                is_flat=np.concatenate(is_flat),
+                spoke_offsets=row_offsets(spoke_counts),
+                spokes=np.concatenate(pole_spokes),
+                link_face_offsets=row_offsets(link_face_counts),
+                link_faces=np.concatenate(pole_link_faces)
+            ))
+
+    def _refresh_positions(
+            self,
+            arrays: MeshArrays,
+            flat_threshold_angle: float
+    ) -> typing.Generator[float, None, None]:
+        """Update what depends on vertex positions, keep the rest.
+
+        Only valid when topology of `arrays` has not changed since the last
+        full update.  Stats are replaced once all steps are done.
+        """
+        flat_threshold: float = math.cos(math.radians(flat_threshold_angle))
+        all_poles = [getattr(self, attr)
+                     for attr in ('n_poles', 'e_poles', 'star_poles')]
+        step_count = len(self.tris) + sum(len(p.link_faces)
+                                          for p in all_poles)
+        steps_done = 0
+
+        tri_centers = []
+        for chunk in chunks(len(self.tris)):
+            tri_centers.append(
+                arrays.vertices[self.tris.indices[chunk]].mean(axis=1)
+            )
+            steps_done += chunk.stop - chunk.start
+            yield steps_done / max(1, step_count)
+
+        is_flat = []
+        for (attr, poles) in zip(
+                ('n_poles', 'e_poles', 'star_poles'),
+                all_poles
+        ):
+            # Same chunks of about `ANALYSIS_CHUNK_SIZE` linked faces, and
+            # the same groups as in `_calculate_poles`.
+            pole_is_flat = np.zeros(len(poles), dtype=bool)
+            for groups in self._link_face_groups.get(attr, []):
+                for (pole_indices, link_faces) in groups:
+                    pole_is_flat[pole_indices] = _mean_dot_products(
+                        link_faces,
+                        arrays.face_normals
+                    ) > flat_threshold
+                    steps_done += link_faces.size
+                yield steps_done / max(1, step_count)
+            is_flat.append(pole_is_flat)
+
+        self.vertices = arrays.vertices
+        self.tris = dataclasses.replace(
+            self.tris,
+            centers=np.concatenate(
+                tri_centers or [np.zeros((0, 3), dtype=np.float32)]
+            )
+        )
+        for (attr, poles, refreshed_is_flat) in zip(
+                ('n_poles', 'e_poles', 'star_poles'),
+                all_poles,
+                is_flat
+        ):
+            setattr(self, attr, dataclasses.replace(
+                poles,
+                is_flat=refreshed_is_flat
+            ))
+
+    def _reset(self) -> None:
+        self.vertices = np.empty((0, 3), dtype=np.float32)
+        self.tris = face.Tris.empty()
+        self.ngons = face.Ngons.empty()
+        self.n_poles = pole.Poles.empty()
+        self.e_poles = pole.Poles.empty()
+        self.star_poles = pole.Poles.empty()
+        self.face_count = 0
+        self.tris_count = 0
+        self.quads_count = 0
+        self.ngons_count = 0
+        self.tesellated_tris_count = 0
+        self.tris_percentage = 0
+        self.quads_percentage = 0
+        self.ngons_percentage = 0
+        self.total_poles_count = 0
+        self.topology_fingerprint = None
+        self._link_face_groups = {}
+
+
+@dataclasses.dataclass(frozen=True)
+class Estimate:
+    """Estimated count with a confidence interval."""
+    value: float
+    low: float
+    high: float
+
+    @classmethod
+    def from_sample(
+            cls,
+            hits: int,
+            sample_size: int,
+            population: int
+    ) -> 'Estimate':
+        """Estimate how many of `population` are hits.
+
+        Interval is the Wilson score interval of the proportion of hits in
+        a sample drawn without replacement, so it does not collapse to a
+        single value when there are no hits in the sample.
+        """
+        if sample_size >= population:
+            return cls(float(hits), float(hits), float(hits))
+        z = constants.ESTIMATE_CONFIDENCE_Z
+        # Finite population correction, a sample of most of the population
+        # is as good as a larger sample from an infinite one.
+        n = sample_size * (population - 1) / (population - sample_size)
+        p = hits / sample_size
+        center = (p + z * z / (2 * n)) / (1 + z * z / n)
+        margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) \
+            / (1 + z * z / n)
+        return cls(
+            value=p * population,
+            low=max(0.0, center - margin) * population,
+            high=min(1.0, center + margin) * population
+        )
+
+    @property
+    def margin(self) -> float:
+        return max(self.high - self.value, self.value - self.low)
+
+    def scaled(self, factor: float) -> 'Estimate':
+        return Estimate(
+            self.value * factor,
+            self.low * factor,
+            self.high * factor
+        )
+
+
+@dataclasses.dataclass(eq=False)
+class Approximation:
+    """Face & pole counts estimated from a random sample.
+
+    Face & vertex counts are exact.
+    """
+    face_count: int
+    vertex_count: int
+    face_sample_size: int
+    vertex_sample_size: int
+    tris: Estimate
+    quads: Estimate
+    ngons: Estimate
+    n_poles: Estimate
+    e_poles: Estimate
+    star_poles: Estimate
+    total_poles: Estimate
+    stage_timings: typing.Dict[str, float] = \
+        dataclasses.field(default_factory=dict)
+
+    @classmethod
+    def from_samples(
+            cls,
+            face_count: int,
+            loop_total: np.ndarray,
+            vertex_count: int,
+            edge_count: np.ndarray
+    ) -> 'Approximation':
+        """Estimate counts given corner counts of sampled faces & inner
+        edge counts of sampled vertices."""
+        def faces(mask: np.ndarray) -> Estimate:
+            return Estimate.from_sample(
+                int(np.count_nonzero(mask)),
+                len(loop_total),
+                face_count
+            )
+
+        def vertices(mask: np.ndarray) -> Estimate:
+            return Estimate.from_sample(
+                int(np.count_nonzero(mask)),
+                len(edge_count),
+                vertex_count
+            )
+
+        return cls(
+            face_count=face_count,
+            vertex_count=vertex_count,
+            face_sample_size=len(loop_total),
+            vertex_sample_size=len(edge_count),
+            tris=faces(loop_total == 3),
+            quads=faces(loop_total == 4),
+            ngons=faces(loop_total > 4),
+            n_poles=vertices(edge_count == 3),
+            e_poles=vertices(edge_count == 5),
+            star_poles=vertices(edge_count > 5),
+            total_poles=vertices((edge_count == 3) | (edge_count >= 5))
+        )
+
+    def percentage(self, estimate: Estimate) -> Estimate:
+        """Estimated count of faces as a percentage of all faces."""
+        return estimate.scaled(100.0 / max(1, self.face_count))
+
+
+def sample(population: int, size: int) -> np.ndarray:
+    """Sorted random indices, the same ones for the same arguments."""
+    rng = np.random.default_rng(constants.ESTIMATE_SEED)
+    if size >= population:
+        return np.arange(population)
+    return np.sort(rng.choice(population, size, replace=False))
+
+
+def inner_edge_counts(
+        vertices: np.ndarray,
+        vertex_count: int,
+        edge_vertices: np.ndarray,
+        loop_edges: np.ndarray
+) -> np.ndarray:
+    """Number of non-boundary edges of each of the given vertices.
+
+    Only the edges linked to `vertices` are counted, which are found with a
+    pass over edges & loops instead of grouping the whole mesh.
+    """
+    sampled = np.zeros(vertex_count, dtype=bool)
+    sampled[vertices] = True
+    edge_mask = sampled[edge_vertices[:, 0]] | sampled[edge_vertices[:, 1]]
+    loop_edges = loop_edges[edge_mask[loop_edges]]
+    edge_face_count = np.bincount(loop_edges, minlength=len(edge_vertices))
+    # An edge is a boundary edge when exactly one face uses it.
+    ends = edge_vertices[edge_mask & (edge_face_count != 1)].ravel()
+    ends = ends[sampled[ends]]
+    # `vertices` are sorted, see `sample()`.
+    return np.bincount(
+        np.searchsorted(vertices, ends),
+        minlength=len(vertices)
+    )
+
+
+def grid(size: int) -> MeshArrays:
+    """Arrays of a `size` x `size` grid of quads."""
+    (i, j) = np.mgrid[0:size, 0:size]
+    v = (i * (size + 1) + j).ravel()
+    quads = np.stack((v, v + 1, v + size + 2, v + size + 1), axis=1)
+    (y, x) = np.mgrid[0:size + 1, 0:size + 1]
+    vertices = np.stack((x.ravel(), y.ravel(), np.zeros(x.size)), axis=1)
+    return MeshArrays.from_faces(
+        vertices,
+        np.full(len(quads), 4),
+        quads.ravel()
+    )
+
+
+def main(argv: typing.List[str]) -> None:
+    """Analyze a grid, so that analysis can be profiled without Blender.
+
+        python -m cProfile -s cumtime -m meshstats.analysis 1000
+    """
+    size = int(argv[0]) if argv else 1000
+    arrays = grid(size)
+    stats = Stats()
+    stats.analyze(arrays, constants.FLAT_THRESHOLD_ANGLE_DEFAULT)
+    print("{0} faces, {1} poles ({2})".format(
+        stats.face_count,
+        stats.total_poles_count,
+        ", ".join(
+            "{0} {1:.1f}ms".format(stage, ms)
+            for (stage, ms) in stats.stage_timings.items()
+        )
+    ))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
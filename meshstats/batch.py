@@ -0,0 +1,319 @@
+# <pep8-80 compliant>
+
+# meshstats is a Blender addon that provides mesh statistics.
+# Copyright (C) 2020  Atamert Ölçgen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+if "bpy" in locals():
+    import importlib
+    for mod in [constants, mesh]:  # noqa: F821
+        importlib.reload(mod)
+else:
+    # stdlib
+    import argparse
+    import concurrent.futures
+    import csv
+    import dataclasses
+    import hashlib
+    import json
+    import logging
+    import os
+    import subprocess
+    import time
+    import typing
+    # blender
+    import bpy
+    # addon
+    from . import constants
+    from . import mesh
+
+
+log = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class Record:
+    """Stats of one mesh object in a .blend file."""
+    file: str
+    object: str
+    mesh: str
+    # `OK`, or why the object is not analyzed.
+    status: str
+    vertex_count: int = 0
+    face_count: int = 0
+    tris_count: int = 0
+    quads_count: int = 0
+    ngons_count: int = 0
+    n_poles_count: int = 0
+    e_poles_count: int = 0
+    star_poles_count: int = 0
+    time_taken: int = 0  # milliseconds, 0 for linked duplicates
+
+
+FIELDS = [f.name for f in dataclasses.fields(Record)]
+
+
+class Manifest:
+    """Status of each .blend file in a batch, saved after every file.
+
+    Files that are done, and not modified since, are skipped when a batch
+    is run again.
+    """
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self.entries: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def is_done(self, blend_path: str) -> bool:
+        entry = self.entries.get(blend_path)
+        return entry is not None \
+            and entry["status"] == 'DONE' \
+            and entry["mtime"] == os.path.getmtime(blend_path) \
+            and os.path.exists(entry["part"])
+
+    def part(self, blend_path: str) -> str:
+        """Path of the file records of `blend_path` are written to."""
+        name = hashlib.sha1(blend_path.encode()).hexdigest()
+        return os.path.join(self.path + ".parts", name + ".json")
+
+    def set(self, blend_path: str, status: str, **kwargs) -> None:
+        self.entries[blend_path] = dict(
+            status=status,
+            mtime=os.path.getmtime(blend_path),
+            part=self.part(blend_path),
+            **kwargs
+        )
+        _write_json(self.path, self.entries)
+
+
+def analyze_objects(
+        context: bpy.types.Context,
+        objs: typing.Iterable[bpy.types.Object],
+        flat_threshold_angle: float = constants.FLAT_THRESHOLD_ANGLE_DEFAULT,
+        face_limit: typing.Optional[int] = None
+) -> typing.Iterator[Record]:
+    """Analyze mesh objects the same way `Mesh.update` does.
+
+    Linked duplicates are analyzed once.
+    """
+    file = bpy.data.filepath
+    depsgraph = context.evaluated_depsgraph_get()
+    analyzed: typing.Dict[mesh.CacheKey, mesh.Mesh] = {}
+    for obj in objs:
+        if obj.type != 'MESH':
+            continue
+        record = Record(file, obj.name, obj.data.name, 'OK')
+        if mesh.has_unsupported_modifiers(obj):
+            record.status = mesh.Eligibility.MODIFIER.name
+            yield record
+            continue
+        elif face_limit is not None and len(obj.data.polygons) > face_limit:
+            record.status = mesh.Eligibility.TOO_MANY_FACES.name
+            yield record
+            continue
+
+        cache_key = mesh.get_cache_key(obj)
+        mesh_data = analyzed.get(cache_key)
+        if mesh_data is None:
+            start = time.time_ns()
+            mesh_data = mesh.Mesh()
+            mesh_data.analyze(
+                mesh.MeshArrays.from_object(obj, depsgraph),
+                flat_threshold_angle
+            )
+            analyzed[cache_key] = mesh_data
+            record.time_taken = int((time.time_ns() - start) / 1_000_000)
+        record.vertex_count = len(mesh_data.vertices)
+        record.face_count = mesh_data.face_count
+        record.tris_count = mesh_data.tris_count
+        record.quads_count = mesh_data.quads_count
+        record.ngons_count = mesh_data.ngons_count
+        record.n_poles_count = len(mesh_data.n_poles)
+        record.e_poles_count = len(mesh_data.e_poles)
+        record.star_poles_count = len(mesh_data.star_poles)
+        yield record
+
+
+def find_blend_files(paths: typing.Iterable[str]) -> typing.List[str]:
+    blend_paths: typing.List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for (dirpath, _, filenames) in os.walk(path):
+                blend_paths.extend(
+                    os.path.join(dirpath, filename)
+                    for filename in filenames
+                    if filename.endswith(".blend")
+                )
+        else:
+            blend_paths.append(path)
+    return sorted(set(os.path.abspath(p) for p in blend_paths))
+
+
+def run_worker(args: argparse.Namespace) -> None:
+    """Analyze objects of the .blend file Blender is started with."""
+    context: bpy.types.Context = bpy.context
+    records = analyze_objects(
+        context,
+        context.view_layer.objects,
+        args.flat_threshold_angle,
+        args.face_limit
+    )
+    _write_json(args.worker, [dataclasses.asdict(r) for r in records])
+
+
+def run_batch(args: argparse.Namespace, script: str) -> int:
+    """Analyze files in a pool of Blender processes & write the report.
+
+    Returns the number of files that could not be analyzed.
+    """
+    manifest = Manifest(args.manifest or args.output + ".manifest.json")
+    os.makedirs(manifest.path + ".parts", exist_ok=True)
+    blend_paths = find_blend_files(args.paths)
+    pending = [p for p in blend_paths if not manifest.is_done(p)]
+    log.info("{0} file(s), {1} already done.".format(
+        len(blend_paths),
+        len(blend_paths) - len(pending)
+    ))
+
+    def analyze_file(blend_path: str) -> subprocess.CompletedProcess:
+        cmd = [
+            args.blender,
+            "--background",
+            "--factory-startup",
+            blend_path,
+            "--python-exit-code",
+            "1",
+            "--python",
+            script,
+            "--",
+            "--worker",
+            manifest.part(blend_path),
+            "--flat-threshold-angle",
+            str(args.flat_threshold_angle)
+        ]
+        if args.face_limit is not None:
+            cmd.extend(["--face-limit", str(args.face_limit)])
+        return subprocess.run(cmd, capture_output=True, text=True)
+
+    failed_count = 0
+    # Each thread waits on one Blender process.
+    with concurrent.futures.ThreadPoolExecutor(args.jobs) as executor:
+        futures = {executor.submit(analyze_file, p): p for p in pending}
+        for future in concurrent.futures.as_completed(futures):
+            blend_path = futures[future]
+            result = future.result()
+            if result.returncode == 0 \
+               and os.path.exists(manifest.part(blend_path)):
+                manifest.set(blend_path, 'DONE')
+                log.info("Analyzed '{}'.".format(blend_path))
+            else:
+                failed_count += 1
+                manifest.set(
+                    blend_path,
+                    'FAILED',
+                    returncode=result.returncode,
+                    stderr=result.stderr[-2000:]
+                )
+                log.error("Failed to analyze '{}'.".format(blend_path))
+
+    records = []
+    for blend_path in blend_paths:
+        if manifest.is_done(blend_path):
+            with open(manifest.part(blend_path)) as f:
+                records.extend(json.load(f))
+    write_report(args.output, records, args.format)
+    return failed_count
+
+
+def write_report(
+        path: str,
+        records: typing.List[typing.Dict[str, typing.Any]],
+        format_: typing.Optional[str] = None
+) -> None:
+    if format_ is None:
+        format_ = 'csv' if path.endswith(".csv") else 'json'
+    if format_ == 'csv':
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+    else:
+        _write_json(path, records)
+
+
+def parse_args(argv: typing.List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="batch.py",
+        description="Analyze mesh objects in .blend files."
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help=".blend files or directories to search for .blend files"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        default="meshstats.json",
+        help="report file, CSV if it ends with .csv, JSON otherwise"
+    )
+    parser.add_argument("--format", choices=['json', 'csv'])
+    parser.add_argument(
+        "--manifest",
+        help="job manifest, defaults to OUTPUT.manifest.json"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of Blender processes to run at once"
+    )
+    parser.add_argument(
+        "--blender",
+        default=bpy.app.binary_path or "blender",
+        help="Blender executable to run workers with"
+    )
+    parser.add_argument(
+        "--flat-threshold-angle",
+        type=float,
+        default=constants.FLAT_THRESHOLD_ANGLE_DEFAULT
+    )
+    parser.add_argument(
+        "--face-limit",
+        type=int,
+        help="skip meshes with more faces"
+    )
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: typing.List[str], script: str) -> int:
+    """Entry point of `script`, which is run by Blender."""
+    args = parse_args(argv)
+    if args.worker:
+        run_worker(args)
+        return 0
+    else:
+        return 1 if run_batch(args, script) > 0 else 0
+
+
+def _write_json(path: str, value: typing.Any) -> None:
+    # Written to a temporary file first, so that an interrupted run does
+    # not leave a partial file behind.
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(value, f, indent=2)
+    os.replace(tmp_path, path)
@@ -18,11 +18,39 @@
 
 ADDON_NAME = __package__
 
+# Number of faces, loops or edges processed in one step of an analysis.
+ANALYSIS_CHUNK_SIZE = 250_000
+# Number of elements sampled from each index array, other than loop edges,
+# to tell whether the topology of a mesh has changed.
+ANALYSIS_FINGERPRINT_SAMPLE_SIZE = 65_536
+# Maximum number of elements of the normal Gram matrices computed at once
+# to tell whether poles are on flat surfaces (float64, 8 MiB).
+ANALYSIS_GRAM_MATRIX_SIZE = 1024 * 1024
+# Maximum number of threads analyzing meshes of multiple objects.
+ANALYSIS_MAX_WORKERS = 8
+# Meshes with more faces are analyzed in steps from a timer, instead of
+# blocking the UI until the analysis is finished.
+ANALYSIS_SYNC_FACE_LIMIT = 100_000
+ANALYSIS_TICK_INTERVAL = 0.01  # seconds
+ANALYSIS_TIME_BUDGET = 0.05  # seconds
+
 DISABLED_BY_DEFAULT_DEFAULT = True
 
+# Meshes with more faces than `object_face_limit` are estimated from a
+# random sample of faces & vertices.
+ESTIMATE_CONFIDENCE_Z = 1.96  # 95% confidence
+ESTIMATE_FACE_SAMPLE_SIZE = 10_000
+ESTIMATE_LARGE_MESHES_DEFAULT = True
+ESTIMATE_SEED = 0
+ESTIMATE_VERTEX_SAMPLE_SIZE = 100_000
+
 FLAT_THRESHOLD_ANGLE_DEFAULT = 10.0  # degrees
 
-MESHDATA_TTL = 60_000  # milliseconds
+MAX_UPDATES_PER_SECOND_DEFAULT = 10.0
+MAX_UPDATES_PER_SECOND_MAX = 120.0
+MAX_UPDATES_PER_SECOND_MIN = 0.5
+
+MESHDATA_CACHE_SIZE = 512 * 1024 * 1024  # bytes
 
 MODIFIERS_WHITELISTED = [
     # Modify Group
@@ -61,10 +89,10 @@ MODIFIERS_WHITELISTED = [
     'SOFT_BODY'
 ]
 
-OBJECT_FACE_LIMIT_DEFAULT = 10_000
+OBJECT_FACE_LIMIT_DEFAULT = 100_000
 OBJECT_FACE_LIMIT_MAX = 10_000_000
 OBJECT_FACE_LIMIT_MIN = 1
-OBJECT_FACE_LIMIT_SOFT_MAX = 100_000
+OBJECT_FACE_LIMIT_SOFT_MAX = 1_000_000
 OBJECT_FACE_LIMIT_STEP = 1000
 
 OVERLAY_TRIS_COLOR_DEFAULT = (0.0, 1.0, 0.0, 0.7)
@@ -72,3 +100,25 @@ OVERLAY_NGONS_COLOR_DEFAULT = (0.0, 1.0, 1.0, 0.7)
 OVERLAY_N_POLES_COLOR_DEFAULT = (1.0, 0.334, 0.0, 0.8)
 OVERLAY_E_POLES_COLOR_DEFAULT = (1.0, 0.8, 0.0, 0.8)
 OVERLAY_STAR_POLES_COLOR_DEFAULT = (1.0, 0.0, 0.0, 0.8)
+
+# Overlay elements that fall into the same cell of a pixel grid are drawn
+# as a single marker, if there are more elements than `OVERLAY_LOD_MIN`.
+OVERLAY_LOD_CELL_SIZE = 8  # pixels
+OVERLAY_LOD_DEFAULT = True
+OVERLAY_LOD_MIN = 5000
+OVERLAY_POINT_SIZE = 8  # pixels
+OVERLAY_POINT_SIZE_MAX = 24  # pixels
+
+SHOW_TIMINGS_DEFAULT = False
+
+TIMING_HISTORY_SIZE = 20  # records
+
+TOTALS_BREAKDOWN_ROWS = 10
+
+TRACE_BUFFER_SIZE = 100_000  # events
+TRACE_ENABLED_DEFAULT = False
+
+VISIBILITY_CACHE_SIZE = 32  # entries
+# Overlay batches & clusters are kept only for the most recently used
+# visibility masks, they take much more memory than the masks.
+VISIBILITY_DERIVED_CACHE_SIZE = 16  # entries
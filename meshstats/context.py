@@ -28,3 +28,13 @@ def get_object(context=None):
        and context.active_object.type == 'MESH':
         obj = context.active_object
     return obj
+
+
+def tag_redraw(context=None):
+    """Redraw all 3D views."""
+    if context is None:
+        context = bpy.context
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
@@ -16,30 +16,55 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-import abc
 from dataclasses import dataclass
-from typing import Iterable, List, Tuple
 
-import mathutils
+import numpy as np
 
 
-class Face(abc.ABC):
-    vertices: Iterable[mathutils.Vector]
-    normal: mathutils.Vector
+@dataclass(frozen=True)
+class Tris:
+    """Triangles stored as indices into a shared vertex buffer."""
+    # (T, 3) int32 vertex indices.
+    indices: np.ndarray
+    # (T, 3) float32 median centers.
+    centers: np.ndarray
 
+    def __len__(self) -> int:
+        return len(self.indices)
 
-@dataclass(frozen=True)
-class FaceTri(Face):
-    center: mathutils.Vector
-    vertices: Tuple[
-        mathutils.Vector,
-        mathutils.Vector,
-        mathutils.Vector
-    ]
-    normal: mathutils.Vector
+    @property
+    def nbytes(self) -> int:
+        return self.indices.nbytes + self.centers.nbytes
+
+    @classmethod
+    def empty(cls) -> 'Tris':
+        return cls(
+            indices=np.empty((0, 3), dtype=np.int32),
+            centers=np.empty((0, 3), dtype=np.float32)
+        )
 
 
 @dataclass(frozen=True)
-class FaceNgon(Face):
-    vertices: List[mathutils.Vector]
-    normal: mathutils.Vector
+class Ngons:
+    """Ngons stored as CSR arrays of indices into a shared vertex buffer.
+
+    Vertex indices of ngon `i` are `indices[offsets[i]:offsets[i + 1]]`.
+    """
+    # (N + 1,) int32 offsets into `indices`.
+    offsets: np.ndarray
+    # int32 vertex indices of all ngons, concatenated.
+    indices: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        return self.offsets.nbytes + self.indices.nbytes
+
+    @classmethod
+    def empty(cls) -> 'Ngons':
+        return cls(
+            offsets=np.zeros(1, dtype=np.int32),
+            indices=np.empty(0, dtype=np.int32)
+        )
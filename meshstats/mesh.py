@@ -18,31 +18,97 @@
 
 if "bpy" in locals():
     import importlib
-    for mod in [constants, meshstats_context, face, pole, props]:  # noqa: F821
+    for mod in [  # noqa: F821
+            analysis,
+            constants,
+            meshstats_context,
+            props,
+            timing,
+            trace
+    ]:
         importlib.reload(mod)
 else:
     # stdlib
+    import collections
+    import concurrent.futures
     import copy
     import dataclasses
     import enum
     import time
     import typing
-    import itertools
     import logging
-    import math
-    import statistics
     # blender
-    import bmesh
     import bpy
-    import mathutils
+    import numpy as np
     # addon
-    from . import constants
+    from . import (analysis, constants)
     from . import context as meshstats_context
-    from . import (face, pole, props)
+    from . import (props, timing, trace)
 
 
 log = logging.getLogger(__name__)
 
+# Generation of the cache & values of preferences a `Mesh` is calculated with.
+Stamp = typing.Tuple[int, float]
+
+# Stamp of entries whose geometry is updated, it matches no generation.
+STALE: Stamp = (-1, 0.0)
+
+# `session_uid` of the mesh datablock & of the object if its modifiers
+# change the evaluated mesh.
+CacheKey = typing.Tuple[int, typing.Optional[int]]
+
+
+class MeshArrays(analysis.MeshArrays):
+    """Flat arrays read from a mesh datablock with `foreach_get`."""
+    @classmethod
+    def from_mesh(cls, me: bpy.types.Mesh) -> 'MeshArrays':
+        vertices = np.empty(len(me.vertices) * 3, dtype=np.float32)
+        me.vertices.foreach_get("co", vertices)
+        loop_vertices = np.empty(len(me.loops), dtype=np.int32)
+        me.loops.foreach_get("vertex_index", loop_vertices)
+        loop_edges = np.empty(len(me.loops), dtype=np.int32)
+        me.loops.foreach_get("edge_index", loop_edges)
+        edge_vertices = np.empty(len(me.edges) * 2, dtype=np.int32)
+        me.edges.foreach_get("vertices", edge_vertices)
+        loop_start = np.empty(len(me.polygons), dtype=np.int32)
+        me.polygons.foreach_get("loop_start", loop_start)
+        loop_total = np.empty(len(me.polygons), dtype=np.int32)
+        me.polygons.foreach_get("loop_total", loop_total)
+        face_normals = np.empty(len(me.polygons) * 3, dtype=np.float32)
+        me.polygons.foreach_get("normal", face_normals)
+        return cls(
+            vertices=vertices.reshape(-1, 3),
+            loop_vertices=loop_vertices,
+            loop_edges=loop_edges,
+            edge_vertices=edge_vertices.reshape(-1, 2),
+            loop_start=loop_start,
+            loop_total=loop_total,
+            face_normals=face_normals.reshape(-1, 3)
+        )
+
+    @classmethod
+    def from_object(
+            cls,
+            obj: bpy.types.Object,
+            depsgraph: bpy.types.Depsgraph,
+            copy: bool = False
+    ) -> 'MeshArrays':
+        """Read arrays from the evaluated mesh of `obj`.
+
+        Evaluated mesh datablock is read in place, so deformations from
+        armatures, shape keys and modifiers are included without making a
+        copy of the mesh.  Pass `copy=True` to read from a temporary mesh
+        made with `to_mesh()` instead.
+        """
+        obj_eval = obj.evaluated_get(depsgraph)
+        if not copy:
+            return cls.from_mesh(obj_eval.data)
+        try:
+            return cls.from_mesh(obj_eval.to_mesh())
+        finally:
+            obj_eval.to_mesh_clear()
+
 
 class Eligibility(enum.Enum):
     OK = 1
@@ -51,47 +117,8 @@ class Eligibility(enum.Enum):
     DISABLED = 10
 
 
-@dataclasses.dataclass(eq=False)
-class Mesh:
-    tris: typing.List[face.FaceTri] = dataclasses.field(
-        init=False,
-        default_factory=list
-    )
-    ngons: typing.List[face.FaceNgon] = dataclasses.field(
-        init=False,
-        default_factory=list
-    )
-    n_poles: typing.List[pole.NPole] = dataclasses.field(
-        init=False,
-        default_factory=list
-    )
-    e_poles: typing.List[pole.EPole] = dataclasses.field(
-        init=False,
-        default_factory=list
-    )
-    star_poles: typing.List[pole.StarPole] = dataclasses.field(
-        init=False,
-        default_factory=list
-    )
-
-    face_count: int = dataclasses.field(init=False, default=0)
-    tris_count: int = dataclasses.field(init=False, default=0)
-    quads_count: int = dataclasses.field(init=False, default=0)
-    ngons_count: int = dataclasses.field(init=False, default=0)
-    tesellated_tris_count: int = dataclasses.field(init=False, default=0)
-
-    tris_percentage: int = dataclasses.field(init=False, default=0)
-    quads_percentage: int = dataclasses.field(init=False, default=0)
-    ngons_percentage: int = dataclasses.field(init=False, default=0)
-
-    total_poles_count: int = dataclasses.field(init=False, default=0)
-
-    # last_updated is in milliseconds.
-    last_updated: int = dataclasses.field(init=False, default=-1)
-
-    def __post_init__(self):
-        self._reset()
-
+class Mesh(analysis.Stats):
+    """Stats of a mesh object, read from its evaluated mesh."""
     def face_budget_utilization(
             self,
             obj_props: props.MeshstatsObjectProperties
@@ -113,223 +140,574 @@ class Mesh:
         else:
             return None
 
+    @trace.traced("Mesh.update")
     def update(
             self,
             context: bpy.types.Context,
             obj: bpy.types.Object
     ) -> None:
-        bm = bmesh.new()
-        # Using `from_object` instead of `from_mesh` allows overlays to be
-        # displayed correctly on deformed meshes.
-        bm.from_object(obj, context.evaluated_depsgraph_get())
-
-        self._reset()
+        analysis.run(self.update_steps(context, obj))
 
+    def update_steps(
+            self,
+            context: bpy.types.Context,
+            obj: bpy.types.Object
+    ) -> typing.Generator[float, None, None]:
+        """Update stats in steps, yielding progress (0.0 to 1.0) in between.
+
+        Mesh data is read in the first step, subsequent steps only work on
+        the arrays read.  Counts & percentages are updated as faces are
+        processed, everything else is consistent only after the last
+        step.
+        """
+        # Cached meshes are copied for jobs, timings must not be shared.
+        self.stage_timings = {}
+        with timing.measure(self.stage_timings, 'read'):
+            # Reading the evaluated object (instead of `obj.data`) allows
+            # overlays to be displayed correctly on deformed meshes.
+            arrays = MeshArrays.from_object(
+                obj,
+                context.evaluated_depsgraph_get()
+            )
+        log.debug(
+            "Read mesh arrays of '{0}' in {1:.1f}ms.".format(
+                obj.data.name,
+                self.stage_timings['read']
+            )
+        )
         addon_prefs = context.preferences.addons[constants.ADDON_NAME] \
                                          .preferences
+        yield 0.05
 
-        self._calculate_faces(bm)
-        self._calculate_poles(bm, addon_prefs.flat_threshold_angle)
-
-        self._calculate_counts(bm)
-        self._calculate_percentages()
-
-        bm.free()
-
-        self.last_updated = int(time.time_ns() / 1000000)
-
-    def _calculate_counts(self, bm: bmesh.types.BMesh) -> None:
-        self.face_count = len(bm.faces)
-        self.tris_count = len(self.tris)
-        self.ngons_count = len(self.ngons)
-        self.quads_count = self.face_count - self.tris_count - self.ngons_count
-        self.tesellated_tris_count = len(bm.calc_loop_triangles())
-        self.total_poles_count = len(self.n_poles) \
-            + len(self.e_poles) \
-            + len(self.star_poles)
-
-    def _calculate_faces(self,
-                         bm: bmesh.types.BMesh) -> None:
-        for face_ in bm.faces:
-            if len(face_.loops) == 3:
-                vertices = [copy.deepcopy(x.vert.co) for x in face_.loops]
-                center = face_.calc_center_median()
-                self.tris.append(
-                    face.FaceTri(
-                        center=center,
-                        vertices=typing.cast(typing.Tuple[mathutils.Vector,
-                                                          mathutils.Vector,
-                                                          mathutils.Vector],
-                                             tuple(vertices)),
-                        normal=copy.deepcopy(face_.normal)
-                    )
-                )
-                del vertices, center
-            elif len(face_.loops) > 4:
-                vertices = [copy.deepcopy(x.vert.co) for x in face_.loops]
-                self.ngons.append(
-                    face.FaceNgon(
-                        vertices=vertices,
-                        normal=copy.deepcopy(face_.normal),
-                    )
-                )
-                del vertices
-
-    def _calculate_percentages(self) -> None:
-        self.tris_percentage = int(self.tris_count * 100.0 / self.face_count)
-        self.quads_percentage = int(self.quads_count * 100.0 / self.face_count)
-        self.ngons_percentage = int(self.ngons_count * 100.0 / self.face_count)
-
-        # Percentage is not zero if there is at least one face
-        if self.tris_count > 0:
-            self.tris_percentage = max(1, self.tris_percentage)
-        if self.quads_count > 0:
-            self.quads_percentage = max(1, self.quads_percentage)
-        if self.ngons_count > 0:
-            self.ngons_percentage = max(1, self.ngons_percentage)
-
-        # Adjust if the sum is not 100
-        while (self.tris_percentage
-               + self.quads_percentage
-               + self.ngons_percentage) > 100:
-            if self.quads_percentage > self.tris_percentage \
-               and self.quads_percentage > self.ngons_percentage:
-                self.quads_percentage -= 1
-            elif self.tris_percentage > self.ngons_percentage:
-                self.tris_percentage -= 1
-            else:
-                self.ngons_percentage -= 1
-        while (self.tris_percentage
-               + self.quads_percentage
-               + self.ngons_percentage) < 100:
-            if self.ngons_percentage < self.quads_percentage \
-               and self.ngons_percentage < self.tris_percentage \
-               and self.ngons_percentage > 0:
-                self.ngons_percentage += 1
-            elif self.tris_percentage < self.quads_percentage \
-                    and self.tris_percentage > 0:
-                self.tris_percentage += 1
-            else:
-                self.quads_percentage += 1
+        yield from analysis.scaled(
+            self.analyze_steps(arrays, addon_prefs.flat_threshold_angle),
+            0.05,
+            1.0
+        )
 
-    def _calculate_poles(
-            self,
-            bm: bmesh.types.BMesh,
-            flat_threshold_angle: float
-    ) -> None:
-        flat_threshold: float = math.cos(math.radians(flat_threshold_angle))
-        for vertex in bm.verts:
-            edge_count = len(
-                [edge for edge in vertex.link_edges if not edge.is_boundary]
-            )
-            if edge_count == 3 or edge_count >= 5:
-                mean_dot_product: float = statistics.mean(map(
-                    lambda normals: abs(normals[0].dot(normals[1])),
-                    itertools.combinations(
-                        [f.normal for f in vertex.link_faces],
-                        2
-                    )
-                ))
-                is_flat: bool = mean_dot_product > flat_threshold
-                spokes = copy.deepcopy(
-                    [e.other_vert(vertex).co for e in vertex.link_edges]
-                )
-                if edge_count == 3:
-                    self.n_poles.append(pole.NPole(
-                        center=copy.deepcopy(vertex.co),
-                        is_flat=is_flat,
-                        spokes=typing.cast(typing.Tuple[mathutils.Vector,
-                                                        mathutils.Vector,
-                                                        mathutils.Vector],
-                                           tuple(spokes))
-                    ))
-                elif edge_count == 5:
-                    self.e_poles.append(pole.EPole(
-                        center=copy.deepcopy(vertex.co),
-                        is_flat=is_flat,
-                        spokes=typing.cast(typing.Tuple[mathutils.Vector,
-                                                        mathutils.Vector,
-                                                        mathutils.Vector,
-                                                        mathutils.Vector,
-                                                        mathutils.Vector],
-                                           tuple(spokes))
-                    ))
-                elif edge_count > 5:
-                    self.star_poles.append(pole.StarPole(
-                        center=copy.deepcopy(vertex.co),
-                        is_flat=is_flat,
-                        spokes=list(spokes)
-                    ))
-
-    def _reset(self) -> None:
-        self.tris = []
-        self.ngons = []
-        self.n_poles = []
-        self.e_poles = []
-        self.star_poles = []
-        self.face_count = 0
-        self.tris_count = 0
-        self.quads_count = 0
-        self.ngons_count = 0
-        self.tris_percentage = 0
-        self.quads_percentage = 0
-        self.ngons_percentage = 0
 
+@dataclasses.dataclass(frozen=True)
+class Counts:
+    """Counts of a `Mesh`, all that totals need of it."""
+    face_count: int = 0
+    tris_count: int = 0
+    quads_count: int = 0
+    ngons_count: int = 0
+    n_poles_count: int = 0
+    e_poles_count: int = 0
+    star_poles_count: int = 0
+
+    @classmethod
+    def from_mesh(cls, mesh_: Mesh) -> 'Counts':
+        return cls(
+            face_count=mesh_.face_count,
+            tris_count=mesh_.tris_count,
+            quads_count=mesh_.quads_count,
+            ngons_count=mesh_.ngons_count,
+            n_poles_count=len(mesh_.n_poles),
+            e_poles_count=len(mesh_.e_poles),
+            star_poles_count=len(mesh_.star_poles)
+        )
 
-class Cache:
-    def __init__(self):
-        self.d = {}
+    @property
+    def total_poles_count(self) -> int:
+        return self.n_poles_count + self.e_poles_count + self.star_poles_count
+
+
+@trace.traced("approximate")
+def approximate(
+        context: bpy.types.Context,
+        obj: bpy.types.Object
+) -> analysis.Approximation:
+    """Estimate stats of `obj` from a random sample of faces & vertices.
+
+    Corner counts are read only for the sampled faces.  Edges & loops are
+    read in full, as Blender does not expose the edges of a vertex, but
+    they are only scanned once.
+    """
+    stages: typing.Dict[str, float] = {}
+    me = obj.evaluated_get(context.evaluated_depsgraph_get()).data
+    face_count = len(me.polygons)
+    vertex_count = len(me.vertices)
+    with timing.measure(stages, 'read'):
+        polygons = me.polygons
+        loop_total = np.fromiter(
+            (polygons[int(i)].loop_total for i in analysis.sample(
+                face_count,
+                constants.ESTIMATE_FACE_SAMPLE_SIZE
+            )),
+            dtype=np.int32
+        )
+        edge_vertices = np.empty(len(me.edges) * 2, dtype=np.int32)
+        me.edges.foreach_get("vertices", edge_vertices)
+        loop_edges = np.empty(len(me.loops), dtype=np.int32)
+        me.loops.foreach_get("edge_index", loop_edges)
+    with timing.measure(stages, 'poles'):
+        edge_count = analysis.inner_edge_counts(
+            analysis.sample(
+                vertex_count,
+                constants.ESTIMATE_VERTEX_SAMPLE_SIZE
+            ),
+            vertex_count,
+            edge_vertices.reshape(-1, 2),
+            loop_edges
+        )
+    approximation = analysis.Approximation.from_samples(
+        face_count,
+        loop_total,
+        vertex_count,
+        edge_count
+    )
+    approximation.stage_timings = stages
+    return approximation
 
+
+@dataclasses.dataclass(eq=False)
+class Job:
+    """Time-sliced update of a cached mesh.
+
+    `mesh` is a copy of the cached `Mesh` (if any) that is being updated,
+    it replaces the cached one once all steps are run.
+    """
+    obj_name: str
+    mesh: Mesh
+    steps: typing.Generator[float, None, None]
+    stamp: Stamp
+    progress: float = 0.0
+    started: int = dataclasses.field(default_factory=time.time_ns)
+    # Whether the mesh has changed since the job started.
+    restart: bool = False
+
+
+class Cache:
+    """Least recently used cache of `Mesh` data, bounded by memory use.
+
+    Entries are keyed by mesh datablocks, so that linked duplicates share
+    the same entry, unless they have modifiers.  When the estimated
+    memory used by all entries exceeds `max_bytes`, least recently used
+    entries are evicted.
+
+    Entries do not expire.  Each entry is stamped with the cache
+    `generation` and the preferences it is calculated with, it is
+    recalculated when either of them change.  Geometry updates of the
+    active object are handled by the scheduler, other objects are marked
+    stale with `expire()`.  `invalidate()` is called on undo & redo.
+
+    Entries whose update fails are marked as failed with the stamp they
+    failed with, they are not updated again until either the stamp
+    changes or their geometry is updated.
+    """
+    def __init__(self, max_bytes: int = constants.MESHDATA_CACHE_SIZE):
+        self.d: typing.OrderedDict[CacheKey, Mesh] = \
+            collections.OrderedDict()
+        self.jobs: typing.Dict[CacheKey, Job] = {}
+        self.max_bytes = max_bytes
+        self.generation = 0
+        self._stamps: typing.Dict[CacheKey, Stamp] = {}
+        # Estimates of meshes with too many faces, they are small enough
+        # not to be counted towards `max_bytes`.
+        self.estimates: typing.Dict[
+            CacheKey,
+            typing.Tuple[Stamp, analysis.Approximation]
+        ] = {}
+        # Names of objects to estimate, by a timer, as sampling a large
+        # mesh takes too long for a panel to wait for it.
+        self.estimate_queue: typing.Dict[CacheKey, str] = {}
+        # Counts of every entry stored, kept when the entry is evicted, so
+        # that totals of many meshes do not thrash the cache.
+        self.counts: typing.Dict[CacheKey, typing.Tuple[Stamp, Counts]] = {}
+        self.failed: typing.Dict[CacheKey, Stamp] = {}
+        # Diagnostics
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sizes: typing.Dict[CacheKey, int] = {}
+
+    @trace.traced("Cache.get")
     def get(
             self,
             context: bpy.types.Context,
             obj: bpy.types.Object
     ) -> typing.Optional[Mesh]:
-        self._evict_expired()
         assert obj.type == 'MESH'
-        cache_key = hash(obj)
-        if self.d.get(cache_key) is None:
+        cache_key = get_cache_key(obj)
+        cached = self.d.get(cache_key)
+        if cached is not None \
+           and self._stamps[cache_key] == self._stamp(context):
+            self.hits += 1
+            self.d.move_to_end(cache_key)
+            return cached
+        self.misses += 1
+        if cache_key not in self.jobs \
+           and self.failed.get(cache_key) != self._stamp(context):
             self.update(context, obj)
+        # Stale data is returned while a job is recalculating it.
         return self.d.get(cache_key)
 
+    def estimate(
+            self,
+            context: bpy.types.Context,
+            obj: bpy.types.Object
+    ) -> typing.Optional[analysis.Approximation]:
+        """Estimate of `obj`, it is queued if it is not up to date.
+
+        Stale estimates are returned until the queued one is done, `None`
+        if there is no estimate yet.
+        """
+        assert obj.type == 'MESH'
+        cache_key = get_cache_key(obj)
+        cached = self.estimates.get(cache_key)
+        stamp = self._stamp(context)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        if self.failed.get(cache_key) != stamp:
+            self.queue_estimate(obj)
+        return cached[1] if cached is not None else None
+
+    def queue_estimate(self, obj: bpy.types.Object) -> None:
+        self.estimate_queue[get_cache_key(obj)] = obj.name
+        if not bpy.app.timers.is_registered(_run_estimates):
+            bpy.app.timers.register(_run_estimates)
+
+    def is_estimating(self, obj: bpy.types.Object) -> bool:
+        return get_cache_key(obj) in self.estimate_queue
+
+    def get_counts(
+            self,
+            context: bpy.types.Context,
+            obj: bpy.types.Object
+    ) -> typing.Optional[Counts]:
+        """Counts of `obj`, even if its entry is evicted.
+
+        Stale counts are returned while a job is recalculating them,
+        `None` if there are no up to date counts otherwise.
+        """
+        cache_key = get_cache_key(obj)
+        cached = self.counts.get(cache_key)
+        if cached is None:
+            return None
+        elif cached[0] == self._stamp(context) or cache_key in self.jobs:
+            return cached[1]
+        else:
+            return None
+
+    def is_failed(
+            self,
+            context: bpy.types.Context,
+            obj: bpy.types.Object
+    ) -> bool:
+        """Whether the last update of `obj` failed with the current stamp."""
+        return self.failed.get(get_cache_key(obj)) == self._stamp(context)
+
+    def invalidate(self) -> None:
+        """Mark all entries, including the ones being calculated, stale."""
+        self.generation += 1
+        self.failed.clear()
+        for job in self.jobs.values():
+            job.restart = True
+
+    def expire(self, obj: bpy.types.Object) -> None:
+        """Mark entries of `obj` stale, after its geometry is updated.
+
+        Stale entries are kept, they are shown & their topology is reused
+        until they are recalculated.
+        """
+        cache_key = get_cache_key(obj)
+        if cache_key in self._stamps:
+            self._stamps[cache_key] = STALE
+        if cache_key in self.estimates:
+            self.estimates[cache_key] = (STALE, self.estimates[cache_key][1])
+        if cache_key in self.counts:
+            self.counts[cache_key] = (STALE, self.counts[cache_key][1])
+        # Updated geometry may not fail.
+        self.failed.pop(cache_key, None)
+        job = self.jobs.get(cache_key)
+        if job is not None:
+            job.restart = True
+
+    def job(self, obj: bpy.types.Object) -> typing.Optional[Job]:
+        return self.jobs.get(get_cache_key(obj))
+
+    def stats(self) -> typing.Dict[str, int]:
+        return {
+            "entries": len(self.d),
+            "jobs": len(self.jobs),
+            "nbytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "failed": len(self.failed),
+        }
+
+    @trace.traced("Cache.update")
     def update(
             self,
             context: bpy.types.Context,
             obj: bpy.types.Object
     ) -> None:
-        self._evict_expired()
-        start = time.time_ns()
         assert obj.type == 'MESH'
-        cache_key = hash(obj)
+        if len(obj.data.polygons) > constants.ANALYSIS_SYNC_FACE_LIMIT:
+            self._start_job(obj)
+            return
+        start = time.time_ns()
+        cache_key = get_cache_key(obj)
+        stamp = self._stamp(context)
         cached = self.d.get(cache_key)
-        if cached is None:
-            cached = Mesh()
-            self.d[cache_key] = cached
-        cached.update(context, obj)
+        # Cached data is kept as it is if the update fails.
+        mesh_ = copy.copy(cached) if cached is not None else Mesh()
+        try:
+            mesh_.update(context, obj)
+        except Exception:
+            self._fail(cache_key, stamp, obj.name)
+            return
+        self._store(cache_key, mesh_, stamp)
         time_taken = int((time.time_ns() - start) / 1_000_000)
+        record = timing.Record(obj.name, 'UPDATE', mesh_.stage_timings)
+        timing.history.add(record)
+        log.info(
+            "Updated meshstats data for '{0}' in {1}ms ({2}).".format(
+                obj.data.name,
+                time_taken,
+                record.format_stages()
+            )
+        )
+
+    def update_estimate(
+            self,
+            context: bpy.types.Context,
+            obj: bpy.types.Object
+    ) -> analysis.Approximation:
+        approximation = approximate(context, obj)
+        self.estimates[get_cache_key(obj)] = \
+            (self._stamp(context), approximation)
+        record = timing.Record(
+            obj.name,
+            'ESTIMATE',
+            approximation.stage_timings
+        )
+        timing.history.add(record)
         log.info(
-            "Updated meshstats data for '{0}' in {1}ms.".format(
+            "Estimated meshstats data for '{0}' in {1:.0f}ms ({2}).".format(
                 obj.data.name,
+                record.total,
+                record.format_stages()
+            )
+        )
+        return approximation
+
+    @trace.traced("Cache.update_all")
+    def update_all(
+            self,
+            context: bpy.types.Context,
+            objs: typing.Iterable[bpy.types.Object]
+    ) -> None:
+        """Update multiple objects, analyzing them concurrently.
+
+        Mesh arrays are read on the main thread, as `bpy` is not thread
+        safe.  Analysis runs on a thread pool, NumPy releases the GIL for
+        most of it.  Meshes too large to analyze synchronously are
+        updated in jobs instead, meshes that already have a job are
+        skipped.  A mesh that fails to update is marked as failed, the
+        others are still updated.
+        """
+        start = time.time_ns()
+        stamp = self._stamp(context)
+        depsgraph = context.evaluated_depsgraph_get()
+        pending: typing.List[
+            typing.Tuple[CacheKey, str, Mesh, MeshArrays, float]
+        ] = []
+        for obj in objs:
+            assert obj.type == 'MESH'
+            cache_key = get_cache_key(obj)
+            if cache_key in self.jobs:
+                # Restarting it would analyze the mesh again from scratch.
+                continue
+            elif len(obj.data.polygons) > constants.ANALYSIS_SYNC_FACE_LIMIT:
+                self._start_job(obj)
+                continue
+            cached = self.d.get(cache_key)
+            mesh_ = copy.copy(cached) if cached is not None else Mesh()
+            read_timings: typing.Dict[str, float] = {}
+            try:
+                with timing.measure(read_timings, 'read'):
+                    arrays = MeshArrays.from_object(obj, depsgraph)
+            except Exception:
+                self._fail(cache_key, stamp, obj.name)
+                continue
+            pending.append(
+                (cache_key, obj.name, mesh_, arrays, read_timings['read'])
+            )
+        if not pending:
+            return
+
+        flat_threshold_angle = stamp[1]
+        max_workers = min(constants.ANALYSIS_MAX_WORKERS, len(pending))
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+            futures = [
+                executor.submit(mesh_.analyze, arrays, flat_threshold_angle)
+                for (_, _, mesh_, arrays, _) in pending
+            ]
+            for (item, future) in zip(pending, futures):
+                (cache_key, name, mesh_, _, read_time) = item
+                try:
+                    future.result()
+                except Exception:
+                    self._fail(cache_key, stamp, name)
+                    continue
+                mesh_.stage_timings['read'] = read_time
+                self._store(cache_key, mesh_, stamp)
+                timing.history.add(
+                    timing.Record(name, 'UPDATE', mesh_.stage_timings)
+                )
+        time_taken = int((time.time_ns() - start) / 1_000_000)
+        log.info(
+            "Updated meshstats data for {0} mesh(es) in {1}ms.".format(
+                len(pending),
                 time_taken
             )
         )
 
-    def _evict_expired(self):
-        now = int(time.time_ns() / 1_000_000)
-        expired_set = set()
-        for (cache_key, m) in self.d.items():
-            if m.last_updated + constants.MESHDATA_TTL < now:
-                expired_set.add(cache_key)
-        for k in expired_set:
-            log.debug("Evicting {} from cache".format(cache_key))
-            del self.d[k]
-        del expired_set
-        log.debug("{} items in cache.".format(len(self.d)))
+    def cancel_jobs(self) -> None:
+        self.jobs.clear()
+        self.estimate_queue.clear()
+        for timer in (_run_jobs, _run_estimates):
+            if bpy.app.timers.is_registered(timer):
+                bpy.app.timers.unregister(timer)
+
+    @trace.traced("Cache.run_estimates")
+    def run_estimates(
+            self,
+            context: bpy.types.Context,
+            budget: float
+    ) -> bool:
+        """Estimate queued objects for up to `budget` seconds.
+
+        Returns whether there are still objects queued.
+        """
+        deadline = time.monotonic() + budget
+        while self.estimate_queue and time.monotonic() < deadline:
+            cache_key = next(iter(self.estimate_queue))
+            name = self.estimate_queue.pop(cache_key)
+            obj = context.blend_data.objects.get(name)
+            if obj is None or obj.type != 'MESH' or not is_estimated(obj):
+                continue
+            try:
+                self.update_estimate(context, obj)
+            except Exception:
+                self._fail(cache_key, self._stamp(context), name)
+        return len(self.estimate_queue) > 0
+
+    @trace.traced("Cache.run_jobs")
+    def run_jobs(self, context: bpy.types.Context, budget: float) -> bool:
+        """Run steps of pending jobs for up to `budget` seconds.
+
+        Returns whether there are still jobs pending.
+        """
+        deadline = time.monotonic() + budget
+        for (cache_key, job) in list(self.jobs.items()):
+            try:
+                while time.monotonic() < deadline:
+                    job.progress = next(job.steps)
+            except StopIteration:
+                del self.jobs[cache_key]
+                self._store(cache_key, job.mesh, job.stamp)
+                time_taken = int((time.time_ns() - job.started) / 1_000_000)
+                record = timing.Record(
+                    job.obj_name,
+                    'UPDATE',
+                    job.mesh.stage_timings
+                )
+                timing.history.add(record)
+                log.info(
+                    "Updated meshstats data for '{0}' in {1}ms ({2}).".format(
+                        job.obj_name,
+                        time_taken,
+                        record.format_stages()
+                    )
+                )
+                obj = context.blend_data.objects.get(job.obj_name)
+                if job.restart and obj is not None:
+                    self._start_job(obj)
+            except ReferenceError:
+                # Object was removed while it was being read.
+                del self.jobs[cache_key]
+            except Exception:
+                # A failed job must not stop the timer, or leave the object
+                # waiting for a job that never finishes.
+                del self.jobs[cache_key]
+                self._fail(cache_key, job.stamp, job.obj_name)
+            if time.monotonic() >= deadline:
+                break
+        return len(self.jobs) > 0
+
+    def _start_job(self, obj: bpy.types.Object) -> None:
+        cache_key = get_cache_key(obj)
+        job = self.jobs.get(cache_key)
+        if job is not None:
+            job.restart = True
+            return
+        cached = self.d.get(cache_key)
+        mesh_ = copy.copy(cached) if cached is not None else Mesh()
+        # Steps run from a timer, where only `bpy.context` is valid.
+        self.jobs[cache_key] = Job(
+            obj_name=obj.name,
+            mesh=mesh_,
+            steps=mesh_.update_steps(bpy.context, obj),
+            stamp=self._stamp(bpy.context)
+        )
+        if not bpy.app.timers.is_registered(_run_jobs):
+            bpy.app.timers.register(_run_jobs)
+
+    def _fail(self, cache_key: CacheKey, stamp: Stamp, name: str) -> None:
+        """Mark `cache_key` as failed, from an exception handler."""
+        self.failed[cache_key] = stamp
+        log.exception(
+            "Failed to update meshstats data for '{}'.".format(name)
+        )
+
+    def _remove(self, cache_key: CacheKey) -> None:
+        del self.d[cache_key]
+        del self._stamps[cache_key]
+        self.nbytes -= self._sizes.pop(cache_key)
+
+    def _stamp(self, context: bpy.types.Context) -> Stamp:
+        addon_prefs = context.preferences.addons[constants.ADDON_NAME] \
+                                         .preferences
+        return (self.generation, addon_prefs.flat_threshold_angle)
+
+    def _store(
+            self,
+            cache_key: CacheKey,
+            mesh_: Mesh,
+            stamp: Stamp
+    ) -> None:
+        self.d[cache_key] = mesh_
+        self._stamps[cache_key] = stamp
+        self.failed.pop(cache_key, None)
+        self.counts[cache_key] = (stamp, Counts.from_mesh(mesh_))
+        self.d.move_to_end(cache_key)
+        size = mesh_.nbytes
+        self.nbytes += size - self._sizes.get(cache_key, 0)
+        self._sizes[cache_key] = size
+        # Most recently stored entry is kept, even if it is larger than
+        # `max_bytes` on its own.
+        while self.nbytes > self.max_bytes and len(self.d) > 1:
+            (evicted_key, _) = next(iter(self.d.items()))
+            log.debug("Evicting {} from cache".format(evicted_key))
+            self._remove(evicted_key)
+            self.evictions += 1
+        log.debug("{0} items, {1} bytes in cache.".format(
+            len(self.d),
+            self.nbytes
+        ))
 
 
 cache = Cache()
 
 
+@trace.traced("check_eligibility")
 def check_eligibility(obj: bpy.types.Object) -> Eligibility:
     assert obj.type == 'MESH'
     obj_props = obj.meshstats
@@ -340,32 +718,68 @@ def check_eligibility(obj: bpy.types.Object) -> Eligibility:
     elif len(obj.data.polygons) > addon_prefs.object_face_limit:
         log.debug("Mesh '{}' has too many faces.".format(obj.data.name))
         return Eligibility.TOO_MANY_FACES
-    elif any([m for m in obj.modifiers
-              if m.show_viewport
-              and m.type not in constants.MODIFIERS_WHITELISTED]):
+    elif has_unsupported_modifiers(obj):
         return Eligibility.MODIFIER
     else:
         return Eligibility.OK
 
 
+def is_estimated(obj: bpy.types.Object) -> bool:
+    """Whether stats of `obj` are estimated, as it has too many faces.
+
+    Meshes with modifiers that are not supported are not estimated either,
+    `check_eligibility` reports too many faces before modifiers.
+    """
+    addon_prefs = \
+        bpy.context.preferences.addons[constants.ADDON_NAME].preferences
+    return addon_prefs.estimate_large_meshes \
+        and check_eligibility(obj) == Eligibility.TOO_MANY_FACES \
+        and not has_unsupported_modifiers(obj)
+
+
+def has_unsupported_modifiers(obj: bpy.types.Object) -> bool:
+    return any([m for m in obj.modifiers
+                if m.show_viewport
+                and m.type not in constants.MODIFIERS_WHITELISTED])
+
+
+def get_cache_key(obj: bpy.types.Object) -> CacheKey:
+    # `session_uid` is stable for the lifetime of an ID in a session, unlike
+    # `hash(obj)` which changes when the Python wrapper does.
+    #
+    # Eligible objects only have modifiers that keep the topology, but the
+    # evaluated positions & normals still depend on settings of each
+    # object.  So only objects without modifiers share entries.
+    if any(m.show_viewport for m in obj.modifiers):
+        return (obj.data.session_uid, obj.session_uid)
+    else:
+        return (obj.data.session_uid, None)
+
+
+def _run_jobs() -> typing.Optional[float]:
+    context: bpy.types.Context = bpy.context
+    pending = cache.run_jobs(context, constants.ANALYSIS_TIME_BUDGET)
+    meshstats_context.tag_redraw(context)
+    return constants.ANALYSIS_TICK_INTERVAL if pending else None
+
+
+def _run_estimates() -> typing.Optional[float]:
+    context: bpy.types.Context = bpy.context
+    pending = cache.run_estimates(context, constants.ANALYSIS_TIME_BUDGET)
+    meshstats_context.tag_redraw(context)
+    return constants.ANALYSIS_TICK_INTERVAL if pending else None
+
+
 @bpy.app.handlers.persistent
 def app__load_pre_handler(*args_):
     global cache
+    cache.cancel_jobs()
     cache = Cache()
 
 
 @bpy.app.handlers.persistent
-def app__depsgraph_update_post(
-        scene: bpy.types.Scene,
-        depsgraph: bpy.types.Depsgraph
-) -> None:
-    global cache
-    context: bpy.types.Context = bpy.context
-    obj = meshstats_context.get_object(context)
-    if obj is not None:
-        for u in depsgraph.updates:
-            if u.id.original == obj \
-               and u.is_updated_geometry \
-               and check_eligibility(obj) == Eligibility.OK:
-                cache.update(context, obj)
-                break
+def app__undo_post_handler(*args_):
+    # Undo & redo replace datablocks without reliably reporting geometry
+    # updates.
+    cache.invalidate()
+    meshstats_context.tag_redraw()
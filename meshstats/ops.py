@@ -18,12 +18,13 @@
 
 if "bpy" in locals():
     import importlib
-    for mod in [constants, mesh, meshstats_context]:  # noqa: F821
+    for mod in [constants, mesh, meshstats_context, trace]:  # noqa: F821
         importlib.reload(mod)
 else:
     import bpy
+    import bpy_extras.io_utils
     from . import context as meshstats_context
-    from . import (constants, mesh)
+    from . import (constants, mesh, trace)
 
 
 class OBJECT_OT_MeshstatsDisableObject(bpy.types.Operator):
@@ -69,8 +70,13 @@ class PREFERENCES_OT_MeshstatsResetSettings(bpy.types.Operator):
             context.preferences.addons[constants.ADDON_NAME].preferences
         addon_prefs.disabled_by_default = constants.DISABLED_BY_DEFAULT_DEFAULT
         addon_prefs.object_face_limit = constants.OBJECT_FACE_LIMIT_DEFAULT
+        addon_prefs.estimate_large_meshes = \
+            constants.ESTIMATE_LARGE_MESHES_DEFAULT
+        addon_prefs.max_updates_per_second = \
+            constants.MAX_UPDATES_PER_SECOND_DEFAULT
         addon_prefs.flat_threshold_angle = \
             constants.FLAT_THRESHOLD_ANGLE_DEFAULT
+        addon_prefs.overlay_lod = constants.OVERLAY_LOD_DEFAULT
         addon_prefs.overlay_tris_color = constants.OVERLAY_TRIS_COLOR_DEFAULT
         addon_prefs.overlay_ngons_color = constants.OVERLAY_NGONS_COLOR_DEFAULT
         addon_prefs.overlay_n_poles_color = \
@@ -79,4 +85,33 @@ class PREFERENCES_OT_MeshstatsResetSettings(bpy.types.Operator):
             constants.OVERLAY_E_POLES_COLOR_DEFAULT
         addon_prefs.overlay_star_poles_color = \
             constants.OVERLAY_STAR_POLES_COLOR_DEFAULT
+        addon_prefs.show_timings = constants.SHOW_TIMINGS_DEFAULT
+        addon_prefs.trace_enabled = constants.TRACE_ENABLED_DEFAULT
+        return {'FINISHED'}
+
+
+class PREFERENCES_OT_MeshstatsSaveTrace(
+        bpy.types.Operator,
+        bpy_extras.io_utils.ExportHelper
+):
+    """Save recorded Meshstats trace as a Chrome trace event file"""
+    bl_idname = "preferences.meshstats_save_trace"
+    bl_label = "Save Meshstats trace"
+
+    filename_ext = ".json"
+    filter_glob: bpy.props.StringProperty(  # type: ignore[valid-type]
+        default="*.json",
+        options={'HIDDEN'}
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return len(trace.tracer.events) > 0
+
+    def execute(self, context):
+        count = trace.tracer.dump(self.filepath)
+        self.report(
+            {'INFO'},
+            "Saved {0} trace events to '{1}'.".format(count, self.filepath)
+        )
         return {'FINISHED'}
@@ -18,43 +18,173 @@
 
 if "bpy" in locals():
     import importlib
-    for mod in [constants, face, mesh, meshstats_context, pole]:  # noqa: F821
+    for mod in [  # noqa: F821
+            analysis,
+            constants,
+            face,
+            mesh,
+            meshstats_context,
+            pole,
+            timing,
+            trace,
+            visibility
+    ]:
         importlib.reload(mod)
 else:
     # stdlib
-    from itertools import (chain, repeat)
+    import dataclasses
     import typing
     # blender
     import bpy
     import bpy.types
-    from bpy_extras.view3d_utils import location_3d_to_region_2d
-    from bpy_extras.view3d_utils import region_2d_to_origin_3d
     import gpu
     import gpu_extras.batch
     import mathutils
+    import numpy as np
     # addon
     from . import context as meshstats_context
-    from . import (constants, face, mesh, pole)
+    from . import (analysis, constants, face, mesh, pole, timing, trace)
+    from . import visibility
 
 
-uniform_shader: typing.Optional[gpu.types.GPUShader] = None
 smooth_shader: typing.Optional[gpu.types.GPUShader] = None
 
+# Pole geometry & ngon centers are rebuilt only when their key changes.
+# Keys are compared by value, so they must capture everything a cached
+# value depends on.  Overlay batches & clusters depend on visibility too,
+# they are cached with their `visibility.Mask` instead.
+geometry_cache: typing.Dict[
+    str,
+    typing.Tuple[typing.Hashable, 'PoleGeometry']
+] = {}
+centers_cache: typing.Dict[
+    str,
+    typing.Tuple[typing.Hashable, np.ndarray]
+] = {}
 
+# Milliseconds taken by each stage of the current draw.
+stage_timings: typing.Dict[str, float] = {}
+
+
+@dataclasses.dataclass(frozen=True)
+class PoleGeometry:
+    """Object space geometry of pole markers of one category."""
+    # (P, 3) float32 pole centers.
+    centers: np.ndarray
+    # (S * 2, 3) float32, center & midpoint of every spoke, interleaved.
+    spoke_lines: np.ndarray
+    # (S,) index of the pole each spoke belongs to.
+    spoke_poles: np.ndarray
+    # (S,) bool, whether the pole of each spoke is on a flat surface.
+    spoke_is_flat: np.ndarray
+
+
+@dataclasses.dataclass(frozen=True)
+class Screen:
+    """Projection of a 3D view to the pixels of its region."""
+    perspective_matrix: mathutils.Matrix
+    width: int
+    height: int
+
+    @classmethod
+    def from_context(cls, context: bpy.types.Context) -> 'Screen':
+        region_3d = context.space_data.region_3d
+        return cls(
+            perspective_matrix=region_3d.perspective_matrix.copy().freeze(),
+            width=context.region.width,
+            height=context.region.height
+        )
+
+    def project(
+            self,
+            points: np.ndarray,
+            transform_matrix: mathutils.Matrix
+    ) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """Pixel coordinates of object space `points` & whether they are
+        on screen."""
+        matrix = np.array(
+            self.perspective_matrix @ transform_matrix,
+            dtype=np.float32
+        )
+        clip = points @ matrix[:, :3].T + matrix[:, 3]
+        w = clip[:, 3]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ndc = clip[:, :2] / w[:, np.newaxis]
+        on_screen = (w > 0) & np.all(np.abs(ndc) <= 1.0, axis=1)
+        pixels = (ndc + 1.0) * 0.5 * np.array(
+            [self.width, self.height],
+            dtype=np.float32
+        )
+        return (pixels, on_screen)
+
+
+@dataclasses.dataclass(frozen=True)
+class Clusters:
+    """Overlay elements binned into cells of a pixel grid."""
+    # (E,) indices of elements alone in their cell, drawn as they are.
+    single: np.ndarray
+    # (C,) index of an element of each cell with more than one element,
+    # where a marker is drawn instead.
+    markers: np.ndarray
+    # (C,) number of elements in the cell of each marker.
+    counts: np.ndarray
+
+
+@dataclasses.dataclass
+class Occluders:
+    """Objects that can hide overlay elements, found on first use.
+
+    Occluder of the active object needs a BVH tree built for every version
+    of its mesh, so it is only built when a visibility mask is not cached.
+    """
+    context: bpy.types.Context
+    obj: bpy.types.Object
+    mesh_data: mesh.Mesh
+    _found: typing.Optional[typing.Tuple[
+        visibility.Occluder,
+        typing.List[visibility.SceneOccluder]
+    ]] = None
+
+    def get(self) -> typing.Tuple[
+            visibility.Occluder,
+            typing.List[visibility.SceneOccluder]
+    ]:
+        """Occluder of the active object & the other objects."""
+        if self._found is None:
+            self._found = (
+                visibility.get_occluder(
+                    self.context,
+                    self.obj,
+                    self.mesh_data,
+                    stage_timings
+                ),
+                visibility.scene_occluders.get(self.context, self.obj)
+            )
+        return self._found
+
+
+@trace.traced("overlay.draw_callback")
 def draw_callback():
-    global uniform_shader, smooth_shader
-    if uniform_shader is None:
-        uniform_shader = gpu.shader.from_builtin('UNIFORM_COLOR')
+    global smooth_shader
+    global stage_timings
     if smooth_shader is None:
         smooth_shader = gpu.shader.from_builtin('SMOOTH_COLOR')
+    stage_timings = {}
 
     obj = meshstats_context.get_object()
     if obj is None or mesh.check_eligibility(obj) != mesh.Eligibility.OK:
         return
-    transform_matrix = mathutils.Matrix(obj.matrix_world)
+    transform_matrix = mathutils.Matrix(obj.matrix_world).freeze()
     context = bpy.context
     if context.space_data.overlay.show_overlays is False:
         return
+    props = context.scene.meshstats
+    if not any([props.overlay_tris,
+                props.overlay_ngons,
+                props.overlay_n_poles,
+                props.overlay_e_poles,
+                props.overlay_star_poles]):
+        return
     mesh_data = mesh.cache.get(context, obj)
     if mesh_data is None:
         return
@@ -67,191 +197,593 @@ def draw_callback():
 
     saved_blend = gpu.state.blend_get()
     gpu.state.blend_set('ALPHA')
-    gpu.state.point_size_set(8)
+    gpu.state.point_size_set(constants.OVERLAY_POINT_SIZE)
     saved_line_width = gpu.state.line_width_get()
     gpu.state.line_width_set(3)
 
-    props = context.scene.meshstats
-    if props.overlay_tris:
-        _draw_overlay_faces(
-            context,
-            uniform_shader,
-            color_tris,
-            mesh_data.tris,
+    occluders = Occluders(context, obj, mesh_data)
+    view = visibility.View.from_region_3d(context.space_data.region_3d)
+    screen = Screen.from_context(context)
+    lod = addon_prefs.overlay_lod
+
+    # Overlay batches are in object space.  World transform is applied by
+    # the model-view-projection matrix of the shader, so moving the object
+    # does not invalidate them.
+    with gpu.matrix.push_pop():
+        gpu.matrix.multiply_matrix(transform_matrix)
+        if props.overlay_tris:
+            _draw_overlay_tris(
+                occluders,
+                view,
+                screen if lod else None,
+                smooth_shader,
+                color_tris,
+                mesh_data,
+                transform_matrix,
+            )
+        if props.overlay_ngons:
+            _draw_overlay_ngons(
+                occluders,
+                view,
+                screen if lod else None,
+                smooth_shader,
+                color_ngons,
+                mesh_data,
+                transform_matrix,
+            )
+        if props.overlay_n_poles:
+            _draw_overlay_poles(
+                occluders,
+                view,
+                screen if lod else None,
+                smooth_shader,
+                'N_POLES',
+                color_n_poles,
+                mesh_data,
+                mesh_data.n_poles,
+                transform_matrix,
+            )
+        if props.overlay_e_poles:
+            _draw_overlay_poles(
+                occluders,
+                view,
+                screen if lod else None,
+                smooth_shader,
+                'E_POLES',
+                color_e_poles,
+                mesh_data,
+                mesh_data.e_poles,
+                transform_matrix,
+            )
+        if props.overlay_star_poles:
+            _draw_overlay_poles(
+                occluders,
+                view,
+                screen if lod else None,
+                smooth_shader,
+                'STAR_POLES',
+                color_star_poles,
+                mesh_data,
+                mesh_data.star_poles,
+                transform_matrix,
+            )
+
+    # Reset defaults
+    gpu.state.blend_set(saved_blend)
+    gpu.state.point_size_set(1)
+    gpu.state.line_width_set(saved_line_width)
+
+    # Only draws that recalculate visibility or rebuild batches are
+    # recorded, others take next to no time.
+    timing.history.add(timing.Record(obj.name, 'DRAW', stage_timings))
+
+
+@trace.traced("overlay.draw_tris")
+def _draw_overlay_tris(
+        occluders: Occluders,
+        view: visibility.View,
+        screen: typing.Optional[Screen],
+        shader: gpu.types.GPUShader,
+        color: typing.Tuple[float, float, float, float],
+        mesh_data: mesh.Mesh,
+        transform_matrix: mathutils.Matrix
+):
+    tris: face.Tris = mesh_data.tris
+
+    def compute_visible() -> np.ndarray:
+        (occluder, others) = occluders.get()
+        return visibility.points_visible(
+            occluder,
+            tris.centers,
+            view,
             transform_matrix,
+            others
         )
-    if props.overlay_ngons:
-        _draw_overlay_faces(
-            context,
-            uniform_shader,
-            color_ngons,
-            mesh_data.ngons,
-            transform_matrix,
+
+    mask = _cached_visibility(
+        'TRIS',
+        mesh_data,
+        view,
+        transform_matrix,
+        compute_visible
+    )
+    clusters = _clusters(mask, screen, transform_matrix, tris.centers)
+    if clusters is None:
+        _draw_outlines(
+            mask,
+            shader,
+            color,
+            mesh_data,
+            np.arange(0, tris.indices.size + 1, 3, dtype=np.int32),
+            tris.indices.ravel(),
+            mask.visible
         )
-    if props.overlay_n_poles:
-        _draw_overlay_poles(
-            context,
-            uniform_shader,
-            smooth_shader,
-            color_n_poles,
-            mesh_data.n_poles,
+        return
+    single = clusters.single
+    _draw_outlines(
+        mask,
+        shader,
+        color,
+        mesh_data,
+        np.arange(0, single.size * 3 + 1, 3, dtype=np.int32),
+        tris.indices[single].ravel(),
+        mask.visible[single],
+        screen
+    )
+    _draw_markers(
+        mask,
+        shader,
+        color,
+        _face_faded_color(color),
+        tris.centers,
+        clusters,
+        screen
+    )
+
+
+@trace.traced("overlay.draw_ngons")
+def _draw_overlay_ngons(
+        occluders: Occluders,
+        view: visibility.View,
+        screen: typing.Optional[Screen],
+        shader: gpu.types.GPUShader,
+        color: typing.Tuple[float, float, float, float],
+        mesh_data: mesh.Mesh,
+        transform_matrix: mathutils.Matrix
+):
+    ngons: face.Ngons = mesh_data.ngons
+
+    def compute_visible() -> np.ndarray:
+        if len(ngons) == 0:
+            return np.zeros(0, dtype=bool)
+        # An ngon is visible if any of its vertices is visible.  Vertices
+        # shared by neighbouring ngons are tested only once.
+        (vertices, corners) = np.unique(ngons.indices, return_inverse=True)
+        (occluder, others) = occluders.get()
+        vertex_visible = visibility.points_visible(
+            occluder,
+            mesh_data.vertices[vertices],
+            view,
             transform_matrix,
+            others
         )
-    if props.overlay_e_poles:
-        _draw_overlay_poles(
-            context,
-            uniform_shader,
-            smooth_shader,
-            color_e_poles,
-            mesh_data.e_poles,
-            transform_matrix,
+        return np.logical_or.reduceat(
+            vertex_visible[corners],
+            ngons.offsets[:-1]
+        )
+
+    mask = _cached_visibility(
+        'NGONS',
+        mesh_data,
+        view,
+        transform_matrix,
+        compute_visible
+    )
+    if screen is None or len(ngons) < constants.OVERLAY_LOD_MIN:
+        clusters = None
+    else:
+        centers = _cached(
+            centers_cache,
+            'NGONS',
+            (id(mesh_data), mesh_data.last_updated),
+            lambda: _ngon_centers(mesh_data.vertices, ngons)
+        )
+        clusters = _clusters(mask, screen, transform_matrix, centers)
+    if clusters is None:
+        _draw_outlines(
+            mask,
+            shader,
+            color,
+            mesh_data,
+            ngons.offsets,
+            ngons.indices,
+            mask.visible
         )
-    if props.overlay_star_poles:
-        _draw_overlay_poles(
-            context,
-            uniform_shader,
-            smooth_shader,
-            color_star_poles,
-            mesh_data.star_poles,
+        return
+    single = clusters.single
+    counts = np.diff(ngons.offsets)[single]
+    _draw_outlines(
+        mask,
+        shader,
+        color,
+        mesh_data,
+        analysis.row_offsets(counts),
+        ngons.indices[analysis.ranges(ngons.offsets[single], counts)],
+        mask.visible[single],
+        screen
+    )
+    _draw_markers(
+        mask,
+        shader,
+        color,
+        _face_faded_color(color),
+        centers,
+        clusters,
+        screen
+    )
+
+
+def _draw_outlines(
+        mask: visibility.Mask,
+        shader: gpu.types.GPUShader,
+        color: typing.Sequence[float],
+        mesh_data: mesh.Mesh,
+        offsets: np.ndarray,
+        indices: np.ndarray,
+        visible: np.ndarray,
+        lod_key: typing.Hashable = None
+):
+    """Draw outlines of faces given as CSR arrays as a single batch.
+
+    The batch is cached with `mask`, the visibility mask of all faces.
+    `lod_key` identifies the subset of faces drawn, when some of them are
+    drawn as markers instead.
+    """
+    if len(indices) == 0:
+        return
+    rgba = _rgba(color)
+    faded_color = _face_faded_color(rgba)
+
+    def build() -> gpu.types.GPUBatch:
+        (pos, colors, lines) = _outline_arrays(
+            mesh_data.vertices,
+            offsets,
+            indices,
+            visible,
+            rgba,
+            faded_color
+        )
+        return gpu_extras.batch.batch_for_shader(
+            shader,
+            'LINES',
+            {"pos": pos, "color": colors},
+            indices=lines
+        )
+
+    _cached(mask.derived, 'OUTLINES', (rgba, lod_key), build).draw(shader)
+
+
+def _rgba(
+        color: typing.Sequence[float]
+) -> typing.Tuple[float, float, float, float]:
+    """Copy of a color property, it can be compared & used in keys."""
+    return (color[0], color[1], color[2], color[3])
+
+
+def _face_faded_color(
+        color: typing.Tuple[float, float, float, float]
+) -> typing.Tuple[float, float, float, float]:
+    faded_alpha = 0.05  # min(color[3] * 0.15 + 0.1, color[3])
+    return (color[0], color[1], color[2], faded_alpha)
+
+
+def _outline_arrays(
+        vertices: np.ndarray,
+        offsets: np.ndarray,
+        indices: np.ndarray,
+        visible: np.ndarray,
+        color: typing.Tuple[float, float, float, float],
+        faded_color: typing.Tuple[float, float, float, float]
+) -> typing.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Positions, colors & line indices of outlines of faces."""
+    # Every face gets its own copy of its corners, so that a vertex
+    # shared by a visible and a faded face can have both colors.
+    counts = np.diff(offsets)
+    pos = vertices[indices]
+    colors = np.repeat(
+        np.where(
+            visible[:, np.newaxis],
+            np.array(color, dtype=np.float32),
+            np.array(faded_color, dtype=np.float32)
+        ),
+        counts,
+        axis=0
+    )
+    lines = np.stack(
+        (
+            np.arange(len(indices), dtype=np.int32),
+            analysis.next_corners(offsets[:-1], counts)
+        ),
+        axis=1
+    )
+    return (pos, colors, lines)
+
+
+def _cached_visibility(
+        name: str,
+        mesh_data: mesh.Mesh,
+        view: visibility.View,
+        transform_matrix: mathutils.Matrix,
+        compute: typing.Callable[[], np.ndarray]
+) -> visibility.Mask:
+    def timed_compute() -> np.ndarray:
+        with timing.measure(stage_timings, 'visibility'):
+            return compute()
+
+    return visibility.cache.get(
+        (
+            name,
+            id(mesh_data),
+            mesh_data.last_updated,
+            view,
             transform_matrix,
+            visibility.scene_occluders.generation
+        ),
+        timed_compute
+    )
+
+
+def _clusters(
+        mask: visibility.Mask,
+        screen: typing.Optional[Screen],
+        transform_matrix: mathutils.Matrix,
+        points: np.ndarray
+) -> typing.Optional[Clusters]:
+    """Cluster overlay elements at `points`, if there are enough of them
+    to overlap on screen.
+
+    Clusters are cached with `mask`, which is already specific to the
+    mesh version & object transform.  Returns `None` if elements should
+    be drawn one by one.
+    """
+    if screen is None or len(points) < constants.OVERLAY_LOD_MIN:
+        return None
+    return _cached(
+        mask.derived,
+        'CLUSTERS',
+        screen,
+        lambda: _cluster(
+            *screen.project(points, transform_matrix),
+            mask.visible,
+            constants.OVERLAY_LOD_CELL_SIZE
         )
+    )
 
-    # Reset defaults
-    gpu.state.blend_set(saved_blend)
-    gpu.state.point_size_set(1)
-    gpu.state.line_width_set(saved_line_width)
+
+def _cluster(
+        pixels: np.ndarray,
+        on_screen: np.ndarray,
+        visible: np.ndarray,
+        cell_size: int
+) -> Clusters:
+    """Bin elements on screen into `cell_size` pixel cells.
+
+    Visible & hidden elements are binned separately, so that hidden ones
+    do not hide visible ones behind a faded marker.  Elements off screen
+    are not drawn at all.
+    """
+    elements = np.flatnonzero(on_screen)
+    cells = (pixels[elements] // cell_size).astype(np.int64)
+    columns = int(cells[:, 0].max(initial=0)) + 1
+    keys = (cells[:, 1] * columns + cells[:, 0]) * 2 + visible[elements]
+    (_, first, counts) = np.unique(
+        keys,
+        return_index=True,
+        return_counts=True
+    )
+    representatives = elements[first]
+    return Clusters(
+        single=representatives[counts == 1],
+        markers=representatives[counts > 1],
+        counts=counts[counts > 1]
+    )
 
 
-def _draw_overlay_faces(
-        context: bpy.types.Context,
+def _marker_sizes(counts: np.ndarray) -> np.ndarray:
+    """Point size of markers, growing with the log of the element count."""
+    return np.minimum(
+        constants.OVERLAY_POINT_SIZE + 2 * np.floor(np.log2(counts)),
+        constants.OVERLAY_POINT_SIZE_MAX
+    ).astype(np.int32)
+
+
+def _draw_markers(
+        mask: visibility.Mask,
         shader: gpu.types.GPUShader,
-        color: typing.Tuple[float, float, float, float],
-        faces: typing.List[face.Face],
-        transform_matrix: mathutils.Matrix
+        color: typing.Sequence[float],
+        faded_color: typing.Tuple[float, float, float, float],
+        points: np.ndarray,
+        clusters: Clusters,
+        lod_key: typing.Hashable
 ):
-    faded_alpha = 0.05  # min(color[3] * 0.15 + 0.1, color[3])
-    faded_color = (color[0], color[1], color[2], faded_alpha)
+    """Draw a point for each cluster of elements, larger for larger ones.
+
+    Point size is a draw state, so markers are drawn in a batch per size.
+    Batches are cached with `mask`.
+    """
+    if len(clusters.markers) == 0:
+        return
+    key = (_rgba(color), lod_key)
+    sizes = _marker_sizes(clusters.counts)
+    colors = np.where(
+        mask.visible[clusters.markers, np.newaxis],
+        np.array(color, dtype=np.float32),
+        np.array(faded_color, dtype=np.float32)
+    )
 
-    shader.bind()
-    for face_ in faces:
-        match face_:
-            case face.FaceTri(center, _, _):
-                if _is_visible(
-                    context,
-                    transform_matrix @ center
-                ):
-                    shader.uniform_float("color", color)
-                else:
-                    shader.uniform_float("color", faded_color)
-            case face.FaceNgon(vertices, _):
-                # Points are lazily evaluated.  This saves some raycasts when
-                # the ngon is visible, but all points are always evaluated
-                # when the ngon is not visible.
-                if any((_is_visible(context, transform_matrix @ p)
-                        for p in vertices)):
-                    shader.uniform_float("color", color)
-                else:
-                    shader.uniform_float("color", faded_color)
-        vertices = list(face_.vertices)
-        vertices = vertices + vertices[0:1]
-        batch = gpu_extras.batch.batch_for_shader(
+    def build(size_mask: np.ndarray) -> gpu.types.GPUBatch:
+        return gpu_extras.batch.batch_for_shader(
             shader,
-            'LINE_STRIP',
-            {"pos": [transform_matrix @ v for v in vertices]}
+            'POINTS',
+            {
+                "pos": points[clusters.markers[size_mask]],
+                "color": colors[size_mask]
+            }
+        )
+
+    for size in np.unique(sizes):
+        size_mask = sizes == size
+        batch = _cached(
+            mask.derived,
+            "MARKERS_{0}".format(size),
+            key,
+            lambda: build(size_mask)
         )
+        gpu.state.point_size_set(float(size))
         batch.draw(shader)
+    gpu.state.point_size_set(constants.OVERLAY_POINT_SIZE)
+
 
+T = typing.TypeVar('T')
 
+
+def _cached(
+        cache: typing.Dict[str, typing.Tuple[typing.Hashable, T]],
+        name: str,
+        key: typing.Hashable,
+        build: typing.Callable[[], T]
+) -> T:
+    cached = cache.get(name)
+    if cached is None or cached[0] != key:
+        with timing.measure(stage_timings, 'overlay'):
+            cached = (key, build())
+        cache[name] = cached
+    return cached[1]
+
+
+@trace.traced("overlay.draw_poles")
 def _draw_overlay_poles(
-        context: bpy.types.Context,
-        uniform_shader: gpu.types.GPUShader,
-        smooth_shader: gpu.types.GPUShader,
-        color: typing.Tuple[float, float, float, float],
-        poles: typing.List[pole.Pole],
+        occluders: Occluders,
+        view: visibility.View,
+        screen: typing.Optional[Screen],
+        shader: gpu.types.GPUShader,
+        name: str,
+        pole_color: typing.Sequence[float],
+        mesh_data: mesh.Mesh,
+        poles: pole.Poles,
         transform_matrix: mathutils.Matrix
 ):
+    if len(poles) == 0:
+        return
+    color = _rgba(pole_color)
     faded_alpha = min(color[3] * 0.15 + 0.1, color[3])
     faded_color = (color[0], color[1], color[2], faded_alpha)
     zeroed_color = (color[0], color[1], color[2], faded_alpha / 10.0)
 
-    use_color = None
+    geometry = _cached(
+        geometry_cache,
+        name,
+        (id(mesh_data), mesh_data.last_updated),
+        lambda: _pole_geometry(mesh_data.vertices, poles)
+    )
 
-    for pole_ in poles:
-        if _is_visible(context, transform_matrix @ pole_.center):
-            use_color = color
-        else:
-            use_color = faded_color
+    def compute_visible() -> np.ndarray:
+        (occluder, others) = occluders.get()
+        return visibility.points_visible(
+            occluder,
+            geometry.centers,
+            view,
+            transform_matrix,
+            others
+        )
 
-        # Apply world transform
-        pole_center: mathutils.Vector = transform_matrix @ pole_.center
-        midpoints = [(pole_.center + v) / 2 for v in pole_.spokes]
-        midpoints = [transform_matrix @ v for v in midpoints]
+    mask = _cached_visibility(
+        name,
+        mesh_data,
+        view,
+        transform_matrix,
+        compute_visible
+    )
+    visible = mask.visible
+    clusters = _clusters(mask, screen, transform_matrix, geometry.centers)
+    if clusters is None:
+        shown = np.ones(len(poles), dtype=bool)
+        lod_key = None
+    else:
+        # Poles clustered into markers are drawn without spokes.
+        shown = np.zeros(len(poles), dtype=bool)
+        shown[clusters.single] = True
+        lod_key = screen
+        _draw_markers(
+            mask,
+            shader,
+            color,
+            faded_color,
+            geometry.centers,
+            clusters,
+            lod_key
+        )
+        if not np.any(shown):
+            return
+    key = (color, lod_key)
+    center_colors = np.where(
+        visible[:, np.newaxis],
+        np.array(color, dtype=np.float32),
+        np.array(faded_color, dtype=np.float32)
+    )
 
-        # Draw the center
-        uniform_shader.bind()
-        uniform_shader.uniform_float("color", use_color)
-        batch = gpu_extras.batch.batch_for_shader(
-            uniform_shader,
+    def build_points() -> gpu.types.GPUBatch:
+        return gpu_extras.batch.batch_for_shader(
+            shader,
             'POINTS',
-            {"pos": [pole_center]}
+            {
+                "pos": geometry.centers[shown],
+                "color": center_colors[shown]
+            }
         )
-        batch.draw(uniform_shader)
 
-        # Draw spokes
-        if pole_.is_flat:
-            smooth_shader.bind()
-            batch = gpu_extras.batch.batch_for_shader(
-                smooth_shader,
-                'LINES',
-                {
-                    "pos": list(chain(*zip(repeat(pole_center), midpoints))),
-                    "color": list(
-                        chain(*repeat(
-                            [use_color, zeroed_color],
-                            len(pole_.spokes)
-                        ))
-                    )
-                }
-            )
-            batch.draw(smooth_shader)
-        else:
-            batch = gpu_extras.batch.batch_for_shader(
-                smooth_shader,
-                'LINES',
-                {
-                    "pos": list(chain(*zip(repeat(pole_center), midpoints))),
-                    "color": list(
-                        chain(*repeat(
-                            [use_color, use_color],
-                            len(pole_.spokes)
-                        ))
-                    )
-                }
-            )
-            batch.draw(smooth_shader)
-
-
-def _is_visible(
-        context: bpy.types.Context,
-        point: mathutils.Vector,
-        epsilon: float = 0.00001
-) -> bool:
-    projected_vertex = location_3d_to_region_2d(
-        context.region,
-        context.space_data.region_3d,
-        point
-    )
-    ray_origin = region_2d_to_origin_3d(
-        context.region,
-        context.space_data.region_3d,
-        projected_vertex
+    def build_spokes() -> gpu.types.GPUBatch:
+        spoke_shown = shown[geometry.spoke_poles]
+        # Spokes fade out towards the midpoint on flat surfaces.
+        start_colors = center_colors[geometry.spoke_poles[spoke_shown]]
+        end_colors = np.where(
+            geometry.spoke_is_flat[spoke_shown, np.newaxis],
+            np.array(zeroed_color, dtype=np.float32),
+            start_colors
+        )
+        colors = np.stack((start_colors, end_colors), axis=1)
+        lines = geometry.spoke_lines.reshape(-1, 2, 3)[spoke_shown]
+        return gpu_extras.batch.batch_for_shader(
+            shader,
+            'LINES',
+            {
+                "pos": lines.reshape(-1, 3),
+                "color": colors.reshape(-1, 4)
+            }
+        )
+
+    _cached(mask.derived, 'POINTS', key, build_points).draw(shader)
+    _cached(mask.derived, 'SPOKES', key, build_spokes).draw(shader)
+
+
+def _pole_geometry(vertices: np.ndarray, poles: pole.Poles) -> PoleGeometry:
+    centers = vertices[poles.centers]
+    spoke_poles = np.repeat(
+        np.arange(len(poles), dtype=np.int32),
+        np.diff(poles.spoke_offsets)
     )
-    ray = (point - ray_origin).normalized()
-    (result, loc, _, _, obj, _) = context.scene.ray_cast(
-        context.view_layer.depsgraph,
-        ray_origin,
-        ray
+    spoke_starts = centers[spoke_poles]
+    midpoints = (spoke_starts + vertices[poles.spokes]) / 2
+    spoke_lines = np.stack((spoke_starts, midpoints), axis=1)
+    return PoleGeometry(
+        centers=centers,
+        spoke_lines=spoke_lines.reshape(-1, 3),
+        spoke_poles=spoke_poles,
+        spoke_is_flat=poles.is_flat[spoke_poles]
     )
-    return result \
-        and obj == context.active_object \
-        and (point - loc).length < epsilon
+
+
+def _ngon_centers(vertices: np.ndarray, ngons: face.Ngons) -> np.ndarray:
+    """Average of corners of each ngon."""
+    sums = np.add.reduceat(vertices[ngons.indices], ngons.offsets[:-1])
+    return (sums / np.diff(ngons.offsets)[:, np.newaxis]).astype(np.float32)
@@ -16,45 +16,52 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-import abc
 from dataclasses import dataclass
-from typing import Collection, List, Tuple
 
-import mathutils
-
-
-class Pole(abc.ABC):
-    center: mathutils.Vector
-    is_flat: bool
-    spokes: Collection[mathutils.Vector]
+import numpy as np
 
 
 @dataclass(frozen=True)
-class EPole(Pole):
-    center: mathutils.Vector
-    is_flat: bool
-    spokes: Tuple[
-        mathutils.Vector,
-        mathutils.Vector,
-        mathutils.Vector,
-        mathutils.Vector,
-        mathutils.Vector
-    ]
+class Poles:
+    """Poles stored as indices into a shared vertex buffer.
 
+    Spokes of pole `i` are the vertex indices
+    `spokes[spoke_offsets[i]:spoke_offsets[i + 1]]`, faces linked to it
+    are `link_faces[link_face_offsets[i]:link_face_offsets[i + 1]]`.
+    """
+    # (P,) int32 vertex indices of pole centers.
+    centers: np.ndarray
+    # (P,) bool
+    is_flat: np.ndarray
+    # (P + 1,) int32 offsets into `spokes`.
+    spoke_offsets: np.ndarray
+    # int32 vertex indices of the other end of every linked edge.
+    spokes: np.ndarray
+    # (P + 1,) int32 offsets into `link_faces`.
+    link_face_offsets: np.ndarray
+    # int32 face indices, used to refresh `is_flat` when only vertex
+    # positions change.
+    link_faces: np.ndarray
 
-@dataclass(frozen=True)
-class NPole(Pole):
-    center: mathutils.Vector
-    is_flat: bool
-    spokes: Tuple[
-        mathutils.Vector,
-        mathutils.Vector,
-        mathutils.Vector
-    ]
+    def __len__(self) -> int:
+        return len(self.centers)
 
+    @property
+    def nbytes(self) -> int:
+        return self.centers.nbytes \
+            + self.is_flat.nbytes \
+            + self.spoke_offsets.nbytes \
+            + self.spokes.nbytes \
+            + self.link_face_offsets.nbytes \
+            + self.link_faces.nbytes
 
-@dataclass(frozen=True)
-class StarPole(Pole):
-    center: mathutils.Vector
-    is_flat: bool
-    spokes: List[mathutils.Vector]
+    @classmethod
+    def empty(cls) -> 'Poles':
+        return cls(
+            centers=np.empty(0, dtype=np.int32),
+            is_flat=np.empty(0, dtype=bool),
+            spoke_offsets=np.zeros(1, dtype=np.int32),
+            spokes=np.empty(0, dtype=np.int32),
+            link_face_offsets=np.zeros(1, dtype=np.int32),
+            link_faces=np.empty(0, dtype=np.int32)
+        )
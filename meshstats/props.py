@@ -18,12 +18,20 @@
 
 if "bpy" in locals():
     import importlib
-    for mod in [constants, ops]:  # noqa: F821
+    for mod in [constants, ops, trace]:  # noqa: F821
         importlib.reload(mod)
 else:
     import bpy
     from . import constants
     from . import ops
+    from . import trace
+
+
+def _update_trace_enabled(self, context):
+    # Each recording starts with an empty buffer.
+    if self.trace_enabled and not trace.tracer.enabled:
+        trace.tracer.clear()
+    trace.tracer.enabled = self.trace_enabled
 
 
 class MeshstatsAddonPreferences(bpy.types.AddonPreferences):
@@ -44,6 +52,20 @@ class MeshstatsAddonPreferences(bpy.types.AddonPreferences):
         max=constants.OBJECT_FACE_LIMIT_MAX,
         step=constants.OBJECT_FACE_LIMIT_STEP
     )
+    estimate_large_meshes: bpy.props.BoolProperty(
+        name="estimate_large_meshes",
+        description="Estimate stats of meshes with more faces than"
+                    + " object_face_limit from a random sample.",
+        default=constants.ESTIMATE_LARGE_MESHES_DEFAULT
+    )
+    max_updates_per_second: bpy.props.FloatProperty(
+        name="max_updates_per_second",
+        description="Maximum number of times per second meshstats are"
+                    + " recalculated while a mesh is being edited.",
+        default=constants.MAX_UPDATES_PER_SECOND_DEFAULT,
+        min=constants.MAX_UPDATES_PER_SECOND_MIN,
+        max=constants.MAX_UPDATES_PER_SECOND_MAX
+    )
 
     flat_threshold_angle: bpy.props.FloatProperty(
         name="flat_threshold_angle",
@@ -54,6 +76,12 @@ class MeshstatsAddonPreferences(bpy.types.AddonPreferences):
         max=90.0
     )
 
+    overlay_lod: bpy.props.BoolProperty(
+        name="overlay_lod",
+        description="Draw overlay elements that overlap on screen as a"
+                    + " single marker, sized by how many there are.",
+        default=constants.OVERLAY_LOD_DEFAULT
+    )
     overlay_tris_color: bpy.props.FloatVectorProperty(
         name="overlay_tris_color",
         description="Color to be used to draw overlay of tris in 3D view.",
@@ -102,20 +130,42 @@ class MeshstatsAddonPreferences(bpy.types.AddonPreferences):
         max=1.0
     )
 
+    show_timings: bpy.props.BoolProperty(
+        name="show_timings",
+        description="Show time taken by each stage of the most recent"
+                    + " updates & draws in the Meshstats panel.",
+        default=constants.SHOW_TIMINGS_DEFAULT
+    )
+    trace_enabled: bpy.props.BoolProperty(
+        name="trace_enabled",
+        description="Record spans of updates & draws, so that they can be"
+                    + " saved as a Chrome trace.",
+        default=constants.TRACE_ENABLED_DEFAULT,
+        update=_update_trace_enabled
+    )
+
     def draw(self, context):
         layout = self.layout
         col = layout.column(align=True, heading="Performance Preferences")
         col.prop(self, "disabled_by_default")
         col.prop(self, "object_face_limit")
+        col.prop(self, "estimate_large_meshes")
+        col.prop(self, "max_updates_per_second")
         layout.separator()
         col = layout.column(align=True, heading="Overlay Preferences")
         col.prop(self, "flat_threshold_angle")
+        col.prop(self, "overlay_lod")
         col.prop(self, "overlay_tris_color")
         col.prop(self, "overlay_ngons_color")
         col.prop(self, "overlay_n_poles_color")
         col.prop(self, "overlay_e_poles_color")
         col.prop(self, "overlay_star_poles_color")
         layout.separator()
+        col = layout.column(align=True, heading="Debug Preferences")
+        col.prop(self, "show_timings")
+        col.prop(self, "trace_enabled")
+        col.operator(ops.PREFERENCES_OT_MeshstatsSaveTrace.bl_idname)
+        layout.separator()
         layout.operator(ops.PREFERENCES_OT_MeshstatsResetSettings.bl_idname)
 
 
@@ -182,6 +232,21 @@ class MeshstatsObjectProperties(bpy.types.PropertyGroup):
 
 
 class MeshstatsSceneProperties(bpy.types.PropertyGroup):
+    totals_scope: bpy.props.EnumProperty(
+        name="totals_scope",
+        description="Objects to calculate totals for.",
+        default='SCENE',
+        items=[
+            ('SELECTED', "Selected", "Selected objects", 1),
+            ('COLLECTION', "Collection", "Objects in active collection", 2),
+            (
+                'SCENE',
+                "Scene",
+                "Visible objects & collection instances in the scene",
+                3
+            ),
+        ]
+    )
     overlay_tris: bpy.props.BoolProperty(
         name="overlay_tris",
         description="Toggle overlay of tris.",
@@ -0,0 +1,169 @@
+# <pep8-80 compliant>
+
+# meshstats is a Blender addon that provides mesh statistics.
+# Copyright (C) 2020  Atamert Ölçgen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+if "bpy" in locals():
+    import importlib
+    for mod in [mesh, scheduler]:  # noqa: F821
+        importlib.reload(mod)
+else:
+    # stdlib
+    import dataclasses
+    import typing
+    # blender
+    import bpy
+    # addon
+    from . import (mesh, scheduler)
+
+
+@dataclasses.dataclass
+class Item:
+    """Stats of one mesh, as part of `Totals`."""
+    name: str
+    instance_count: int
+    counts: mesh.Counts
+
+    @property
+    def face_count(self) -> int:
+        return self.counts.face_count * self.instance_count
+
+    @property
+    def total_poles_count(self) -> int:
+        return self.counts.total_poles_count * self.instance_count
+
+
+@dataclasses.dataclass
+class Totals:
+    """Stats of multiple mesh objects.
+
+    Each mesh datablock is analyzed once, its stats are multiplied by the
+    number of objects & collection instances using it.
+    """
+    instance_count: int = 0
+    # Number of unique meshes, linked duplicates are counted once.
+    mesh_count: int = 0
+    # Number of instances not counted, because they are not eligible or
+    # are not calculated yet.
+    skipped_count: int = 0
+    # Number of unique meshes being calculated, their instances are
+    # included in `skipped_count`.
+    pending_count: int = 0
+    # Number of unique meshes that failed to calculate, their instances
+    # are included in `skipped_count`.
+    failed_count: int = 0
+
+    face_count: int = 0
+    tris_count: int = 0
+    quads_count: int = 0
+    ngons_count: int = 0
+    n_poles_count: int = 0
+    e_poles_count: int = 0
+    star_poles_count: int = 0
+
+    # Per mesh breakdown, in the order meshes are added.
+    items: typing.List[Item] = dataclasses.field(default_factory=list)
+
+    @property
+    def total_poles_count(self) -> int:
+        return self.n_poles_count + self.e_poles_count + self.star_poles_count
+
+    def add(self, item: Item) -> None:
+        counts = item.counts
+        count = item.instance_count
+        self.items.append(item)
+        self.instance_count += count
+        self.mesh_count += 1
+        self.face_count += counts.face_count * count
+        self.tris_count += counts.tris_count * count
+        self.quads_count += counts.quads_count * count
+        self.ngons_count += counts.ngons_count * count
+        self.n_poles_count += counts.n_poles_count * count
+        self.e_poles_count += counts.e_poles_count * count
+        self.star_poles_count += counts.star_poles_count * count
+
+
+def count_instances(
+        objs: typing.Iterable[bpy.types.Object]
+) -> typing.Dict[mesh.CacheKey, typing.Tuple[bpy.types.Object, int]]:
+    """Count instances of mesh objects, grouped by cache key.
+
+    Returns the first original object found for each key, along with the
+    number of instances.
+    """
+    instances: typing.Dict[
+        mesh.CacheKey,
+        typing.Tuple[bpy.types.Object, int]
+    ] = {}
+    for obj in objs:
+        if obj.type != 'MESH':
+            continue
+        cache_key = mesh.get_cache_key(obj)
+        (first, count) = instances.get(cache_key, (obj, 0))
+        instances[cache_key] = (first, count + 1)
+    return instances
+
+
+def get_objects(
+        context: bpy.types.Context,
+        scope: str
+) -> typing.Iterator[bpy.types.Object]:
+    """Original objects in `scope`, once for each instance."""
+    if scope == 'SELECTED':
+        yield from context.selected_objects
+    elif scope == 'COLLECTION':
+        yield from context.collection.all_objects
+    else:
+        assert scope == 'SCENE'
+        depsgraph = context.evaluated_depsgraph_get()
+        for instance in depsgraph.object_instances:
+            yield instance.object.original
+
+
+def calculate_totals(
+        context: bpy.types.Context,
+        scope: str = 'SCENE'
+) -> Totals:
+    totals = Totals()
+    instances = count_instances(get_objects(context, scope))
+    eligible = [
+        (obj, count)
+        for (obj, count) in instances.values()
+        if mesh.check_eligibility(obj) == mesh.Eligibility.OK
+    ]
+    totals.skipped_count = sum(c for (_, c) in instances.values()) \
+        - sum(c for (_, c) in eligible)
+
+    # Only counts are read, they are kept when meshes are evicted from the
+    # cache, so meshes are not analyzed again when the scope has more of
+    # them than the cache holds.  Meshes without counts are analyzed in
+    # the background, totals are partial until they are done.  Meshes that
+    # failed are not queued again, until they are updated.
+    stale = []
+    for (obj, count) in eligible:
+        counts = mesh.cache.get_counts(context, obj)
+        if counts is None:
+            if mesh.cache.is_failed(context, obj):
+                totals.failed_count += 1
+            else:
+                stale.append(obj)
+            totals.skipped_count += count
+        else:
+            totals.add(Item(obj.data.name, count, counts))
+    totals.pending_count = len(stale)
+    if stale:
+        scheduler.scheduler.queue(stale)
+    return totals
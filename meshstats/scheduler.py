@@ -0,0 +1,194 @@
+# <pep8-80 compliant>
+
+# meshstats is a Blender addon that provides mesh statistics.
+# Copyright (C) 2020  Atamert Ölçgen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+if "bpy" in locals():
+    import importlib
+    for mod in [constants, meshstats_context, mesh, trace]:  # noqa: F821
+        importlib.reload(mod)
+else:
+    # stdlib
+    import itertools
+    import logging
+    import time
+    import typing
+    # blender
+    import bpy
+    # addon
+    from . import constants
+    from . import context as meshstats_context
+    from . import (mesh, trace)
+
+
+log = logging.getLogger(__name__)
+
+
+class Scheduler:
+    """Coalesces geometry updates & recalculates at a limited rate.
+
+    Objects are marked dirty from depsgraph updates and recalculated from
+    a `bpy.app.timers` callback, at most `max_updates_per_second` times a
+    second.  Updates arriving while a recalculation is pending are merged
+    into it.  The last pending recalculation always runs, so stats settle
+    to the final state of the mesh once editing stops.
+
+    Objects that only need their counts, e.g. for totals, are queued
+    instead.  They are analyzed in batches from another timer, for up to
+    `ANALYSIS_TIME_BUDGET` seconds at a time.
+    """
+    def __init__(self):
+        self.pending: typing.Set[str] = set()
+        # Names of queued objects, in the order they are queued.
+        self.queued: typing.Dict[str, None] = {}
+        self.coalesced: int = 0
+        # Time of the last recalculation, from `time.monotonic()`.
+        self.last_run: float = float('-inf')
+
+    def mark_dirty(self, obj: bpy.types.Object) -> None:
+        if obj.name in self.pending:
+            self.coalesced += 1
+        self.pending.add(obj.name)
+        if not bpy.app.timers.is_registered(_timer):
+            bpy.app.timers.register(
+                _timer,
+                first_interval=self._delay(bpy.context)
+            )
+
+    def queue(self, objs: typing.Iterable[bpy.types.Object]) -> None:
+        for obj in objs:
+            self.queued[obj.name] = None
+        if self.queued and not bpy.app.timers.is_registered(_queue_timer):
+            bpy.app.timers.register(_queue_timer)
+
+    def cancel(self) -> None:
+        if bpy.app.timers.is_registered(_timer):
+            bpy.app.timers.unregister(_timer)
+        if bpy.app.timers.is_registered(_queue_timer):
+            bpy.app.timers.unregister(_queue_timer)
+        self.pending.clear()
+        self.queued.clear()
+        self.coalesced = 0
+
+    @trace.traced("Scheduler.run")
+    def run(self) -> None:
+        context: bpy.types.Context = bpy.context
+        (names, self.pending) = (self.pending, set())
+        start = time.time_ns()
+        for name in names:
+            obj = context.blend_data.objects.get(name)
+            if obj is None or obj.type != 'MESH':
+                continue
+            elif mesh.check_eligibility(obj) == mesh.Eligibility.OK:
+                mesh.cache.update(context, obj)
+            elif mesh.is_estimated(obj):
+                mesh.cache.queue_estimate(obj)
+        time_taken = int((time.time_ns() - start) / 1_000_000)
+        log.info(
+            "Recalculated {0} object(s) in {1}ms, skipped {2}.".format(
+                len(names),
+                time_taken,
+                self.coalesced
+            )
+        )
+        self.coalesced = 0
+        self.last_run = time.monotonic()
+        meshstats_context.tag_redraw(context)
+
+    @trace.traced("Scheduler.run_queued")
+    def run_queued(self) -> bool:
+        """Analyze queued objects until the time budget is spent.
+
+        Returns whether there are still objects queued.
+        """
+        context: bpy.types.Context = bpy.context
+        deadline = time.monotonic() + constants.ANALYSIS_TIME_BUDGET
+        while self.queued and time.monotonic() < deadline:
+            # A batch is analyzed concurrently, see `Cache.update_all`.
+            names = list(itertools.islice(
+                self.queued,
+                constants.ANALYSIS_MAX_WORKERS
+            ))
+            objs = []
+            for name in names:
+                del self.queued[name]
+                obj = context.blend_data.objects.get(name)
+                if obj is not None \
+                   and obj.type == 'MESH' \
+                   and mesh.check_eligibility(obj) == mesh.Eligibility.OK:
+                    objs.append(obj)
+            if objs:
+                mesh.cache.update_all(context, objs)
+        meshstats_context.tag_redraw(context)
+        return len(self.queued) > 0
+
+    def _delay(self, context: bpy.types.Context) -> float:
+        addon_prefs = \
+            context.preferences.addons[constants.ADDON_NAME].preferences
+        interval = 1.0 / addon_prefs.max_updates_per_second
+        return max(0.0, self.last_run + interval - time.monotonic())
+
+
+scheduler = Scheduler()
+
+
+def _timer() -> typing.Optional[float]:
+    scheduler.run()
+    # Returning `None` unregisters the timer, the next update registers
+    # it again.
+    return None
+
+
+def _queue_timer() -> typing.Optional[float]:
+    pending = scheduler.run_queued()
+    return constants.ANALYSIS_TICK_INTERVAL if pending else None
+
+
+@bpy.app.handlers.persistent
+def app__load_pre_handler(*args_):
+    scheduler.cancel()
+
+
+@bpy.app.handlers.persistent
+def app__depsgraph_update_post(
+        scene: bpy.types.Scene,
+        depsgraph: bpy.types.Depsgraph
+) -> None:
+    context: bpy.types.Context = bpy.context
+    active = meshstats_context.get_object(context)
+    dirty: typing.Set[mesh.CacheKey] = set()
+    updated = []
+    for u in depsgraph.updates:
+        obj = u.id.original
+        if not u.is_updated_geometry \
+           or not isinstance(obj, bpy.types.Object) \
+           or obj.type != 'MESH':
+            continue
+        if obj == active \
+           and (mesh.check_eligibility(obj) == mesh.Eligibility.OK
+                or mesh.is_estimated(obj)):
+            # Stale stats of the active object are shown until the
+            # scheduler recalculates them.
+            scheduler.mark_dirty(obj)
+            dirty.add(mesh.get_cache_key(obj))
+        else:
+            updated.append(obj)
+    for obj in updated:
+        # Linked duplicates of the active object share its entry, expiring
+        # it would have it recalculated right away instead of by the
+        # scheduler.
+        if mesh.get_cache_key(obj) not in dirty:
+            mesh.cache.expire(obj)
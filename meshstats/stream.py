@@ -0,0 +1,519 @@
+# <pep8-80 compliant>
+
+# meshstats is a Blender addon that provides mesh statistics.
+# Copyright (C) 2020  Atamert Ölçgen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Face & pole counts of OBJ and PLY files that do not fit in memory.
+
+    python -m meshstats.stream scan.obj scan.ply
+
+Faces are read in chunks of `ANALYSIS_CHUNK_SIZE`.  Per vertex counters are
+kept in memory-mapped temporary files, so memory use does not grow with
+the size of the mesh.
+"""
+
+import argparse
+import dataclasses
+import json
+import logging
+import os
+import struct
+import sys
+import tempfile
+import typing
+
+import numpy as np
+
+from . import (analysis, constants)
+
+
+log = logging.getLogger(__name__)
+
+# Faces as (loop_total, loop_vertices) arrays, see `analysis.MeshArrays`.
+Faces = typing.Tuple[np.ndarray, np.ndarray]
+
+PLY_TYPES = {
+    'char': 'i1', 'int8': 'i1',
+    'uchar': 'u1', 'uint8': 'u1',
+    'short': 'i2', 'int16': 'i2',
+    'ushort': 'u2', 'uint16': 'u2',
+    'int': 'i4', 'int32': 'i4',
+    'uint': 'u4', 'uint32': 'u4',
+    'float': 'f4', 'float32': 'f4',
+    'double': 'f8', 'float64': 'f8',
+}
+
+
+@dataclasses.dataclass
+class Stats:
+    """Counts of a mesh file, same as the ones displayed in the panel."""
+    vertex_count: int = 0
+    face_count: int = 0
+    tris_count: int = 0
+    quads_count: int = 0
+    ngons_count: int = 0
+    tesellated_tris_count: int = 0
+    tris_percentage: int = 0
+    quads_percentage: int = 0
+    ngons_percentage: int = 0
+    n_poles_count: int = 0
+    e_poles_count: int = 0
+    star_poles_count: int = 0
+
+    @property
+    def total_poles_count(self) -> int:
+        return self.n_poles_count + self.e_poles_count + self.star_poles_count
+
+    def add_faces(self, loop_total: np.ndarray) -> None:
+        self.face_count += len(loop_total)
+        self.tris_count += int(np.count_nonzero(loop_total == 3))
+        self.quads_count += int(np.count_nonzero(loop_total == 4))
+        self.ngons_count += int(np.count_nonzero(loop_total > 4))
+        # A face with n corners tessellates into n - 2 triangles.
+        self.tesellated_tris_count += int(
+            np.sum(loop_total - 2, dtype=np.int64)
+        )
+        (self.tris_percentage,
+         self.quads_percentage,
+         self.ngons_percentage) = analysis.percentages(
+            self.tris_count,
+            self.quads_count,
+            self.ngons_count
+        )
+
+
+class Valences:
+    """Number of inner edges of each vertex, counted one face at a time.
+
+    Edges are not stored.  For each vertex the number of face corners and
+    the XOR of hashes of its neighbours across face edges are kept instead.
+    An inner edge is shared by two faces and its hashes cancel out, so the
+    XOR is non-zero only on the boundary.  A manifold vertex has as many
+    edges as corners, one more on the boundary where two of its edges are
+    boundary edges, which leaves `corners - 1` inner edges.
+    """
+    def __init__(
+            self,
+            vertex_count: int,
+            tmp_dir: typing.Optional[str] = None
+    ):
+        self.vertex_count = vertex_count
+        self._tmp = tempfile.TemporaryDirectory(
+            prefix="meshstats-",
+            dir=tmp_dir
+        )
+        shape = (max(1, vertex_count),)
+        self.corners = np.memmap(
+            os.path.join(self._tmp.name, "corners"),
+            dtype=np.int32,
+            mode='w+',
+            shape=shape
+        )
+        self.neighbours = np.memmap(
+            os.path.join(self._tmp.name, "neighbours"),
+            dtype=np.uint64,
+            mode='w+',
+            shape=shape
+        )
+
+    def __enter__(self) -> 'Valences':
+        return self
+
+    def __exit__(self, *exc_info: typing.Any) -> None:
+        self.close()
+
+    def add_faces(
+            self,
+            loop_total: np.ndarray,
+            loop_vertices: np.ndarray
+    ) -> None:
+        if len(loop_vertices) == 0:
+            return
+        if loop_vertices.min() < 0 \
+           or loop_vertices.max() >= self.vertex_count:
+            raise ValueError("Face refers to a vertex that does not exist")
+        next_vertices = loop_vertices[analysis.next_corners(
+            analysis.row_offsets(loop_total)[:-1],
+            loop_total
+        )]
+        np.add.at(self.corners, loop_vertices, 1)
+        np.bitwise_xor.at(self.neighbours, loop_vertices, _hash(next_vertices))
+        np.bitwise_xor.at(self.neighbours, next_vertices, _hash(loop_vertices))
+
+    def count_poles(self, stats: Stats) -> None:
+        for chunk in analysis.chunks(self.vertex_count):
+            edge_count = self.corners[chunk] \
+                - (self.neighbours[chunk] != 0).astype(np.int32)
+            stats.n_poles_count += int(np.count_nonzero(edge_count == 3))
+            stats.e_poles_count += int(np.count_nonzero(edge_count == 5))
+            stats.star_poles_count += int(np.count_nonzero(edge_count > 5))
+
+    def close(self) -> None:
+        # Memory maps must be closed before their files are removed.
+        del self.corners
+        del self.neighbours
+        self._tmp.cleanup()
+
+
+def analyze(
+        path: str,
+        chunk_size: int = constants.ANALYSIS_CHUNK_SIZE,
+        tmp_dir: typing.Optional[str] = None
+) -> Stats:
+    """Count faces & poles of an .obj or a .ply file."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".obj":
+        vertex_count = count_obj_vertices(path)
+        faces = read_obj(path, chunk_size)
+    elif ext == ".ply":
+        header = PlyHeader.read(path)
+        vertex_count = header.count('vertex')
+        faces = read_ply(path, chunk_size, header)
+    else:
+        raise ValueError("Unsupported file type: {0}".format(path))
+
+    stats = Stats(vertex_count=vertex_count)
+    with Valences(vertex_count, tmp_dir) as valences:
+        for (loop_total, loop_vertices) in faces:
+            stats.add_faces(loop_total)
+            valences.add_faces(loop_total, loop_vertices)
+            log.debug("{0}: {1} faces".format(path, stats.face_count))
+        valences.count_poles(stats)
+    return stats
+
+
+def count_obj_vertices(path: str) -> int:
+    vertex_count = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if line.startswith(b"v "):
+                vertex_count += 1
+    return vertex_count
+
+
+def read_obj(path: str, chunk_size: int) -> typing.Iterator[Faces]:
+    vertex_count = 0
+    loop_total: typing.List[int] = []
+    loop_vertices: typing.List[int] = []
+    with open(path, "rb") as f:
+        for line in f:
+            if line.startswith(b"v "):
+                vertex_count += 1
+            elif line.startswith(b"f "):
+                # `v`, `v/vt`, `v//vn` or `v/vt/vn`, 1 based or negative,
+                # relative to the last vertex.
+                corners = [
+                    int(token.split(b"/", 1)[0])
+                    for token in line.split()[1:]
+                ]
+                loop_total.append(len(corners))
+                loop_vertices.extend(
+                    c - 1 if c > 0 else vertex_count + c for c in corners
+                )
+                if len(loop_total) >= chunk_size:
+                    yield _faces(loop_total, loop_vertices)
+                    loop_total = []
+                    loop_vertices = []
+    if loop_total:
+        yield _faces(loop_total, loop_vertices)
+
+
+@dataclasses.dataclass
+class PlyHeader:
+    format: str
+    # Elements in file order, as (name, count, properties).  A property is
+    # (name, type), list properties are (name, (count type, item type)).
+    elements: typing.List[
+        typing.Tuple[str, int, typing.List[typing.Tuple[str, typing.Any]]]
+    ]
+    size: int
+
+    @classmethod
+    def read(cls, path: str) -> 'PlyHeader':
+        elements: typing.List[typing.Any] = []
+        format_ = ''
+        with open(path, "rb") as f:
+            if f.readline().strip() != b"ply":
+                raise ValueError("Not a PLY file: {0}".format(path))
+            for line in f:
+                words = line.decode("ascii").split()
+                if not words or words[0] in ('comment', 'obj_info'):
+                    continue
+                elif words[0] == 'format':
+                    format_ = words[1]
+                elif words[0] == 'element':
+                    elements.append((words[1], int(words[2]), []))
+                elif words[0] == 'property' and words[1] == 'list':
+                    elements[-1][2].append((words[4], (words[2], words[3])))
+                elif words[0] == 'property':
+                    elements[-1][2].append((words[2], words[1]))
+                elif words[0] == 'end_header':
+                    break
+            return cls(format=format_, elements=elements, size=f.tell())
+
+    def count(self, name: str) -> int:
+        for (element, count, _) in self.elements:
+            if element == name:
+                return count
+        return 0
+
+
+def read_ply(
+        path: str,
+        chunk_size: int,
+        header: PlyHeader
+) -> typing.Iterator[Faces]:
+    byte_order = {
+        'ascii': None,
+        'binary_little_endian': '<',
+        'binary_big_endian': '>',
+    }[header.format]
+    with open(path, "rb") as f:
+        f.seek(header.size)
+        for (name, count, properties) in header.elements:
+            if name == 'face':
+                if len(properties) != 1 \
+                   or not isinstance(properties[0][1], tuple):
+                    raise ValueError(
+                        "Only faces with a vertex index list are supported"
+                    )
+                if byte_order is None:
+                    yield from _read_ascii_faces(f, count, chunk_size)
+                else:
+                    (count_type, index_type) = properties[0][1]
+                    yield from _read_binary_faces(
+                        f,
+                        count,
+                        chunk_size,
+                        np.dtype(byte_order + PLY_TYPES[count_type]),
+                        np.dtype(byte_order + PLY_TYPES[index_type])
+                    )
+                return
+            elif byte_order is None:
+                for _ in range(count):
+                    f.readline()
+            elif any(isinstance(t, tuple) for (_, t) in properties):
+                raise ValueError(
+                    "List properties are not supported in {0}".format(name)
+                )
+            else:
+                f.seek(count * sum(
+                    np.dtype(PLY_TYPES[t]).itemsize for (_, t) in properties
+                ), os.SEEK_CUR)
+
+
+def main(argv: typing.List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m meshstats.stream",
+        description="Count faces & poles of .obj and .ply files."
+    )
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=constants.ANALYSIS_CHUNK_SIZE,
+        help="number of faces read at a time"
+    )
+    parser.add_argument(
+        "--tmp-dir",
+        help="directory for vertex counters, 12 bytes per vertex"
+    )
+    args = parser.parse_args(argv)
+
+    results = {}
+    for path in args.paths:
+        stats = analyze(path, args.chunk_size, args.tmp_dir)
+        if args.json:
+            results[path] = dict(
+                dataclasses.asdict(stats),
+                total_poles_count=stats.total_poles_count
+            )
+        else:
+            print(_format(path, stats))
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+def _faces(
+        loop_total: typing.List[int],
+        loop_vertices: typing.List[int]
+) -> Faces:
+    return (
+        np.array(loop_total, dtype=np.int32),
+        np.array(loop_vertices, dtype=np.int64)
+    )
+
+
+def _hash(values: np.ndarray) -> np.ndarray:
+    """Scramble vertex indices, splitmix64 finalizer."""
+    x = values.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _read_ascii_faces(
+        f: typing.BinaryIO,
+        count: int,
+        chunk_size: int
+) -> typing.Iterator[Faces]:
+    for start in range(0, count, chunk_size):
+        loop_total: typing.List[int] = []
+        loop_vertices: typing.List[int] = []
+        for _ in range(min(chunk_size, count - start)):
+            words = f.readline().split()
+            n = int(words[0])
+            loop_total.append(n)
+            loop_vertices.extend(int(w) for w in words[1:n + 1])
+        yield _faces(loop_total, loop_vertices)
+
+
+def _read_binary_faces(
+        f: typing.BinaryIO,
+        count: int,
+        chunk_size: int,
+        count_dtype: np.dtype,
+        index_dtype: np.dtype
+) -> typing.Iterator[Faces]:
+    """Read faces in chunks of `chunk_size`, each byte is read once.
+
+    File is read in blocks, faces that do not fit in a block are carried
+    over to the next one.  File position is left at the end of faces.
+    """
+    # Room for `chunk_size` quads, the usual face of a scan.  Blocks grow
+    # when faces are larger.
+    block_size = chunk_size * (count_dtype.itemsize + 4 * index_dtype.itemsize)
+    buffer = b""
+    remaining = count
+    end_of_file = False
+    while remaining > 0:
+        chunk_count = min(chunk_size, remaining)
+        (starts, loop_total) = _face_records(
+            buffer,
+            chunk_count,
+            count_dtype,
+            index_dtype
+        )
+        if len(loop_total) < chunk_count and not end_of_file:
+            data = f.read(max(block_size, len(buffer)))
+            end_of_file = len(data) == 0
+            buffer += data
+            continue
+        elif len(loop_total) == 0:
+            raise ValueError("Unexpected end of file")
+        index_starts = starts + count_dtype.itemsize
+        index_bytes = np.frombuffer(buffer, dtype=np.uint8)[analysis.ranges(
+            index_starts,
+            loop_total.astype(np.int64) * index_dtype.itemsize
+        )]
+        end = int(index_starts[-1]) + int(loop_total[-1]) \
+            * index_dtype.itemsize
+        buffer = buffer[end:]
+        remaining -= len(loop_total)
+        yield (
+            loop_total.astype(np.int32),
+            index_bytes.view(index_dtype).astype(np.int64)
+        )
+    f.seek(-len(buffer), os.SEEK_CUR)
+
+
+def _face_records(
+        buffer: bytes,
+        max_count: int,
+        count_dtype: np.dtype,
+        index_dtype: np.dtype
+) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """Offsets & corner counts of complete faces at the start of `buffer`.
+
+    Faces of a scan usually have the same number of corners, so the buffer
+    is tried as fixed size records first.  Faces are walked one at a time
+    otherwise.
+    """
+    if len(buffer) < count_dtype.itemsize:
+        return (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+    n = int(np.frombuffer(buffer, count_dtype, count=1)[0])
+    if n < 0:
+        raise ValueError("Face with a negative number of corners")
+    record_size = count_dtype.itemsize + n * index_dtype.itemsize
+    fixed_count = min(max_count, len(buffer) // record_size)
+    counts: np.ndarray = np.ndarray(
+        (fixed_count,),
+        dtype=count_dtype,
+        buffer=buffer,
+        strides=(record_size,)
+    )
+    if np.all(counts == n):
+        return (
+            np.arange(fixed_count, dtype=np.int64) * record_size,
+            np.full(fixed_count, n, dtype=np.int64)
+        )
+
+    read_count = struct.Struct(
+        ('>' if count_dtype.str[0] == '>' else '<') + count_dtype.char
+    ).unpack_from
+    starts: typing.List[int] = []
+    loop_total: typing.List[int] = []
+    offset = 0
+    while len(loop_total) < max_count \
+            and offset + count_dtype.itemsize <= len(buffer):
+        n = read_count(buffer, offset)[0]
+        if n < 0:
+            raise ValueError("Face with a negative number of corners")
+        end = offset + count_dtype.itemsize + n * index_dtype.itemsize
+        if end > len(buffer):
+            break
+        starts.append(offset)
+        loop_total.append(n)
+        offset = end
+    return (
+        np.array(starts, dtype=np.int64),
+        np.array(loop_total, dtype=np.int64)
+    )
+
+
+def _format(path: str, stats: Stats) -> str:
+    return "\n".join([
+        path,
+        "  Vertices  {0}".format(stats.vertex_count),
+        "  Faces     {0}".format(stats.face_count),
+        "  Tris      {0} ({1}%)".format(
+            stats.tris_count,
+            stats.tris_percentage
+        ),
+        "  Quads     {0} ({1}%)".format(
+            stats.quads_count,
+            stats.quads_percentage
+        ),
+        "  Ngons     {0} ({1}%)".format(
+            stats.ngons_count,
+            stats.ngons_percentage
+        ),
+        "  Triangles {0}".format(stats.tesellated_tris_count),
+        "  Poles     {0} (N: {1}, E: {2}, *: {3})".format(
+            stats.total_poles_count,
+            stats.n_poles_count,
+            stats.e_poles_count,
+            stats.star_poles_count
+        ),
+    ])
+
+
+if __name__ == "__main__":
+    logging.basicConfig()
+    sys.exit(main(sys.argv[1:]))
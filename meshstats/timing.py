@@ -0,0 +1,115 @@
+# <pep8-80 compliant>
+
+# meshstats is a Blender addon that provides mesh statistics.
+# Copyright (C) 2020  Atamert Ölçgen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import collections
+import contextlib
+import dataclasses
+import time
+import typing
+
+from . import (constants, trace)
+
+
+# Stages in the order they run, records display them in this order.
+STAGES = [
+    'read',
+    'fingerprint',
+    'faces',
+    'poles',
+    'refresh',
+    'visibility',
+    'overlay',
+]
+
+T = typing.TypeVar('T')
+
+
+@dataclasses.dataclass(frozen=True)
+class Record:
+    """Time taken by each stage of an update or a draw."""
+    # Name of the mesh or object.
+    name: str
+    # 'UPDATE', 'ESTIMATE' or 'DRAW'
+    kind: str
+    # Stage name to milliseconds.
+    stages: typing.Dict[str, float]
+    created: float = dataclasses.field(default_factory=time.time)
+
+    @property
+    def total(self) -> float:
+        return sum(self.stages.values())
+
+    def format_stages(self) -> str:
+        return ", ".join(
+            "{0} {1:.1f}ms".format(stage, self.stages[stage])
+            for stage in STAGES
+            if stage in self.stages
+        )
+
+
+class History:
+    """Ring buffer of the most recent records."""
+    def __init__(self, size: int = constants.TIMING_HISTORY_SIZE):
+        self.records: typing.Deque[Record] = collections.deque(maxlen=size)
+
+    def add(self, record: Record) -> None:
+        if record.stages:
+            self.records.append(record)
+
+    def clear(self) -> None:
+        self.records.clear()
+
+
+history = History()
+
+
+@contextlib.contextmanager
+def measure(
+        stages: typing.Dict[str, float],
+        stage: str
+) -> typing.Iterator[None]:
+    """Add time taken by the block to `stages[stage]`.
+
+    The block is also recorded as a span if tracing is enabled.
+    """
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        end = time.perf_counter_ns()
+        stages[stage] = stages.get(stage, 0.0) + (end - start) / 1_000_000
+        trace.tracer.add(stage, start, end)
+
+
+def measure_steps(
+        steps: typing.Generator[float, None, T],
+        stages: typing.Dict[str, float],
+        stage: str
+) -> typing.Generator[float, None, T]:
+    """Add time taken by each step to `stages[stage]`.
+
+    Time between steps, e.g. while a job waits for the next timer tick,
+    is not counted.
+    """
+    while True:
+        try:
+            with measure(stages, stage):
+                progress = next(steps)
+        except StopIteration as stop:
+            return stop.value
+        yield progress
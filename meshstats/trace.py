@@ -0,0 +1,105 @@
+# <pep8-80 compliant>
+
+# meshstats is a Blender addon that provides mesh statistics.
+# Copyright (C) 2020  Atamert Ölçgen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import collections
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import typing
+
+from . import constants
+
+
+F = typing.TypeVar('F', bound=typing.Callable[..., typing.Any])
+
+
+class Tracer:
+    """Records spans as Chrome trace events, when enabled.
+
+    Events are kept in a bounded buffer, oldest events are dropped first.
+    The buffer can be saved with `dump` & opened in a trace viewer such
+    as `chrome://tracing` or Perfetto.
+    """
+    def __init__(self, size: int = constants.TRACE_BUFFER_SIZE):
+        self.enabled = False
+        self.events: typing.Deque[typing.Dict[str, typing.Any]] = \
+            collections.deque(maxlen=size)
+
+    def add(
+            self,
+            name: str,
+            start: int,
+            end: int,
+            **args: typing.Any
+    ) -> None:
+        """Record a span, `start` & `end` are `time.perf_counter_ns()`."""
+        if not self.enabled:
+            return
+        self.events.append({
+            "name": name,
+            "cat": constants.ADDON_NAME,
+            "ph": "X",
+            "ts": start / 1000,
+            "dur": (end - start) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args: typing.Any) -> typing.Iterator[None]:
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter_ns(), **args)
+
+    def clear(self) -> None:
+        self.events.clear()
+
+    def dump(self, path: str) -> int:
+        """Write events as a trace event JSON file.
+
+        Returns the number of events written.
+        """
+        events = list(self.events)
+        with open(path, "w") as f:
+            json.dump(
+                {"traceEvents": events, "displayTimeUnit": "ms"},
+                f
+            )
+        return len(events)
+
+
+tracer = Tracer()
+
+
+def traced(name: str) -> typing.Callable[[F], F]:
+    """Decorator recording a span around each call of a function."""
+    def decorator(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+        return typing.cast(F, wrapper)
+    return decorator
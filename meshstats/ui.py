@@ -18,13 +18,21 @@
 
 if "bpy" in locals():
     import importlib
-    for mod in [meshstats_context, icon, mesh]:  # noqa: F821
+    for mod in [  # noqa: F821
+            constants,
+            meshstats_context,
+            icon,
+            mesh,
+            scene,
+            timing
+    ]:
         importlib.reload(mod)
 else:
     import typing
     import bpy
+    from . import constants
     from . import context as meshstats_context
-    from . import (icon, mesh)
+    from . import (icon, mesh, scene, timing)
 
 
 class MeshstatsPanel(bpy.types.Panel):
@@ -87,13 +95,26 @@ class VIEW3D_PT_meshstats(MeshstatsPanel):
             match mesh.check_eligibility(obj):
                 case mesh.Eligibility.OK:
                     mesh_data = mesh.cache.get(context, obj)
+                    job = mesh.cache.job(obj)
                     if mesh_data is not None:
+                        if job is not None:
+                            self._draw_progress(self.layout, job, "Updating")
                         self._draw_summary_table(self.layout, mesh_data)
                         self.layout.separator(factor=0.75)
                         self._draw_budget(self.layout, context, mesh_data)
                         self.layout.separator(factor=0.75)
                         self.layout.label(text="Overlays:")
                         self._draw_overlay_options(context, self.layout)
+                    elif job is not None:
+                        self._draw_progress(self.layout, job, "Calculating")
+                        # Counts are filled in as faces are processed.
+                        self._draw_summary_table(self.layout, job.mesh)
+                    elif mesh.cache.is_failed(context, obj):
+                        self.layout.alert = True
+                        self.layout.label(
+                            text="Failed to calculate, see the console."
+                        )
+                        self.layout.alert = False
                     else:
                         self.layout.alert = True
                         self.layout.label(text="Calculating...")
@@ -107,6 +128,27 @@ class VIEW3D_PT_meshstats(MeshstatsPanel):
                     self.layout.alert = True
                     self.layout.label(text="Too many faces")
                     self.layout.alert = False
+                    if mesh.is_estimated(obj):
+                        approximation = mesh.cache.estimate(context, obj)
+                        self.layout.alert = True
+                        if mesh.cache.is_estimating(obj):
+                            self.layout.label(text="Estimating...")
+                        elif mesh.cache.is_failed(context, obj):
+                            self.layout.label(
+                                text="Failed to estimate, see the console."
+                            )
+                        self.layout.alert = False
+                        # Stale estimates are shown until they are done.
+                        if approximation is not None:
+                            self._draw_estimate_table(
+                                self.layout,
+                                approximation
+                            )
+                        self.layout.separator(factor=1.5)
+                    elif mesh.has_unsupported_modifiers(obj):
+                        self.layout.label(
+                            text="Not estimated, disabled by modifier."
+                        )
                     self.layout.operator(
                         "object.meshstats_disable_object",
                         icon='QUIT'
@@ -152,6 +194,12 @@ class VIEW3D_PT_meshstats(MeshstatsPanel):
             col.label(text="Utilization is {:.2%}.".format(u))
             col.alert = False
 
+    @staticmethod
+    def _draw_progress(layout, job, text):
+        layout.alert = True
+        layout.label(text="{0}... {1:.0%}".format(text, job.progress))
+        layout.alert = False
+
     @staticmethod
     def _draw_summary_table(layout, mesh_data):
         layout.label(text="Faces:")
@@ -192,6 +240,209 @@ class VIEW3D_PT_meshstats(MeshstatsPanel):
         j.label(text="{}".format(len(mesh_data.star_poles)))
         j.label(text="{}".format(mesh_data.total_poles_count))
 
+    @staticmethod
+    def _draw_estimate_table(layout, approximation):
+        layout.label(
+            text="Estimated from {0} faces & {1} vertices.".format(
+                approximation.face_sample_size,
+                approximation.vertex_sample_size
+            ),
+            icon='INFO'
+        )
+        layout.label(text="Faces (estimated):")
+        box = layout.box()
+        j = box.grid_flow(columns=3)
+        j.label(text="")
+        j.label(text="Tris")
+        j.label(text="Quads")
+        j.label(text="Ngons")
+        j.label(text="Total")
+
+        estimates = [
+            approximation.tris,
+            approximation.quads,
+            approximation.ngons
+        ]
+        j.label(text="count")
+        for estimate in estimates:
+            j.label(text=_format_estimate(estimate, "{:.0f}"))
+        j.label(text="{}".format(approximation.face_count))
+
+        j.label(text="percentage")
+        for estimate in estimates:
+            j.label(text=_format_estimate(
+                approximation.percentage(estimate),
+                "{:.1f}%"
+            ))
+        j.label(text="100%")
+
+        layout.label(text="Poles (estimated):")
+        box = layout.box()
+        j = box.grid_flow(columns=2)
+        j.label(text="N-poles")
+        j.label(text="E-poles")
+        j.label(text="*-poles")
+        j.label(text="Total")
+
+        for estimate in [
+                approximation.n_poles,
+                approximation.e_poles,
+                approximation.star_poles,
+                approximation.total_poles
+        ]:
+            j.label(text=_format_estimate(estimate, "{:.0f}"))
+
+
+class VIEW3D_PT_meshstats_totals(bpy.types.Panel):
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_context = ".objectmode"
+    bl_category = "Item"
+    bl_parent_id = "VIEW3D_PT_meshstats"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    bl_idname = "VIEW3D_PT_meshstats_totals"
+    bl_label = "Totals"
+
+    def draw(self, context: bpy.types.Context) -> None:
+        scene_props = context.scene.meshstats
+        self.layout.prop(scene_props, "totals_scope", expand=True)
+        # Totals are only calculated while this panel is open.
+        totals = scene.calculate_totals(context, scene_props.totals_scope)
+        self.layout.label(text="{0} object(s), {1} unique mesh(es)".format(
+            totals.instance_count,
+            totals.mesh_count
+        ))
+        if totals.pending_count > 0:
+            self.layout.label(text="Calculating {} mesh(es)...".format(
+                totals.pending_count
+            ))
+        if totals.skipped_count > 0:
+            self.layout.alert = True
+            self.layout.label(
+                text="{} object(s) not counted".format(totals.skipped_count)
+            )
+            if totals.failed_count > 0:
+                self.layout.label(
+                    text="Failed to calculate {} mesh(es).".format(
+                        totals.failed_count
+                    )
+                )
+            self.layout.alert = False
+
+        self.layout.label(text="Faces:")
+        box = self.layout.box()
+        j = box.grid_flow(columns=2)
+        j.label(text="Tris")
+        j.label(text="Quads")
+        j.label(text="Ngons")
+        j.label(text="Total")
+
+        j.label(text="{}".format(totals.tris_count))
+        j.label(text="{}".format(totals.quads_count))
+        j.label(text="{}".format(totals.ngons_count))
+        j.label(text="{}".format(totals.face_count))
+
+        self.layout.label(text="Poles:")
+        box = self.layout.box()
+        j = box.grid_flow(columns=2)
+        j.label(text="N-poles")
+        j.label(text="E-poles")
+        j.label(text="*-poles")
+        j.label(text="Total")
+
+        j.label(text="{}".format(totals.n_poles_count))
+        j.label(text="{}".format(totals.e_poles_count))
+        j.label(text="{}".format(totals.star_poles_count))
+        j.label(text="{}".format(totals.total_poles_count))
+
+        if totals.items:
+            self._draw_breakdown(self.layout, totals)
+
+    @staticmethod
+    def _draw_breakdown(layout, totals):
+        layout.label(text="Meshes:")
+        box = layout.box()
+        col = box.column(align=True)
+        row = col.row()
+        row.label(text="Mesh")
+        row.label(text="Faces")
+        row.label(text="Poles")
+        items = sorted(totals.items, key=lambda i: i.face_count, reverse=True)
+        for item in items[:constants.TOTALS_BREAKDOWN_ROWS]:
+            row = col.row()
+            if item.instance_count > 1:
+                row.label(text="{0} ({1}x)".format(
+                    item.name,
+                    item.instance_count
+                ))
+            else:
+                row.label(text=item.name)
+            row.label(text="{}".format(item.face_count))
+            row.label(text="{}".format(item.total_poles_count))
+        if len(items) > constants.TOTALS_BREAKDOWN_ROWS:
+            col.label(text="{} more...".format(
+                len(items) - constants.TOTALS_BREAKDOWN_ROWS
+            ))
+
+
+class VIEW3D_PT_meshstats_timings(bpy.types.Panel):
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_context = ".objectmode"
+    bl_category = "Item"
+    bl_parent_id = "VIEW3D_PT_meshstats"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    bl_idname = "VIEW3D_PT_meshstats_timings"
+    bl_label = "Timings"
+
+    @classmethod
+    def poll(cls, context):
+        addon_prefs = \
+            context.preferences.addons[constants.ADDON_NAME].preferences
+        return addon_prefs.show_timings
+
+    def draw(self, context: bpy.types.Context) -> None:
+        self._draw_cache_stats(self.layout, mesh.cache.stats())
+        if not timing.history.records:
+            self.layout.label(text="Nothing recorded yet.")
+            return
+        # Most recent first.
+        for record in reversed(timing.history.records):
+            col = self.layout.box().column(align=True)
+            col.label(text="{0} {1}: {2:.1f}ms".format(
+                record.kind.lower(),
+                record.name,
+                record.total
+            ))
+            for stage in timing.STAGES:
+                if stage in record.stages:
+                    col.label(text="    {0}: {1:.1f}ms".format(
+                        stage,
+                        record.stages[stage]
+                    ))
+
+    @staticmethod
+    def _draw_cache_stats(layout, stats):
+        col = layout.box().column(align=True)
+        col.label(text="cache: {0} mesh(es), {1} job(s)".format(
+            stats["entries"],
+            stats["jobs"]
+        ))
+        col.label(text="    memory: {0:.1f} / {1:.1f}MB".format(
+            stats["nbytes"] / (1024 * 1024),
+            stats["max_bytes"] / (1024 * 1024)
+        ))
+        col.label(text="    hits: {0}, misses: {1}".format(
+            stats["hits"],
+            stats["misses"]
+        ))
+        col.label(text="    evictions: {0}, failed: {1}".format(
+            stats["evictions"],
+            stats["failed"]
+        ))
+
 
 class VIEW3D_PT_overlay_meshstats(MeshstatsPanel):
     bl_space_type = 'VIEW_3D'
@@ -201,3 +452,11 @@ class VIEW3D_PT_overlay_meshstats(MeshstatsPanel):
 
     def draw(self, context):
         self._draw_overlay_options(context, self.layout)
+
+
+def _format_estimate(estimate, format_: str) -> str:
+    """Estimated value & its margin of error, e.g. `~250 ±12`."""
+    return "~{0} ±{1}".format(
+        format_.format(estimate.value),
+        format_.format(estimate.margin)
+    )
@@ -0,0 +1,432 @@
+# <pep8-80 compliant>
+
+# meshstats is a Blender addon that provides mesh statistics.
+# Copyright (C) 2020  Atamert Ölçgen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+if "bpy" in locals():
+    import importlib
+    for mod in [constants, meshstats_context, mesh, timing]:  # noqa: F821
+        importlib.reload(mod)
+else:
+    # stdlib
+    import collections
+    import dataclasses
+    import itertools
+    import typing
+    # blender
+    import bpy
+    import mathutils
+    from mathutils.bvhtree import BVHTree
+    import numpy as np
+    # addon
+    from . import constants
+    from . import context as meshstats_context
+    from . import (mesh, timing)
+
+
+@dataclasses.dataclass(frozen=True)
+class View:
+    """Minimal description of a 3D view needed to cast rays from it.
+
+    Views made with `from_region_3d` are hashable, so they can be used in
+    visibility cache keys.
+    """
+    is_perspective: bool
+    view_matrix: mathutils.Matrix
+
+    @classmethod
+    def from_region_3d(cls, region_3d: bpy.types.RegionView3D) -> 'View':
+        return cls(
+            is_perspective=region_3d.is_perspective,
+            view_matrix=region_3d.view_matrix.copy().freeze()
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class Occluder:
+    """BVH tree of an object in its local space."""
+    bvh: BVHTree
+    # Length of the bounding box diagonal, used to place orthographic ray
+    # origins outside of the mesh.
+    size: float
+
+
+@dataclasses.dataclass(frozen=True)
+class SceneOccluder:
+    """Another visible object that can hide the overlay.
+
+    Its BVH tree is built on first use, see `SceneOccluders.bvh`.
+    """
+    session_uid: int
+    obj_name: str
+    matrix_world: mathutils.Matrix
+    # Local space minimum & maximum of the bounding box, (2, 3).
+    bounds: np.ndarray
+    # World space corners of the bounding box, (8, 3).
+    corners: np.ndarray
+
+
+class SceneOccluders:
+    """Other objects of the scene that can hide the overlay.
+
+    The list of occluders is rebuilt after depsgraph updates of objects
+    other than the active one.  BVH trees are kept until the geometry of
+    their object is updated.  `generation` changes whenever occlusion by
+    the rest of the scene may have changed.
+    """
+    def __init__(self):
+        self.generation = 0
+        self.bvhs: typing.Dict[int, BVHTree] = {}
+        self._cached: typing.Optional[
+            typing.Tuple[typing.Hashable, typing.List[SceneOccluder]]
+        ] = None
+
+    def get(
+            self,
+            context: bpy.types.Context,
+            obj: bpy.types.Object
+    ) -> typing.List[SceneOccluder]:
+        """Visible mesh objects other than `obj`."""
+        key = (self.generation, obj.session_uid)
+        if self._cached is None or self._cached[0] != key:
+            occluders = []
+            for other in context.visible_objects:
+                if other.type != 'MESH' or other == obj:
+                    continue
+                matrix_world = np.array(other.matrix_world)
+                corners = np.array(other.bound_box, dtype=np.float64)
+                occluders.append(SceneOccluder(
+                    session_uid=other.session_uid,
+                    obj_name=other.name,
+                    matrix_world=other.matrix_world.copy().freeze(),
+                    bounds=np.stack((np.min(corners, axis=0),
+                                     np.max(corners, axis=0))),
+                    corners=corners @ matrix_world[:3, :3].T
+                    + matrix_world[:3, 3]
+                ))
+            self._cached = (key, occluders)
+        return self._cached[1]
+
+    def bvh(self, occluder: SceneOccluder) -> typing.Optional[BVHTree]:
+        """BVH tree of `occluder` in its local space."""
+        bvh = self.bvhs.get(occluder.session_uid)
+        if bvh is None:
+            context: bpy.types.Context = bpy.context
+            obj = context.blend_data.objects.get(occluder.obj_name)
+            if obj is None:
+                return None
+            bvh = BVHTree.FromObject(obj, context.evaluated_depsgraph_get())
+            self.bvhs[occluder.session_uid] = bvh
+        return bvh
+
+    def update(self, depsgraph: bpy.types.Depsgraph) -> None:
+        active = meshstats_context.get_object()
+        changed = False
+        for u in depsgraph.updates:
+            updated = u.id.original
+            if isinstance(updated, bpy.types.Object):
+                if u.is_updated_geometry:
+                    self.bvhs.pop(updated.session_uid, None)
+                # Masks of the active object are keyed by its own mesh
+                # version & transform already.
+                changed = changed or updated != active
+            elif not isinstance(updated, bpy.types.Mesh):
+                # Scene, collections & view layers, e.g. objects are
+                # hidden or added.
+                changed = True
+        if changed:
+            self.generation += 1
+
+    def clear(self) -> None:
+        self.generation += 1
+        self.bvhs.clear()
+        self._cached = None
+
+
+@dataclasses.dataclass
+class Mask:
+    """Visibility mask of overlay elements & values derived from it."""
+    visible: np.ndarray
+    # Derived values, e.g. overlay batches, by name, along with the key
+    # they are built for.
+    derived: typing.Dict[
+        str,
+        typing.Tuple[typing.Hashable, typing.Any]
+    ] = dataclasses.field(default_factory=dict)
+
+
+class Cache:
+    """Visibility masks, keyed by view, mesh version, object transform &
+    `SceneOccluders.generation`.
+
+    Redraws that do not change the view, and viewports that share the
+    same view, reuse the masks.  Least recently used masks are evicted
+    when there are more than `max_size` of them.  Derived values are
+    dropped from all but the `max_derived` most recently used masks.
+    """
+    def __init__(
+            self,
+            max_size: int = constants.VISIBILITY_CACHE_SIZE,
+            max_derived: int = constants.VISIBILITY_DERIVED_CACHE_SIZE
+    ):
+        self.d: collections.OrderedDict[typing.Hashable, Mask] = \
+            collections.OrderedDict()
+        self.max_size = max_size
+        self.max_derived = max_derived
+
+    def get(
+            self,
+            key: typing.Hashable,
+            compute: typing.Callable[[], np.ndarray]
+    ) -> Mask:
+        mask = self.d.get(key)
+        if mask is None:
+            mask = Mask(visible=compute())
+            self.d[key] = mask
+            while len(self.d) > self.max_size:
+                self.d.popitem(last=False)
+        else:
+            self.d.move_to_end(key)
+        for stale in itertools.islice(reversed(self.d.values()),
+                                      self.max_derived,
+                                      None):
+            stale.derived.clear()
+        return mask
+
+
+cache = Cache()
+
+scene_occluders = SceneOccluders()
+
+# Occluder for the last mesh version it was requested for.
+occluder_cache: typing.Dict[
+    str,
+    typing.Tuple[typing.Hashable, Occluder]
+] = {}
+
+
+def get_occluder(
+        context: bpy.types.Context,
+        obj: bpy.types.Object,
+        mesh_data: mesh.Mesh,
+        stages: typing.Optional[typing.Dict[str, float]] = None
+) -> Occluder:
+    """Occluder for `obj`, built once per version of `mesh_data`.
+
+    Time taken to build it is added to `stages`, if given.
+    """
+    key = (id(mesh_data), mesh_data.last_updated)
+    cached = occluder_cache.get('ACTIVE')
+    if cached is None or cached[0] != key:
+        with timing.measure({} if stages is None else stages, 'visibility'):
+            vertices = mesh_data.vertices
+            if len(vertices) > 0:
+                size = float(np.linalg.norm(np.ptp(vertices, axis=0)))
+            else:
+                size = 0.0
+            depsgraph = context.evaluated_depsgraph_get()
+            cached = (
+                key,
+                Occluder(bvh=BVHTree.FromObject(obj, depsgraph), size=size)
+            )
+        occluder_cache['ACTIVE'] = cached
+    return cached[1]
+
+
+def points_visible(
+        occluder: Occluder,
+        points: np.ndarray,
+        view: View,
+        matrix_world: mathutils.Matrix,
+        others: typing.Sequence[SceneOccluder] = (),
+        epsilon: float = 0.00001
+) -> np.ndarray:
+    """Test which of the object space `points` are visible from `view`.
+
+    A point is visible when the first hit of a ray cast from the view
+    towards the point is the point itself, and none of the `others` is
+    between the view and the point.  Other objects are only tested for
+    the points the object itself does not hide.
+
+    Returns a bool array with one element per point.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    if len(points) == 0:
+        return np.zeros(0, dtype=bool)
+    # Rays are cast in object space, so that the BVH tree does not need
+    # to be rebuilt when the object is transformed.
+    to_local = np.array(matrix_world.inverted() @ view.view_matrix.inverted())
+    if view.is_perspective:
+        origins = np.broadcast_to(to_local[:3, 3], points.shape)
+        directions = points - origins
+    else:
+        direction = to_local[:3, :3] @ np.array([0.0, 0.0, -1.0])
+        direction /= np.linalg.norm(direction)
+        directions = np.broadcast_to(direction, points.shape)
+        origins = points - directions * (occluder.size + 1.0)
+
+    hits = np.full(points.shape, np.inf)
+    ray_cast = occluder.bvh.ray_cast
+    for (i, (origin, direction)) in enumerate(zip(origins.tolist(),
+                                                  directions.tolist())):
+        location = ray_cast(origin, direction)[0]
+        if location is not None:
+            hits[i] = location
+    visible = np.linalg.norm(hits - points, axis=1) < epsilon
+    if len(others) > 0 and np.any(visible):
+        to_world = np.array(matrix_world)
+        visible[visible] = ~_occluded_by(
+            others,
+            points[visible] @ to_world[:3, :3].T + to_world[:3, 3],
+            view
+        )
+    return visible
+
+
+def _occluded_by(
+        others: typing.Sequence[SceneOccluder],
+        points: np.ndarray,
+        view: View
+) -> np.ndarray:
+    """Test which of the world space `points` are hidden by `others`.
+
+    Rays are cast from the points towards the view, in the local space of
+    each occluder.  Occluders outside of the screen area & depth range of
+    the points, and rays that miss their bounding box, are skipped before
+    any ray is cast.
+    """
+    view_matrix = np.array(view.view_matrix)
+    to_view = np.array(view.view_matrix.inverted())
+    if view.is_perspective:
+        towards_view = to_view[:3, 3] - points
+        # Rays stop at the view origin.
+        distances = np.ones(len(points))
+    else:
+        towards_view = np.broadcast_to(to_view[:3, 2], points.shape)
+        distances = np.full(len(points), np.inf)
+
+    occluded = np.zeros(len(points), dtype=bool)
+    corners = np.stack([other.corners for other in others])
+    candidates = _overlapping(
+        corners @ view_matrix[:3, :3].T + view_matrix[:3, 3],
+        points @ view_matrix[:3, :3].T + view_matrix[:3, 3],
+        view.is_perspective
+    )
+    for other in itertools.compress(others, candidates):
+        to_local = np.array(other.matrix_world.inverted())
+        origins = points @ to_local[:3, :3].T + to_local[:3, 3]
+        directions = towards_view @ to_local[:3, :3].T
+        indices = np.flatnonzero(
+            ~occluded
+            & _hits_box(origins, directions, distances, other.bounds)
+        )
+        if len(indices) == 0:
+            continue
+        bvh = scene_occluders.bvh(other)
+        if bvh is None:
+            continue
+        lengths = np.minimum(
+            np.linalg.norm(directions[indices], axis=1) * distances[indices],
+            np.finfo(np.float32).max
+        )
+        for (i, origin, direction, length) in zip(
+                indices.tolist(),
+                origins[indices].tolist(),
+                directions[indices].tolist(),
+                lengths.tolist()
+        ):
+            if bvh.ray_cast(origin, direction, length)[0] is not None:
+                occluded[i] = True
+    return occluded
+
+
+def _overlapping(
+        corners: np.ndarray,
+        points: np.ndarray,
+        is_perspective: bool
+) -> np.ndarray:
+    """Which boxes with view space `corners` (K, 8, 3) may hide any of the
+    view space `points`.
+
+    A box may hide a point when it overlaps the points on screen, and it
+    is nearer to the view than the farthest point.
+    """
+    if is_perspective:
+        in_front = np.all(-corners[..., 2] > 0, axis=1)
+        behind = np.all(-corners[..., 2] <= 0, axis=1)
+        if not np.all(-points[:, 2] > 0):
+            # Points behind the view are not drawn, but do not narrow down
+            # the screen area reliably either.
+            return ~behind
+        point_xy = points[:, :2] / -points[:, 2:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corner_xy = corners[..., :2] / -corners[..., 2:]
+        depth_ok = ~behind \
+            & (np.min(-corners[..., 2], axis=1) < np.max(-points[:, 2]))
+    else:
+        in_front = np.ones(len(corners), dtype=bool)
+        point_xy = points[:, :2]
+        corner_xy = corners[..., :2]
+        depth_ok = np.max(corners[..., 2], axis=1) > np.min(points[:, 2])
+    on_screen = np.all(
+        (np.min(corner_xy, axis=1) <= np.max(point_xy, axis=0))
+        & (np.max(corner_xy, axis=1) >= np.min(point_xy, axis=0)),
+        axis=1
+    )
+    # Boxes crossing the view plane are kept, their projection is not
+    # bounded.
+    return depth_ok & (on_screen | ~in_front)
+
+
+def _hits_box(
+        origins: np.ndarray,
+        directions: np.ndarray,
+        distances: np.ndarray,
+        bounds: np.ndarray
+) -> np.ndarray:
+    """Which rays `origin + t * direction`, `0 <= t <= distance` hit the
+    axis aligned box with minimum & maximum `bounds`.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_low = (bounds[0] - origins) / directions
+        t_high = (bounds[1] - origins) / directions
+    # Rays parallel to a slab & starting on its plane are kept.
+    t_near = np.fmin(t_low, t_high)
+    t_far = np.fmax(t_low, t_high)
+    t_near = np.max(np.where(np.isnan(t_near), -np.inf, t_near), axis=1)
+    t_far = np.min(np.where(np.isnan(t_far), np.inf, t_far), axis=1)
+    return (t_near <= t_far) & (t_far >= 0) & (t_near <= distances)
+
+
+@bpy.app.handlers.persistent
+def app__load_pre_handler(*args_):
+    occluder_cache.clear()
+    cache.d.clear()
+    scene_occluders.clear()
+
+
+@bpy.app.handlers.persistent
+def app__undo_post_handler(*args_):
+    # Undo & redo replace datablocks, BVH trees may be out of date.
+    scene_occluders.clear()
+
+
+@bpy.app.handlers.persistent
+def app__depsgraph_update_post(
+        scene: bpy.types.Scene,
+        depsgraph: bpy.types.Depsgraph
+) -> None:
+    scene_occluders.update(depsgraph)
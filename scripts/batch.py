@@ -0,0 +1,46 @@
+# <pep8-80 compliant>
+
+# meshstats is a Blender addon that provides mesh statistics.
+# Copyright (C) 2020  Atamert Ölçgen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Analyze mesh objects in many .blend files, without the UI.
+
+Run headless from the repository root, with .blend files or directories
+after `--`:
+
+    blender -b --factory-startup --python scripts/batch.py -- \
+        assets/ --output report.csv --jobs 4
+
+Each file is analyzed in a separate Blender process.  Progress is saved in
+a manifest next to the report, running the same command again skips files
+that are already analyzed & not modified since.
+"""
+
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from meshstats import batch  # noqa: E402
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(batch.main(
+        sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [],
+        os.path.abspath(__file__)
+    ))
@@ -0,0 +1,482 @@
+# <pep8-80 compliant>
+
+# meshstats is a Blender addon that provides mesh statistics.
+# Copyright (C) 2020  Atamert Ölçgen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Compare `analysis.Stats` against a port of the original BMesh logic.
+
+Run from the repository root, outside of Blender:
+
+    python -m pytest tests
+"""
+
+import collections
+import itertools
+import math
+import statistics
+import typing
+
+import numpy as np
+import pytest
+
+from meshstats import (analysis, constants)
+
+
+FLAT_THRESHOLD_ANGLE = 10.0
+
+Faces = typing.List[typing.List[int]]
+
+
+def reference(
+        vertices: np.ndarray,
+        faces: Faces,
+        face_normals: np.ndarray,
+        flat_threshold_angle: float
+) -> typing.Dict[str, typing.Any]:
+    """Stats calculated one element at a time, like `Mesh.update` did
+    with BMesh.
+
+    Poles are keyed by their center & hold `(is_flat, spokes, faces)`.
+    """
+    flat_threshold = math.cos(math.radians(flat_threshold_angle))
+    edge_faces: typing.Dict[typing.FrozenSet[int], typing.Set[int]] = \
+        collections.defaultdict(set)
+    for (f, face) in enumerate(faces):
+        for (a, b) in zip(face, face[1:] + face[:1]):
+            edge_faces[frozenset((a, b))].add(f)
+    link_edges = collections.defaultdict(list)
+    for (edge, edge_face_set) in edge_faces.items():
+        for vertex in edge:
+            link_edges[vertex].append((edge, len(edge_face_set) == 1))
+    link_faces = collections.defaultdict(set)
+    for (f, face) in enumerate(faces):
+        for vertex in face:
+            link_faces[vertex].add(f)
+
+    poles: typing.Dict[str, typing.Dict[int, typing.Any]] = {
+        'n_poles': {},
+        'e_poles': {},
+        'star_poles': {},
+    }
+    for vertex in range(len(vertices)):
+        edge_count = len([edge for (edge, is_boundary) in link_edges[vertex]
+                          if not is_boundary])
+        if edge_count == 3 or edge_count >= 5:
+            pairs = list(itertools.combinations(
+                [face_normals[f] for f in sorted(link_faces[vertex])],
+                2
+            ))
+            # BMesh raised on poles with a single face, they are not flat.
+            is_flat = len(pairs) > 0 and statistics.mean(
+                abs(float(np.dot(a, b))) for (a, b) in pairs
+            ) > flat_threshold
+            spokes = sorted(next(iter(edge - {vertex}))
+                            for (edge, _) in link_edges[vertex])
+            if edge_count == 3:
+                category = 'n_poles'
+            elif edge_count == 5:
+                category = 'e_poles'
+            else:
+                category = 'star_poles'
+            poles[category][vertex] = (
+                is_flat,
+                spokes,
+                sorted(link_faces[vertex])
+            )
+
+    tris = [face for face in faces if len(face) == 3]
+    ngons = [face for face in faces if len(face) > 4]
+    return {
+        'face_count': len(faces),
+        'tris_count': len(tris),
+        'quads_count': len(faces) - len(tris) - len(ngons),
+        'ngons_count': len(ngons),
+        'tesellated_tris_count': sum(len(face) - 2 for face in faces),
+        'total_poles_count': sum(len(p) for p in poles.values()),
+        'percentages': analysis.percentages(
+            len(tris),
+            len(faces) - len(tris) - len(ngons),
+            len(ngons)
+        ),
+        'tris': tris,
+        'tri_centers': [np.mean(vertices[face], axis=0) for face in tris],
+        'ngons': ngons,
+        'poles': poles,
+    }
+
+
+def arrays_of(vertices: np.ndarray, faces: Faces) -> analysis.MeshArrays:
+    return analysis.MeshArrays.from_faces(
+        vertices,
+        [len(face) for face in faces],
+        list(itertools.chain.from_iterable(faces))
+    )
+
+
+def assert_matches(
+        stats: analysis.Stats,
+        arrays: analysis.MeshArrays,
+        faces: Faces
+) -> None:
+    expected = reference(
+        arrays.vertices,
+        faces,
+        arrays.face_normals,
+        FLAT_THRESHOLD_ANGLE
+    )
+    for attr in ['face_count',
+                 'tris_count',
+                 'quads_count',
+                 'ngons_count',
+                 'tesellated_tris_count',
+                 'total_poles_count']:
+        assert getattr(stats, attr) == expected[attr], attr
+    assert (stats.tris_percentage,
+            stats.quads_percentage,
+            stats.ngons_percentage) == expected['percentages']
+
+    assert stats.tris.indices.tolist() == expected['tris']
+    np.testing.assert_allclose(
+        stats.tris.centers,
+        np.reshape(expected['tri_centers'], (-1, 3)),
+        rtol=1e-6
+    )
+    ngons = stats.ngons
+    assert [ngons.indices[start:stop].tolist()
+            for (start, stop) in zip(ngons.offsets[:-1],
+                                     ngons.offsets[1:])] == expected['ngons']
+
+    for (category, expected_poles) in expected['poles'].items():
+        poles = getattr(stats, category)
+        actual = {
+            center: (
+                bool(poles.is_flat[i]),
+                sorted(poles.spokes[poles.spoke_offsets[i]:
+                                    poles.spoke_offsets[i + 1]].tolist()),
+                sorted(poles.link_faces[poles.link_face_offsets[i]:
+                                        poles.link_face_offsets[i + 1]]
+                       .tolist())
+            )
+            for (i, center) in enumerate(poles.centers.tolist())
+        }
+        assert actual == expected_poles, category
+
+
+def grid_faces(size: int) -> typing.Tuple[np.ndarray, Faces]:
+    """A `size` x `size` grid of quads, with an uneven height."""
+    (y, x) = np.mgrid[0:size + 1, 0:size + 1]
+    z = np.sin(x * 1.3) * np.cos(y * 0.7) * 0.4
+    vertices = np.stack((x.ravel(), y.ravel(), z.ravel()), axis=1)
+    faces = []
+    for i in range(size):
+        for j in range(size):
+            v = i * (size + 1) + j
+            faces.append([v, v + 1, v + size + 2, v + size + 1])
+    return (vertices, faces)
+
+
+def mixed_faces() -> typing.Tuple[np.ndarray, Faces]:
+    """Grid with a row of quads split into tris & a block merged into an
+    octagon, leaving a loose vertex in its middle."""
+    size = 6
+    (vertices, quads) = grid_faces(size)
+    faces = []
+    for (q, (a, b, c, d)) in enumerate(quads):
+        (i, j) = divmod(q, size)
+        if i == 0:
+            faces.extend([[a, b, c], [a, c, d]])
+        elif i in (2, 3) and j in (2, 3):
+            continue
+        else:
+            faces.append([a, b, c, d])
+
+    def v(i, j):
+        return i * (size + 1) + j
+
+    faces.append([v(2, 2), v(2, 3), v(2, 4), v(3, 4),
+                  v(4, 4), v(4, 3), v(4, 2), v(3, 2)])
+    # A pentagon, its extra vertex splits an edge shared with a quad, so
+    # that both halves of the split edge are boundary edges.
+    vertices = np.vstack((vertices, [[5.5, 6.0, 0.0]]))
+    faces.remove([v(5, 5), v(5, 6), v(6, 6), v(6, 5)])
+    faces.append([v(5, 5), v(5, 6), v(6, 6), len(vertices) - 1, v(6, 5)])
+    return (vertices, faces)
+
+
+def fan_faces() -> typing.Tuple[np.ndarray, Faces]:
+    """Disjoint fans of 3, 5 & 8 tris, the last one is a cone."""
+    vertices = []
+    faces = []
+    for (offset, (count, height)) in enumerate([(3, 0.0),
+                                                (5, 0.0),
+                                                (8, 1.5)]):
+        center = len(vertices)
+        vertices.append([offset * 3.0, 0.0, height])
+        for k in range(count):
+            angle = 2 * math.pi * k / count
+            vertices.append([offset * 3.0 + math.cos(angle),
+                             math.sin(angle),
+                             0.0])
+        for k in range(count):
+            faces.append([center,
+                          center + 1 + k,
+                          center + 1 + (k + 1) % count])
+    return (np.array(vertices), faces)
+
+
+def cube_faces() -> typing.Tuple[np.ndarray, Faces]:
+    """A closed cube, every corner is a pole that is not flat."""
+    vertices = np.array([[x, y, z]
+                         for x in (0, 1) for y in (0, 1) for z in (0, 1)],
+                        dtype=np.float64)
+    faces = [[0, 1, 3, 2], [4, 6, 7, 5], [0, 4, 5, 1],
+             [2, 3, 7, 6], [0, 2, 6, 4], [1, 5, 7, 3]]
+    return (vertices, faces)
+
+
+MESHES = {
+    'grid': lambda: grid_faces(5),
+    'mixed': mixed_faces,
+    'fans': fan_faces,
+    'cube': cube_faces,
+}
+
+
+@pytest.fixture(params=[None, 7], ids=['default-chunks', 'small-chunks'])
+def chunk_size(request, monkeypatch):
+    """Run with the default chunk size, and with chunks small enough for
+    every step to cross chunk boundaries."""
+    if request.param is not None:
+        monkeypatch.setattr(constants, 'ANALYSIS_CHUNK_SIZE', request.param)
+        monkeypatch.setattr(analysis.chunks, '__defaults__', (request.param,))
+    return request.param
+
+
+@pytest.mark.parametrize('name', sorted(MESHES))
+def test_analyze_matches_reference(name, chunk_size):
+    (vertices, faces) = MESHES[name]()
+    arrays = arrays_of(vertices, faces)
+    stats = analysis.Stats()
+    stats.analyze(arrays, FLAT_THRESHOLD_ANGLE)
+    assert_matches(stats, arrays, faces)
+
+
+def test_fans_are_classified():
+    (vertices, faces) = fan_faces()
+    stats = analysis.Stats()
+    stats.analyze(arrays_of(vertices, faces), FLAT_THRESHOLD_ANGLE)
+    assert stats.n_poles.centers.tolist() == [0]
+    assert stats.e_poles.centers.tolist() == [4]
+    assert stats.star_poles.centers.tolist() == [10]
+    assert stats.n_poles.is_flat.tolist() == [True]
+    assert stats.e_poles.is_flat.tolist() == [True]
+    assert stats.star_poles.is_flat.tolist() == [False]
+
+
+@pytest.mark.parametrize(('first', 'second'), [
+    ('mixed', 'fans'),
+    ('fans', 'grid'),
+    ('cube', 'mixed'),
+])
+def test_topology_change(first, second, chunk_size):
+    stats = analysis.Stats()
+    stats.analyze(arrays_of(*MESHES[first]()), FLAT_THRESHOLD_ANGLE)
+    (vertices, faces) = MESHES[second]()
+    arrays = arrays_of(vertices, faces)
+    stats.analyze(arrays, FLAT_THRESHOLD_ANGLE)
+    assert 'refresh' not in stats.stage_timings
+    assert_matches(stats, arrays, faces)
+
+
+def test_topology_change_with_same_counts():
+    """Flipping the diagonal of a split quad keeps every element count."""
+    (vertices, faces) = grid_faces(5)
+    (a, b, c, d) = faces[0]
+    stats = analysis.Stats()
+    stats.analyze(
+        arrays_of(vertices, [[a, b, c], [a, c, d]] + faces[1:]),
+        FLAT_THRESHOLD_ANGLE
+    )
+    flipped = [[a, b, d], [b, c, d]] + faces[1:]
+    arrays = arrays_of(vertices, flipped)
+    stats.analyze(arrays, FLAT_THRESHOLD_ANGLE)
+    assert 'refresh' not in stats.stage_timings
+    assert_matches(stats, arrays, flipped)
+
+
+@pytest.mark.parametrize('name', sorted(MESHES))
+def test_refresh_matches_reference(name, chunk_size):
+    (vertices, faces) = MESHES[name]()
+    stats = analysis.Stats()
+    stats.analyze(arrays_of(vertices, faces), FLAT_THRESHOLD_ANGLE)
+    # Same topology, moved vertices: flatness & centers change.
+    rng = np.random.default_rng(0)
+    moved = vertices + rng.uniform(-0.3, 0.3, size=vertices.shape)
+    arrays = arrays_of(moved, faces)
+    stats.analyze(arrays, FLAT_THRESHOLD_ANGLE)
+    assert 'refresh' in stats.stage_timings
+    assert_matches(stats, arrays, faces)
+
+
+def test_refresh_changes_flatness():
+    (vertices, faces) = fan_faces()
+    stats = analysis.Stats()
+    stats.analyze(arrays_of(vertices, faces), FLAT_THRESHOLD_ANGLE)
+    flattened = vertices.copy()
+    flattened[:, 2] = 0.0
+    stats.analyze(arrays_of(flattened, faces), FLAT_THRESHOLD_ANGLE)
+    assert 'refresh' in stats.stage_timings
+    assert stats.star_poles.is_flat.tolist() == [True]
+
+
+def test_wire_edge_pole():
+    """Loose edges have no faces, so they are not boundary edges."""
+    arrays = analysis.MeshArrays(
+        vertices=np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]],
+                          dtype=np.float32),
+        loop_vertices=np.zeros(0, dtype=np.int32),
+        loop_edges=np.zeros(0, dtype=np.int32),
+        edge_vertices=np.array([[0, 1], [0, 2], [0, 3]], dtype=np.int32),
+        loop_start=np.zeros(0, dtype=np.int32),
+        loop_total=np.zeros(0, dtype=np.int32),
+        face_normals=np.zeros((0, 3), dtype=np.float32)
+    )
+    stats = analysis.Stats()
+    stats.analyze(arrays, FLAT_THRESHOLD_ANGLE)
+    assert stats.face_count == 0
+    assert stats.total_poles_count == 1
+    poles = stats.n_poles
+    assert poles.centers.tolist() == [0]
+    assert poles.is_flat.tolist() == [False]
+    assert sorted(poles.spokes.tolist()) == [1, 2, 3]
+    assert poles.link_face_offsets.tolist() == [0, 0]
+    assert poles.link_faces.tolist() == []
+
+
+def inner_edge_counts(vertex_count: int, faces: Faces) -> np.ndarray:
+    """Number of non-boundary edges of every vertex, one face at a time."""
+    edge_faces: typing.Dict[typing.FrozenSet[int], int] = \
+        collections.Counter()
+    for face in faces:
+        for (a, b) in zip(face, face[1:] + face[:1]):
+            edge_faces[frozenset((a, b))] += 1
+    counts = np.zeros(vertex_count, dtype=np.int64)
+    for (edge, face_count) in edge_faces.items():
+        if face_count != 1:
+            for vertex in edge:
+                counts[vertex] += 1
+    return counts
+
+
+@pytest.mark.parametrize('name', ['grid', 'fans', 'mixed'])
+@pytest.mark.parametrize('size', [1, 7, None])
+def test_inner_edge_counts(name, size):
+    (vertices, faces) = MESHES[name]()
+    arrays = arrays_of(vertices, faces)
+    vertex_count = len(vertices)
+    sampled = analysis.sample(vertex_count, size or vertex_count)
+    actual = analysis.inner_edge_counts(
+        sampled,
+        vertex_count,
+        arrays.edge_vertices,
+        arrays.loop_edges
+    )
+    assert actual.tolist() \
+        == inner_edge_counts(vertex_count, faces)[sampled].tolist()
+
+
+@pytest.mark.parametrize('name', sorted(MESHES))
+def test_approximation_of_whole_mesh_is_exact(name):
+    (vertices, faces) = MESHES[name]()
+    arrays = arrays_of(vertices, faces)
+    stats = analysis.Stats()
+    stats.analyze(arrays, FLAT_THRESHOLD_ANGLE)
+    approximation = analysis.Approximation.from_samples(
+        len(faces),
+        arrays.loop_total,
+        len(vertices),
+        analysis.inner_edge_counts(
+            analysis.sample(len(vertices), len(vertices)),
+            len(vertices),
+            arrays.edge_vertices,
+            arrays.loop_edges
+        )
+    )
+    for (attr, expected) in [
+            ('tris', stats.tris_count),
+            ('quads', stats.quads_count),
+            ('ngons', stats.ngons_count),
+            ('n_poles', len(stats.n_poles)),
+            ('e_poles', len(stats.e_poles)),
+            ('star_poles', len(stats.star_poles)),
+            ('total_poles', stats.total_poles_count),
+    ]:
+        estimate = getattr(approximation, attr)
+        assert (estimate.value, estimate.low, estimate.high) \
+            == (expected, expected, expected), attr
+
+
+@pytest.mark.parametrize('tris_percentage', [1, 10, 37, 50, 90, 99])
+def test_estimate_contains_exact_percentage(tris_percentage):
+    face_count = 100_000
+    # Every 100 faces have the same share of tris.
+    loop_total = np.where(
+        np.arange(face_count) % 100 < tris_percentage,
+        3,
+        4
+    )
+    sampled = loop_total[analysis.sample(face_count, 2_000)]
+    approximation = analysis.Approximation.from_samples(
+        face_count,
+        sampled,
+        0,
+        np.zeros(0, dtype=np.int64)
+    )
+    for (estimate, exact) in [
+            (approximation.percentage(approximation.tris), tris_percentage),
+            (approximation.percentage(approximation.quads),
+             100 - tris_percentage),
+    ]:
+        assert 0.0 <= estimate.low <= exact <= estimate.high <= 100.0
+        assert estimate.low <= estimate.value <= estimate.high
+        assert estimate.margin < 5.0
+
+
+def test_estimate_without_hits():
+    estimate = analysis.Estimate.from_sample(0, 1_000, 1_000_000)
+    assert estimate.value == 0.0
+    assert estimate.low == 0.0
+    # No hits in the sample does not mean there are none at all.
+    assert 0.0 < estimate.high < 0.01 * 1_000_000
+
+
+def test_estimate_with_all_hits():
+    estimate = analysis.Estimate.from_sample(1_000, 1_000, 1_000_000)
+    assert estimate.value == 1_000_000
+    assert estimate.high == pytest.approx(1_000_000)
+    assert 0.99 * 1_000_000 < estimate.low < 1_000_000
+
+
+def test_estimate_narrows_with_sample_size():
+    """Finite population correction, margin is zero once the whole
+    population is sampled."""
+    margins = [
+        analysis.Estimate.from_sample(size // 2, size, 10_000).margin
+        for size in [100, 1_000, 9_000, 9_999, 10_000]
+    ]
+    assert margins == sorted(margins, reverse=True)
+    assert margins[-1] == 0.0
+    assert margins[-2] < margins[0] / 10
@@ -0,0 +1,105 @@
+# <pep8-80 compliant>
+
+# meshstats is a Blender addon that provides mesh statistics.
+# Copyright (C) 2020  Atamert Ölçgen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Test how `mesh.Cache` updates multiple objects.
+
+These need `bpy`, e.g. the `bpy` module from PyPI, and are skipped
+without it.
+"""
+
+import numpy as np
+import pytest
+
+bpy = pytest.importorskip("bpy")
+
+from meshstats import (analysis, mesh)  # noqa: E402
+
+from test_analysis import MESHES  # noqa: E402
+
+STAMP = (0, 10.0)
+
+
+def make_object(name: str) -> bpy.types.Object:
+    (vertices, faces) = MESHES[name]()
+    me = bpy.data.meshes.new(name)
+    me.from_pydata(vertices.tolist(), [], faces)
+    obj = bpy.data.objects.new(name, me)
+    bpy.context.scene.collection.objects.link(obj)
+    return obj
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    # Stamps read addon preferences, the addon is not registered here.
+    monkeypatch.setattr(mesh.Cache, '_stamp', lambda self, context: STAMP)
+    return mesh.Cache()
+
+
+def test_failed_object_does_not_stop_the_others(monkeypatch, cache, caplog):
+    objs = [make_object(name) for name in ('grid', 'fans', 'cube')]
+    failing = objs[1]
+    analyze = mesh.Mesh.analyze
+
+    def failing_analyze(self, arrays, flat_threshold_angle):
+        if len(arrays.vertices) == len(failing.data.vertices):
+            raise RuntimeError("analysis failed")
+        analyze(self, arrays, flat_threshold_angle)
+
+    monkeypatch.setattr(mesh.Mesh, 'analyze', failing_analyze)
+    cache.update_all(bpy.context, objs)
+
+    for obj in (objs[0], objs[2]):
+        assert cache.get_counts(bpy.context, obj) is not None
+        assert not cache.is_failed(bpy.context, obj)
+    assert cache.get_counts(bpy.context, failing) is None
+    assert cache.is_failed(bpy.context, failing)
+    assert "analysis failed" in caplog.text
+    # Failed entries are not retried with the same stamp, until they are
+    # updated.
+    assert cache.get(bpy.context, failing) is None
+    assert cache.misses == 1
+    cache.expire(failing)
+    assert not cache.is_failed(bpy.context, failing)
+
+
+def test_estimate_is_queued(monkeypatch, cache):
+    obj = make_object('grid')
+    approximations = []
+
+    def approximate(context, obj):
+        approximation = analysis.Approximation.from_samples(
+            0,
+            np.zeros(0, dtype=np.int32),
+            0,
+            np.zeros(0, dtype=np.int32)
+        )
+        approximations.append(approximation)
+        return approximation
+
+    monkeypatch.setattr(mesh, 'approximate', approximate)
+    monkeypatch.setattr(mesh, 'is_estimated', lambda obj: True)
+    try:
+        # Panels do not wait for the mesh to be sampled.
+        assert cache.estimate(bpy.context, obj) is None
+        assert approximations == []
+        assert cache.is_estimating(obj)
+        assert not cache.run_estimates(bpy.context, 1.0)
+        assert cache.estimate(bpy.context, obj) is approximations[0]
+        assert not cache.is_estimating(obj)
+    finally:
+        cache.cancel_jobs()
@@ -0,0 +1,101 @@
+# <pep8-80 compliant>
+
+# meshstats is a Blender addon that provides mesh statistics.
+# Copyright (C) 2020  Atamert Ölçgen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Test how geometry updates are dispatched by `scheduler`.
+
+These need `bpy`, e.g. the `bpy` module from PyPI, and are skipped
+without it.
+"""
+
+import types
+
+import pytest
+
+bpy = pytest.importorskip("bpy")
+
+from meshstats import context as meshstats_context  # noqa: E402
+from meshstats import (mesh, scheduler)  # noqa: E402
+
+
+def geometry_update(obj):
+    return types.SimpleNamespace(
+        id=types.SimpleNamespace(original=obj),
+        is_updated_geometry=True
+    )
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    """Objects marked dirty & expired, instead of updating them."""
+    dirty = []
+    expired = []
+    monkeypatch.setattr(scheduler.scheduler, 'mark_dirty', dirty.append)
+    monkeypatch.setattr(mesh.cache, 'expire', expired.append)
+    monkeypatch.setattr(
+        mesh,
+        'check_eligibility',
+        lambda obj: mesh.Eligibility.OK
+    )
+    return (dirty, expired)
+
+
+def test_linked_duplicate_of_active_object_is_not_expired(
+        monkeypatch,
+        dispatched
+):
+    shared = bpy.data.meshes.new("shared")
+    active = bpy.data.objects.new("active", shared)
+    duplicate = bpy.data.objects.new("duplicate", shared)
+    other = bpy.data.objects.new("other", bpy.data.meshes.new("other"))
+    monkeypatch.setattr(
+        meshstats_context,
+        'get_object',
+        lambda context=None: active
+    )
+    # The duplicate comes first, before the active object is marked dirty.
+    depsgraph = types.SimpleNamespace(updates=[
+        geometry_update(duplicate),
+        geometry_update(active),
+        geometry_update(other),
+    ])
+    scheduler.app__depsgraph_update_post(bpy.context.scene, depsgraph)
+    (dirty, expired) = dispatched
+    assert dirty == [active]
+    assert expired == [other]
+
+
+def test_linked_duplicates_are_expired_without_active_object(
+        monkeypatch,
+        dispatched
+):
+    shared = bpy.data.meshes.new("shared")
+    first = bpy.data.objects.new("first", shared)
+    second = bpy.data.objects.new("second", shared)
+    monkeypatch.setattr(
+        meshstats_context,
+        'get_object',
+        lambda context=None: None
+    )
+    depsgraph = types.SimpleNamespace(updates=[
+        geometry_update(first),
+        geometry_update(second),
+    ])
+    scheduler.app__depsgraph_update_post(bpy.context.scene, depsgraph)
+    (dirty, expired) = dispatched
+    assert dirty == []
+    assert expired == [first, second]
@@ -0,0 +1,321 @@
+# <pep8-80 compliant>
+
+# meshstats is a Blender addon that provides mesh statistics.
+# Copyright (C) 2020  Atamert Ölçgen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Compare `stream.analyze` of OBJ & PLY files against `analysis.Stats`."""
+
+import io
+import itertools
+import typing
+
+import numpy as np
+import pytest
+
+from meshstats import (analysis, stream)
+
+from test_analysis import (FLAT_THRESHOLD_ANGLE, MESHES, Faces, arrays_of)
+
+
+def write_obj(path, vertices: np.ndarray, faces: Faces) -> None:
+    with open(path, "w") as f:
+        for vertex in vertices:
+            f.write("v {0} {1} {2}\n".format(*vertex))
+        for face in faces:
+            f.write("f {0}\n".format(" ".join(str(v + 1) for v in face)))
+
+
+def write_ply(
+        path,
+        vertices: np.ndarray,
+        faces: Faces,
+        format_: str = 'ascii',
+        count_type: str = 'uchar',
+        index_type: str = 'int'
+) -> None:
+    header = "\n".join([
+        "ply",
+        "format {0} 1.0".format(format_),
+        "comment written by test_stream",
+        "element vertex {0}".format(len(vertices)),
+        "property float x",
+        "property float y",
+        "property float z",
+        "element face {0}".format(len(faces)),
+        "property list {0} {1} vertex_indices".format(count_type, index_type),
+        "end_header",
+        ""
+    ])
+    with open(path, "wb") as f:
+        f.write(header.encode("ascii"))
+        if format_ == 'ascii':
+            for vertex in vertices:
+                f.write("{0} {1} {2}\n".format(*vertex).encode("ascii"))
+            for face in faces:
+                f.write("{0} {1}\n".format(
+                    len(face),
+                    " ".join(str(v) for v in face)
+                ).encode("ascii"))
+            return
+        byte_order = '<' if format_ == 'binary_little_endian' else '>'
+        f.write(np.asarray(vertices, dtype=byte_order + 'f4').tobytes())
+        for face in faces:
+            f.write(np.array(
+                [len(face)],
+                dtype=byte_order + stream.PLY_TYPES[count_type]
+            ).tobytes())
+            f.write(np.array(
+                face,
+                dtype=byte_order + stream.PLY_TYPES[index_type]
+            ).tobytes())
+
+
+COUNTS = [
+    'vertex_count',
+    'face_count',
+    'tris_count',
+    'quads_count',
+    'ngons_count',
+    'tesellated_tris_count',
+    'tris_percentage',
+    'quads_percentage',
+    'ngons_percentage',
+    'n_poles_count',
+    'e_poles_count',
+    'star_poles_count',
+]
+
+
+def expected_counts(vertices: np.ndarray, faces: Faces) -> typing.Dict:
+    stats = analysis.Stats()
+    stats.analyze(arrays_of(vertices, faces), FLAT_THRESHOLD_ANGLE)
+    return {
+        'vertex_count': len(vertices),
+        'face_count': stats.face_count,
+        'tris_count': stats.tris_count,
+        'quads_count': stats.quads_count,
+        'ngons_count': stats.ngons_count,
+        'tesellated_tris_count': stats.tesellated_tris_count,
+        'tris_percentage': stats.tris_percentage,
+        'quads_percentage': stats.quads_percentage,
+        'ngons_percentage': stats.ngons_percentage,
+        'n_poles_count': len(stats.n_poles),
+        'e_poles_count': len(stats.e_poles),
+        'star_poles_count': len(stats.star_poles),
+    }
+
+
+def counts_of(stats: stream.Stats) -> typing.Dict:
+    return {key: getattr(stats, key) for key in COUNTS}
+
+
+FORMATS = {
+    'obj': ('.obj', write_obj),
+    'ply-ascii': ('.ply', write_ply),
+    'ply-le': (
+        '.ply',
+        lambda p, v, f: write_ply(p, v, f, 'binary_little_endian')
+    ),
+    'ply-be': (
+        '.ply',
+        lambda p, v, f: write_ply(p, v, f, 'binary_big_endian', 'uint8',
+                                  'uint32')
+    ),
+}
+
+
+@pytest.mark.parametrize('chunk_size', [None, 5], ids=['default', 'small'])
+@pytest.mark.parametrize('format_', sorted(FORMATS))
+@pytest.mark.parametrize('name', sorted(MESHES))
+def test_analyze_matches_stats(tmp_path, name, format_, chunk_size):
+    (vertices, faces) = MESHES[name]()
+    (ext, write) = FORMATS[format_]
+    path = str(tmp_path / ("mesh" + ext))
+    write(path, vertices, faces)
+    if chunk_size is None:
+        stats = stream.analyze(path, tmp_dir=str(tmp_path))
+    else:
+        stats = stream.analyze(path, chunk_size, str(tmp_path))
+    assert counts_of(stats) == expected_counts(vertices, faces)
+
+
+def test_obj_negative_indices_and_attributes(tmp_path):
+    (vertices, faces) = MESHES['mixed']()
+    path = tmp_path / "mesh.obj"
+    with open(path, "w") as f:
+        f.write("# comment\no mesh\n\n")
+        for vertex in vertices:
+            f.write("v {0} {1} {2}\n".format(*vertex))
+            f.write("vt 0.5 0.5\nvn 0 0 1\n")
+        for (k, face) in enumerate(faces):
+            # Negative indices are relative to the vertices read so far.
+            tokens = [
+                "{0}".format(v - len(vertices)) if k % 2 == 0 else
+                "{0}/{1}/{2}".format(v + 1, v + 1, v + 1) if k % 3 == 0 else
+                "{0}//{1}".format(v + 1, v + 1)
+                for v in face
+            ]
+            f.write("f {0}\n".format(" ".join(tokens)))
+        f.write("l 1 2\n")
+    stats = stream.analyze(str(path), 4, str(tmp_path))
+    assert counts_of(stats) == expected_counts(vertices, faces)
+
+
+def test_obj_negative_indices_between_vertices(tmp_path):
+    """Negative indices refer to the last vertex read before the face."""
+    path = tmp_path / "mesh.obj"
+    path.write_text("\n".join([
+        "v 0 0 0", "v 1 0 0", "v 1 1 0",
+        "f -3 -2 -1",
+        "v 0 1 0",
+        "f 1 -2 -1",
+        ""
+    ]))
+    (loop_total, loop_vertices) = next(stream.read_obj(str(path), 10))
+    assert loop_total.tolist() == [3, 3]
+    assert loop_vertices.tolist() == [0, 1, 2, 0, 2, 3]
+
+
+class CountingReader(io.BytesIO):
+    """Counts the bytes read from it."""
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size: typing.Optional[int] = -1) -> bytes:
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+@pytest.mark.parametrize('count_type', ['uchar', 'short', 'uint'])
+def test_ply_mixed_faces_are_read_once(count_type):
+    """Faces with different numbers of corners do not make the reader go
+    back & read them again."""
+    faces = [list(range(k % 5 + 3)) for k in range(10_000)]
+    count_dtype = np.dtype('<' + stream.PLY_TYPES[count_type])
+    index_dtype = np.dtype('<i4')
+    data = b"".join(
+        np.array([len(face)], dtype=count_dtype).tobytes()
+        + np.array(face, dtype=index_dtype).tobytes()
+        for face in faces
+    )
+    f = CountingReader(data + b"trailing element")
+    chunk_size = 64
+    read = list(stream._read_binary_faces(
+        f,
+        len(faces),
+        chunk_size,
+        count_dtype,
+        index_dtype
+    ))
+    assert [len(loop_total) for (loop_total, _) in read] \
+        == [chunk_size] * (len(faces) // chunk_size) \
+        + [len(faces) % chunk_size]
+    assert np.concatenate([t for (t, _) in read]).tolist() \
+        == [len(face) for face in faces]
+    assert np.concatenate([v for (_, v) in read]).tolist() \
+        == list(itertools.chain.from_iterable(faces))
+    # Left at the end of faces, every byte is read at most twice.
+    assert f.tell() == len(data)
+    assert f.bytes_read <= 2 * len(data)
+
+
+def test_ply_mixed_faces(tmp_path):
+    (vertices, faces) = MESHES['mixed']()
+    faces = sorted(faces, key=len) + [faces[0]]
+    path = str(tmp_path / "mesh.ply")
+    write_ply(path, vertices, faces, 'binary_big_endian', 'ushort', 'int')
+    header = stream.PlyHeader.read(path)
+    read = list(stream.read_ply(path, 16, header))
+    assert np.concatenate([t for (t, _) in read]).tolist() \
+        == [len(face) for face in faces]
+    assert np.concatenate([v for (_, v) in read]).tolist() \
+        == list(itertools.chain.from_iterable(faces))
+
+
+def test_ply_skips_other_elements(tmp_path):
+    path = tmp_path / "mesh.ply"
+    with open(path, "wb") as f:
+        f.write(b"\n".join([
+            b"ply",
+            b"format binary_little_endian 1.0",
+            b"element vertex 4",
+            b"property double x",
+            b"property double y",
+            b"property double z",
+            b"property uchar red",
+            b"element material 2",
+            b"property short id",
+            b"element face 1",
+            b"property list uchar uint vertex_indices",
+            b"end_header",
+            b""
+        ]))
+        for v in range(4):
+            f.write(np.array([v, v, v], dtype='<f8').tobytes())
+            f.write(np.array([255], dtype='u1').tobytes())
+        f.write(np.array([7, 8], dtype='<i2').tobytes())
+        f.write(np.array([4], dtype='u1').tobytes())
+        f.write(np.array([0, 1, 2, 3], dtype='<u4').tobytes())
+    stats = stream.analyze(str(path), tmp_dir=str(tmp_path))
+    assert (stats.vertex_count, stats.face_count, stats.quads_count) \
+        == (4, 1, 1)
+
+
+def test_ply_truncated(tmp_path):
+    (vertices, faces) = MESHES['grid']()
+    path = tmp_path / "mesh.ply"
+    write_ply(str(path), vertices, faces, 'binary_little_endian')
+    path.write_bytes(path.read_bytes()[:-10])
+    with pytest.raises(ValueError):
+        stream.analyze(str(path), tmp_dir=str(tmp_path))
+
+
+@pytest.mark.parametrize(('name', 'content'), [
+    ('bad_index.obj', "v 0 0 0\nv 1 0 0\nv 1 1 0\nf 1 2 4\n"),
+    ('bad_token.obj', "v 0 0 0\nv 1 0 0\nv 1 1 0\nf 1 2 x\n"),
+    ('not_ply.ply', "solid mesh\n"),
+    ('face_properties.ply', "\n".join([
+        "ply",
+        "format ascii 1.0",
+        "element vertex 0",
+        "element face 0",
+        "property list uchar int vertex_indices",
+        "property uchar flags",
+        "end_header",
+        ""
+    ])),
+    ('mesh.stl', "solid mesh\n"),
+])
+def test_malformed(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content)
+    with pytest.raises(ValueError):
+        stream.analyze(str(path), tmp_dir=str(tmp_path))
+
+
+def test_hash_cancels_on_inner_edges():
+    """Neighbour hashes of a vertex cancel out once every edge is shared
+    by two faces, as on a closed mesh."""
+    (vertices, faces) = MESHES['cube']()
+    with stream.Valences(len(vertices)) as valences:
+        valences.add_faces(
+            np.array([len(face) for face in faces], dtype=np.int32),
+            np.array(list(itertools.chain.from_iterable(faces)))
+        )
+        assert not np.any(valences.neighbours)
+        assert valences.corners.tolist() == [3] * 8